@@ -1,3 +1,18 @@
-from .conflator import CLIArg, ConfigModel, Conflator, EnvVar
+from .conflator import CLIArg, ConfigModel, Conflator, EnvVar, yaml_backend
+from .diff import diff
+from .errors import ConflatorValidationError
+from .frozen import freeze
+from .lazy import Lazy, validate_all
 
-__all__ = ["CLIArg", "ConfigModel", "Conflator", "EnvVar"]
+__all__ = [
+    "CLIArg",
+    "ConfigModel",
+    "Conflator",
+    "ConflatorValidationError",
+    "EnvVar",
+    "Lazy",
+    "diff",
+    "freeze",
+    "validate_all",
+    "yaml_backend",
+]
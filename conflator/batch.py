@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Sequence, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from . import subclasses
+from .conflator import Conflator, ParseContext, _env_snapshot
+from .errors import ConflatorValidationError
+from .includes import expand_includes
+from .merge import Strategy, merge
+
+# A config file, config files to merge in order, or an already parsed config
+Source = Union[str, Path, Sequence[Union[str, Path]], Mapping[str, Any]]
+
+
+class LoadResult(NamedTuple):
+    """The result of loading one source of a batch: either the validated config, or the error loading it."""
+
+    source: Source
+    config: BaseModel | None
+    error: Exception | None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_many(
+    model: Type[BaseModel],
+    sources: Iterable[Source],
+    *,
+    app_name: str | None = None,
+    env_case_insensitive: bool = False,
+    merge_strategies: Dict[str, Strategy] | None = None,
+    overrides: Dict[str, Any] | None = None,
+    workers: int | None = None,
+    processes: bool = False,
+    lazy: bool = False,
+    include_key: str | None = None,
+    discriminate_unions: bool = False,
+) -> List[LoadResult]:
+    """
+    Load many configs of the same model at once, e.g. one per tenant, as Conflator(app_name, model, cli=False,
+    config_file=...).load() would load each, but setting the model and the environment up only once.
+
+    Each source is a config file, a list of config files merged in order, or an already parsed config. The
+    config files of all sources are read once each, on a pool of `workers` threads, or of processes if
+    `processes` is set, as parsing large YAML files is CPU-bound. The results are returned in the order of
+    the sources, with the error of each source that failed to parse, such as a FileNotFoundError for a
+    missing config file, or a ConflatorValidationError for each that failed to validate, instead of exiting.
+
+    Environment variables prefixed with the upper-cased `app_name` are injected into every config if it is
+    given, and `overrides` are merged into every config, as constructor overrides are. With `include_key`,
+    config files can include others, see includes.expand_includes, which are read once for the whole batch.
+    `discriminate_unions` is as for Conflator.
+    """
+    # The same preparation as for a Conflator of the model
+    if discriminate_unions:
+        subclasses.discriminate_unions(model)
+    context = ParseContext()
+    context.app_name = app_name
+    context.env = _env_snapshot(app_name, env_case_insensitive) if app_name else {}
+    context.lazy = lazy
+
+    sources = list(sources)
+    layers = [_layers(source) for source in sources]
+    parsed = _parse_files({p for paths in layers if paths is not None for p in paths}, workers, processes)
+
+    # Included files, by absolute path, shared between the sources including them
+    included: Dict[Path, Any] = {}
+
+    def read(path: Path) -> Any:
+        if path not in included:
+            included[path] = _parse_file(path)
+        return included[path]
+
+    results = []
+    for source, paths in zip(sources, layers):
+        try:
+            if paths is None:
+                config = dict(source)
+            else:
+                files = [(p, parsed[p]) for p in paths]
+                if include_key is not None:
+                    files = expand_includes(files, include_key, read)
+                for _, content in files:
+                    if isinstance(content, Exception):
+                        raise content
+                config = merge({}, *[c for _, c in files if c is not None], strategies=merge_strategies)
+            if overrides:
+                config.update(overrides)
+            results.append(LoadResult(source, model.model_validate(config, context=context), None))
+        except ValidationError as e:
+            results.append(LoadResult(source, None, ConflatorValidationError(e)))
+        except Exception as e:
+            results.append(LoadResult(source, None, e))
+    return results
+
+
+def _layers(source: Source) -> List[Path] | None:
+    """The config files of a source, None if it is a parsed config."""
+    if isinstance(source, Mapping):
+        return None
+    if isinstance(source, (str, os.PathLike)):
+        return [Path(source)]
+    return [Path(s) for s in source]
+
+
+def _parse_files(paths: Iterable[Path], workers: int | None, processes: bool) -> Dict[Path, Any]:
+    """Read and parse config files on a pool, returning the content of each, or the error parsing it."""
+    paths = list(paths)
+    if not paths:
+        return {}
+    if processes:
+        workers = workers or os.cpu_count() or 1
+        # Many small files are sent to the processes in chunks, as each task has to be pickled
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(paths, pool.map(_parse_file, paths, chunksize=chunksize)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="conflator") as pool:
+        return dict(zip(paths, pool.map(_parse_file, paths)))
+
+
+def _parse_file(path: Path) -> Any:
+    # Unlike Conflator._from_file, a missing file is an error, as each source is expected to exist
+    try:
+        with open(path, "rb") as f:
+            return Conflator._parse(path, f.read())
+    except Exception as e:
+        return e
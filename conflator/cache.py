@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, NamedTuple, Tuple
+
+from pydantic import BaseModel
+
+# Bump when the layout of cache entries changes, so that old entries are ignored
+CACHE_FORMAT = 1
+
+
+def default_cache_dir(app_name: str) -> Path:
+    """The default cache directory for an application, $XDG_CACHE_HOME/conflator/<app_name>."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "conflator" / app_name
+
+
+def _write_pickle(path: Path, *objs: Any):
+    """Pickle objs, one after the other, to path atomically, creating its directory with user-only permissions."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # Write to a temporary file in the same directory, then atomically move it into place
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for obj in objs:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _trusted(directory: Path) -> bool:
+    """
+    Whether entries in a cache directory can be unpickled, as it is owned by the user and not writable by
+    anyone else. A missing directory is trusted, as it is created so.
+    """
+    try:
+        stat = os.stat(directory)
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        logging.debug(f"Not using cache directory {directory}, it is not owned by the user")
+        return False
+    if stat.st_mode & 0o022:
+        logging.debug(f"Not using cache directory {directory}, it is writable by group or others")
+        return False
+    return True
+
+
+class _ParsedEntry(NamedTuple):
+    format: int
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+    data: Any
+
+
+class ParsedFileCache:
+    """
+    On-disk cache of parsed config files, so that unchanged files are not parsed again by later processes.
+
+    Entries are keyed by the resolved path of the file and are only used if the modification time, size
+    and content hash of the file all match. The file is still read to compute its hash, which is much
+    cheaper than parsing it. Entries are pickled and written atomically, so concurrent processes only
+    ever see complete entries. As entries are unpickled, the cache directory must be owned by the user and
+    only writable by them, which is how it is created, otherwise the cache is not used.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _entry_path(self, path: Path) -> Path:
+        return self.directory / (hashlib.sha256(str(path).encode()).hexdigest() + ".pickle")
+
+    def load(self, path: Path, parse: Callable[[Path, bytes], Any]) -> Any:
+        """
+        Return the parsed contents of a file, parsing it with `parse` only if there is no valid cache entry.
+
+        :param path: The config file to load. Raises FileNotFoundError if it does not exist.
+        :param parse: Called with the path and content of the file on a cache miss.
+        :return: The parsed contents of the file.
+        """
+        path = Path(path).resolve()
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if not _trusted(self.directory):
+            return parse(path, content)
+
+        entry_path = self._entry_path(path)
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+            if entry[:5] == (CACHE_FORMAT, str(path), stat.st_mtime_ns, stat.st_size, digest):
+                logging.debug(f"Using cached parse of {path}")
+                return entry.data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Corrupt, truncated or incompatible entries are simply replaced
+            logging.debug(f"Ignoring invalid cache entry {entry_path}: {e}")
+
+        data = parse(path, content)
+        self._store(entry_path, _ParsedEntry(CACHE_FORMAT, str(path), stat.st_mtime_ns, stat.st_size, digest, data))
+        return data
+
+    def _store(self, entry_path: Path, entry: _ParsedEntry):
+        try:
+            _write_pickle(entry_path, entry)
+        except OSError as e:
+            logging.debug(f"Could not write cache entry {entry_path}: {e}")
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for entry in self.directory.glob("*.pickle"):
+            entry.unlink(missing_ok=True)
+
+
+def version_key() -> str:
+    """Versions of conflator, pydantic and Python, so that upgrading any of them invalidates snapshots."""
+    import platform
+    from importlib.metadata import PackageNotFoundError, version
+
+    import pydantic
+
+    try:
+        conflator_version = version("conflator")
+    except PackageNotFoundError:
+        conflator_version = "unknown"
+    return f"conflator={conflator_version};pydantic={pydantic.VERSION};python={platform.python_version()}"
+
+
+def fingerprint(parts: Iterable[str], files: Iterable[Path]) -> str:
+    """
+    Hash a description of the inputs to a load: arbitrary string parts, plus the path, modification
+    time, size and content of each candidate config file (including whether it exists).
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    for path in files:
+        h.update(str(path).encode())
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                content = f.read()
+        except FileNotFoundError:
+            h.update(b"\0missing\0")
+            continue
+        h.update(f"\0{stat.st_mtime_ns}:{stat.st_size}:".encode())
+        h.update(hashlib.sha256(content).digest())
+    return h.hexdigest()
+
+
+def model_key(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve_class(key: str, classes: Dict[str, type]) -> type | None:
+    """Find the class for a model key, falling back to looking it up by name in its already imported module."""
+    cls = classes.get(key)
+    if cls is None:
+        module, _, qualname = key.partition(":")
+        cls = sys.modules.get(module)
+        for part in qualname.split("."):
+            cls = getattr(cls, part, None)
+        if isinstance(cls, type):
+            classes[key] = cls
+    return cls
+
+
+def _rehydrate(
+    key: str, values: Dict[str, Any], fields_set: FrozenSet[str], classes: Dict[str, type] | None = None
+) -> Any:
+    """
+    Rebuild a model dumped by dump_model with model_construct, without validating it again. Classes resolved
+    from their keys are added to `classes`, which _SnapshotUnpickler shares between the models of a snapshot.
+    """
+    cls = _resolve_class(key, {} if classes is None else classes)
+    if cls is None:
+        raise KeyError(key)
+    if cls.__private_attributes__ or cls.model_config.get("extra") == "allow":
+        return cls.model_construct(_fields_set=set(fields_set), **values)
+    # As every field value is present, this is what model_construct does, minus its per-field default handling
+    model = cls.__new__(cls)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__pydantic_fields_set__", set(fields_set))
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", None)
+    return model
+
+
+class _ModelDump(NamedTuple):
+    model: str
+    values: Dict[str, Any]
+    fields_set: FrozenSet[str]
+
+    def __reduce__(self):
+        # Unpickling calls _rehydrate directly, children first, so no separate pass over the tree is needed
+        return (_rehydrate, tuple(self))
+
+
+def dump_model(value: Any, classes: Dict[str, type]) -> Any:
+    """
+    Convert a validated model into plain containers, replacing models with _ModelDump records.
+    Raises KeyError for a model whose class cannot be resolved from its key, as it could not be rehydrated.
+    """
+    if isinstance(value, BaseModel):
+        key = model_key(type(value))
+        if _resolve_class(key, classes) is not type(value):
+            raise KeyError(key)
+        values = {k: dump_model(v, classes) for k, v in value.__dict__.items()}
+        for k, v in (value.__pydantic_extra__ or {}).items():
+            values[k] = dump_model(v, classes)
+        return _ModelDump(key, values, frozenset(value.model_fields_set))
+    if type(value) is dict:
+        return {k: dump_model(v, classes) for k, v in value.items()}
+    if type(value) in (list, tuple, set, frozenset):
+        return type(value)(dump_model(v, classes) for v in value)
+    return value
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Unpickles snapshots, resolving model classes from the given mapping first."""
+
+    def __init__(self, file, classes: Dict[str, type]):
+        super().__init__(file)
+        self.classes = classes
+
+    def find_class(self, module, name):
+        if module == __name__ and name == "_rehydrate":
+            return functools.partial(_rehydrate, classes=self.classes)
+        return super().find_class(module, name)
+
+
+class SnapshotCache:
+    """
+    On-disk cache of the validated result of a load, keyed by a fingerprint of all of its inputs.
+
+    When the fingerprint matches, the result is rehydrated with model_construct, skipping both
+    merging and validation. Only the latest snapshot is kept for each model. As for ParsedFileCache, the
+    cache directory must be owned by the user and only writable by them.
+    """
+
+    def __init__(self, directory: Path, model: type):
+        self.directory = Path(directory)
+        self.path = self.directory / ("snapshot-" + hashlib.sha256(model_key(model).encode()).hexdigest() + ".pickle")
+
+    def load(self, fingerprint: str, classes: Dict[str, type]) -> Tuple[Any, Any] | None:
+        """Return the (result, merged config) stored for this fingerprint, or None."""
+        if not _trusted(self.directory):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                # Check the header before unpickling, and so rehydrating, the result
+                header = pickle.load(f)
+                if header != (CACHE_FORMAT, fingerprint):
+                    return None
+                return _SnapshotUnpickler(f, dict(classes)).load()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.debug(f"Ignoring invalid snapshot {self.path}: {e}")
+            return None
+
+    def store(self, fingerprint: str, result: Any, loaded_config: Any, classes: Dict[str, type]):
+        if not _trusted(self.directory):
+            return
+        try:
+            _write_pickle(self.path, (CACHE_FORMAT, fingerprint), (dump_model(result, dict(classes)), loaded_config))
+        except KeyError as e:
+            logging.debug(f"Not storing snapshot, cannot rehydrate model {e}")
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            logging.debug(f"Could not write snapshot {self.path}: {e}")
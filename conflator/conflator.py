@@ -1,33 +1,88 @@
 from __future__ import annotations
 
-import argparse
+import contextlib
+import copy
+import functools
 import json
 import logging
 import os
+import sys
+import weakref
 from collections import namedtuple
 from pathlib import Path
-from typing import Any, Dict, Tuple, Type, Union, get_args, get_origin
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    ForwardRef,
+    Iterable,
+    Iterator,
+    Literal,
+    NamedTuple,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
 
-import yaml
 from pydantic import BaseModel, ValidationError, model_validator
 from pydantic_core import PydanticUndefined
-from rich import print as rprint
-from rich.tree import Tree as rtree
-from rich_argparse import RawTextRichHelpFormatter
+
+from .errors import ConflatorValidationError
+from .lazy import _LazyField, lazy_fields
+from .merge import Strategy, merge
+from .paths import SettingError, apply_settings, parse_setting
+from .schema import invalidate, model_schema
+
+# argparse, rich, rich_argparse, yaml and the optional subsystems are imported where they are used,
+# so that loading a JSON config without CLI parsing does not pay for their import time
+if TYPE_CHECKING:
+    import argparse
+
+    from .batch import LoadResult, Source
+    from .cache import ParsedFileCache, SnapshotCache
+    from .provenance import Provenance
+    from .stats import LoadStats, SpanCallback
+    from .watcher import ConfigWatcher
 
 
 class CLIArg:
     def __init__(self, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
-        self.description = None
-        self.argparse_key = None
 
     def __repr__(self):
-        return (
-            f"CLIArg(args = {self.args}, kwargs = {self.kwargs}, "
-            + f"description = {self.description}, argparse_key = {self.argparse_key})"
-        )
+        return f"CLIArg(args = {self.args}, kwargs = {self.kwargs})"
+
+
+class _BoundCLIArg(NamedTuple):
+    """A CLIArg together with the help text and argparse destination of the field it annotates."""
+
+    cli_arg: CLIArg
+    description: str
+    argparse_key: str
+
+    @property
+    def args(self):
+        return self.cli_arg.args
+
+    @property
+    def kwargs(self):
+        return self.cli_arg.kwargs
+
+
+def _argparse_dest(args: Tuple[str, ...], kwargs: Dict[str, Any], prefix_chars: str = "-") -> str:
+    """Mirror how argparse derives the destination of an argument from its option strings."""
+    if "dest" in kwargs:
+        return kwargs["dest"]
+    if not args[0] or args[0][0] not in prefix_chars:
+        return args[0]
+    long_options = [a for a in args if len(a) > 1 and a[1] in prefix_chars]
+    return (long_options or args)[0].lstrip(prefix_chars).replace("-", "_")
 
 
 class EnvVar:
@@ -36,13 +91,21 @@ class EnvVar:
         self.name = name
 
 
-def make_print_schema_action(conflator: Conflator):
-    """Factory that returns an argparse.Action subclass bound to a specific Conflator instance."""
+def make_print_schema_action(conflator: Conflator | Callable[[], Conflator | None]):
+    """
+    Factory that returns an argparse.Action subclass printing the schema of a Conflator's model, or of the
+    model of the Conflator returned by a callable when the argument is parsed, for parsers shared by several.
+    """
+    import argparse
+
+    from rich import print as rprint
+
+    current = conflator if callable(conflator) else lambda: conflator
 
     class PrintSchemaAction(argparse.Action):
         def __call__(self, parser, namespace, values, option_string=None):
             try:
-                schema = conflator.schema()
+                schema = current().schema()
                 rprint(json.dumps(schema, indent=2))
             except Exception as e:
                 # if computing schema fails, still exit (optionally print error)
@@ -53,12 +116,142 @@ def make_print_schema_action(conflator: Conflator):
     return PrintSchemaAction
 
 
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    """The safe YAML loader for config files, preferring libyaml's CSafeLoader when PyYAML was built with it."""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def yaml_backend() -> str:
+    """Name of the backend used to parse YAML config files, either "libyaml" or "python"."""
+    return "libyaml" if _yaml_loader().__name__ == "CSafeLoader" else "python"
+
+
+class _SourcePlan(NamedTuple):
+    """Precompiled per-model lookups, run by ConfigModel.wrap_root on every validation."""
+
+    env: Tuple[Tuple[str, str], ...]  # (field name, upper-cased env var suffix)
+    cli: Tuple[Tuple[str, CLIArg], ...]  # (field name, CLI argument)
+
+
+def _compile_source_plan(model: Type[BaseModel]) -> _SourcePlan:
+    env = []
+    cli = []
+    for k, v in model.model_fields.items():
+        for m in v.metadata:
+            if isinstance(m, EnvVar):
+                env.append((k, (m.name or k).upper()))
+            elif isinstance(m, CLIArg):
+                cli.append((k, m))
+    return _SourcePlan(tuple(env), tuple(cli))
+
+
+# Models found by _discover_models, by root model, with the core schema of the root they were found in.
+# Roots are held weakly, as they may be created dynamically.
+_MODELS: weakref.WeakKeyDictionary[type, Tuple[Any, frozenset]] = weakref.WeakKeyDictionary()
+
+
+def _discover_models(root: Any) -> frozenset:
+    """
+    Find the ConfigModels that can be validated as part of a model: itself, and the models in the annotations
+    of its fields, however deeply nested in generics (List, Dict, Optional, Union, ...), Annotated and
+    forward references, and in those of plain pydantic models. Memoized per root model until it is rebuilt,
+    unless some forward references could not be resolved yet.
+    """
+    core_schema = getattr(root, "__pydantic_core_schema__", None)
+    cached = _MODELS.get(root) if isinstance(root, type) else None
+    if cached is not None and cached[0] is core_schema:
+        return cached[1]
+
+    found = set()
+    stack, resolved = _annotation_models(root, None)
+    seen = set(stack)
+    while stack:
+        model = stack.pop()
+        if issubclass(model, ConfigModel):
+            found.add(model)
+        for field in model.model_fields.values():
+            models, complete = _annotation_models(field.annotation, model)
+            resolved = resolved and complete
+            stack.extend(m for m in models if m not in seen)
+            seen.update(models)
+
+    found = frozenset(found)
+    if resolved and isinstance(root, type):
+        _MODELS[root] = (core_schema, found)
+    return found
+
+
+def _annotation_models(annotation: Any, owner: type | None) -> Tuple[list, bool]:
+    """
+    The pydantic models in an annotation, without looking into their fields, and whether all forward
+    references in it could be resolved, in the module of the model whose field it annotates.
+    """
+    models = []
+    resolved = True
+    stack = [annotation]
+    while stack:
+        t = stack.pop()
+        if isinstance(t, (str, ForwardRef)):
+            t = _resolve_forward_ref(t, owner)
+            if t is None:
+                resolved = False
+                continue
+        origin = get_origin(t)
+        if origin is not None:
+            if origin is Literal:
+                continue
+            args = get_args(t)
+            # Only the type of Annotated is a type, the rest is metadata
+            stack.extend(args[:1] if origin is Annotated else args)
+            if isinstance(origin, type) and issubclass(origin, BaseModel):
+                # A parametrised generic model
+                stack.append(origin)
+        elif isinstance(t, type) and issubclass(t, BaseModel) and t not in models:
+            models.append(t)
+    return models, resolved
+
+
+def _resolve_forward_ref(ref: str | ForwardRef, owner: type | None) -> Any:
+    """Evaluate a forward reference in the module of the model whose field it annotates, None if it cannot be."""
+    if owner is None:
+        return None
+    code = ref.__forward_arg__ if isinstance(ref, ForwardRef) else ref
+    module = sys.modules.get(owner.__module__)
+    try:
+        return eval(code, vars(module) if module else {}, {owner.__name__: owner})
+    except Exception:
+        return None
+
+
 class ConfigModel(
     BaseModel,
     revalidate_instances="always",
     validate_assignment=True,
     validate_default=True,
 ):
+    @classmethod
+    def _source_plan(cls) -> _SourcePlan:
+        # Stored in the class's own __dict__ so subclasses compile their own plan
+        plan = cls.__dict__.get("__conflator_plan__")
+        if plan is None:
+            plan = _compile_source_plan(cls)
+            # Fields may still change until pydantic has fully built the class
+            if cls.__pydantic_complete__:
+                type.__setattr__(cls, "__conflator_plan__", plan)
+        return plan
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        # A new model can change the schemas of others, e.g. of unions of the subclasses of its base
+        invalidate()
+        # Lazy fields are validated on first access, through a descriptor in front of the instance's __dict__
+        for name in lazy_fields(cls):
+            type.__setattr__(cls, name, _LazyField(name))
+
     @model_validator(mode="wrap")
     @classmethod
     def wrap_root(cls, unvalidated, handler, info):
@@ -66,38 +259,183 @@ class ConfigModel(
         if not isinstance(info.context, ParseContext):
             return handler(unvalidated)
 
-        # Unvalidated can be a dict or a already-intiialised Model, handle both
-        def set(key, value):
+        # Sub-models whose inputs did not change since the last load are reused as they are
+        if info.context.reuse and id(unvalidated) in info.context.reuse:
+            return unvalidated
+
+        plan = cls._source_plan()
+        updates = {}
+
+        # Retrieve set environment variables
+        env = info.context.env
+        for k, key in plan.env:
+            set_env = env.get(key)
+            if set_env is not None:
+                updates[k] = set_env
+        n_env = len(updates)
+
+        # Retrieve set CLI args
+        cli_values = info.context.cli_values
+        if cli_values:
+            for k, ca in plan.cli:
+                set_arg = cli_values.get(ca)
+                if set_arg is not None:
+                    updates[k] = set_arg
+
+        stats = info.context.stats
+        if stats is not None:
+            stats.models_validated += 1
+            stats.env_injections += n_env
+            stats.cli_injections += len(updates) - n_env
+
+        if updates:
+            # Unvalidated can be a dict or a already-intiialised Model, handle both
             if isinstance(unvalidated, dict):
-                unvalidated[key] = value
+                unvalidated = {**unvalidated, **updates}
             else:
-                setattr(unvalidated, key, value)
-
-        for k, v in cls.model_fields.items():
-            # Retrieve set environment variables
-            env_vars = [m for m in v.metadata if isinstance(m, EnvVar)]
-            for ev in env_vars:
-                set_env = os.getenv(f"{info.context.app_name.upper()}_{(ev.name or k).upper()}", None)
-                if set_env is not None:
-                    set(k, set_env)
-
-            # Retrieve set CLI args
-            cli_args = [m for m in v.metadata if isinstance(m, CLIArg) and m.argparse_key is not None]
-            for ca in cli_args:
-                set_arg = getattr(info.context.cli_args, ca.argparse_key, None)
-                if set_arg is not None:
-                    set(k, set_arg)
+                for k, value in updates.items():
+                    setattr(unvalidated, k, value)
+            if info.context.provenance is not None:
+                return _record_injections(handler(unvalidated), plan, info.context)
 
         return handler(unvalidated)
 
 
+def _record_injections(model: BaseModel, plan: _SourcePlan, context: ParseContext) -> BaseModel:
+    """Record the environment variables and CLI arguments injected into a validated model."""
+    provenance = context.provenance
+    prefix = f"{context.app_name.upper()}_"
+    injected = {}
+    for k, key in plan.env:
+        if context.env.get(key) is not None:
+            injected[k] = provenance.intern("env", prefix + key)
+    for k, ca in plan.cli:
+        if context.cli_values.get(ca) is not None:
+            injected[k] = provenance.intern("cli", "/".join(ca.args))
+    provenance.record_injections(model, injected)
+    return model
+
+
+def _env_snapshot(app_name: str, case_insensitive: bool = False) -> Dict[str, str]:
+    """
+    Take a snapshot of the environment variables prefixed with APPNAME_.
+
+    :param app_name: The application name, whose upper-cased form is the prefix.
+    :param case_insensitive: Match the prefix case-insensitively, upper-casing the remainder of each name.
+    :return: A dictionary mapping the remainder of each variable name (after the prefix) to its value.
+    """
+    prefix = f"{app_name.upper()}_"
+    n = len(prefix)
+    if case_insensitive:
+        return {k[n:].upper(): v for k, v in os.environ.items() if k.upper().startswith(prefix)}
+    return {k[n:]: v for k, v in os.environ.items() if k.startswith(prefix)}
+
+
 class ParseContext:
     def __init__(self):
         self.app_name = None
         self.cli_args = {}
+        self.cli_values = {}
+        self.env = {}
+        # Ids of previously validated sub-models to reuse as they are, rather than re-validate
+        self.reuse = None
+        # Statistics of the load, if recording them
+        self.stats = None
+        # Sources of the values of the config, if tracking them, and the config files they were read from
+        self.provenance = None
+        self.config_files = []
+        # The parsed --set arguments
+        self.settings = []
+        # Leave the input of Lazy() fields unvalidated until they are first accessed
+        self.lazy = False
+
+
+class _LastLoad(NamedTuple):
+    result: BaseModel
+    loaded_config: Dict[str, Any]
+    env: Dict[str, str]
+    cli_values: Dict[CLIArg, Any]
+
+
+def _reuse_unchanged(validated: Any, old: Any, new: Any, reuse: set[int]) -> Any:
+    """
+    Walk the newly merged config alongside the previous one and the model validated from it, replacing the
+    inputs of sub-models that did not change with the previously validated instances, whose ids are added
+    to `reuse`. Only the containers on the way to sub-models are copied.
+    """
+    # Checking the MRO avoids the slower ABCMeta.__instancecheck__ of pydantic models
+    mro = type(validated).__mro__
+    if BaseModel in mro:
+        if ConfigModel in mro and (old is new or old == new):
+            reuse.add(id(validated))
+            return validated
+        if isinstance(old, dict) and isinstance(new, dict):
+            fields = validated.__dict__
+            return {
+                k: _reuse_unchanged(fields[k], old[k], v, reuse) if k in old and k in fields else v
+                for k, v in new.items()
+            }
+    elif not _holds_models(validated):
+        return new
+    elif dict in mro and isinstance(old, dict) and isinstance(new, dict) and validated.keys() == old.keys():
+        return {k: _reuse_unchanged(validated[k], old[k], v, reuse) if k in old else v for k, v in new.items()}
+    elif list in mro and isinstance(old, list) and isinstance(new, list) and len(validated) == len(old):
+        return [_reuse_unchanged(validated[i], old[i], v, reuse) if i < len(old) else v for i, v in enumerate(new)]
+    return new
+
+
+def _holds_models(value: Any) -> bool:
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return False
+    return any(isinstance(v, (BaseModel, dict, list)) for v in value)
+
+
+# Used in place of a stage of a load when statistics are not recorded
+_NOT_RECORDED = contextlib.nullcontext()
+
+
+class _ParserState:
+    """The arguments added to a parser, which may be shared by the Conflators of several models."""
+
+    def __init__(self):
+        # Argparse destination of each CLIArg added, whichever model it was added for
+        self.added: Dict[CLIArg, str] = {}
+        # Argparse destination of each CLIArg of each root model
+        self.models: Dict[type, Dict[CLIArg, str]] = {}
+        # The Conflator parsing the arguments, for --print-schema to print the schema of its model
+        self.conflator: Callable[[], Conflator | None] = lambda: None
+
+
+# State of each parser. Parsers are held weakly so that the cache does not outlive them.
+_CLI_DESTS: weakref.WeakKeyDictionary[argparse.ArgumentParser, _ParserState] = weakref.WeakKeyDictionary()
+
+
+def _fields_override_options(init):
+    """
+    Let keyword arguments naming a field of the model override it, as they did before options sharing their
+    name were added to the constructor. Such an option can still be set with a conflator_ prefix, e.g.
+    conflator_stats=True for a model with a stats field.
+    """
+    options = frozenset(init.__kwdefaults__)
+
+    @functools.wraps(init)
+    def __init__(self, app_name, model, *args, **kwargs):
+        fields = getattr(model, "model_fields", {})
+        names = set(fields) | {f.alias for f in fields.values() if f.alias}
+        shadowed = {k: kwargs.pop(k) for k in options & names & set(kwargs)}
+        for name in options:
+            if f"conflator_{name}" in kwargs:
+                kwargs[name] = kwargs.pop(f"conflator_{name}")
+        init(self, app_name, model, *args, **kwargs)
+        self.overrides.update(shadowed)
+
+    return __init__
 
 
 class Conflator:
+    @_fields_override_options
     def __init__(
         self,
         app_name,
@@ -105,13 +443,57 @@ class Conflator:
         cli=True,
         argparser: argparse.ArgumentParser = None,
         config_file: Path | None = None,
+        *,
+        env_case_insensitive: bool = False,
+        cache: bool | str | Path = False,
+        snapshot_cache: bool = False,
+        parallel: bool | int = False,
+        merge_strategies: Dict[str, Strategy] | None = None,
+        stats: bool | Callable[[LoadStats], Any] = False,
+        span: SpanCallback | None = None,
+        provenance: bool = False,
+        lazy: bool = False,
+        exit_on_error: bool = True,
+        include_key: str | None = None,
+        discriminate_unions: bool = False,
         **overrides: Dict[str, Any],
     ):
         self.app_name = app_name
+        self.env_case_insensitive = env_case_insensitive
+        # Per-path strategies for merging lists and dictionaries across config files
+        self.merge_strategies = merge_strategies
+        # Read config files concurrently, with a thread pool of the default or given size
+        self.parallel = parallel
         self.model = model
         self.cli = cli
         self.parser = argparser
         self.overrides = overrides
+        self._last_load: _LastLoad | None = None
+        # Record statistics of each load, passing them to a callback if given, and optionally wrapping
+        # each stage in a span, e.g. with span=tracer.start_as_current_span
+        self._record_stats = bool(stats) or span is not None
+        self._on_stats = stats if callable(stats) else None
+        self._span = span
+        self._load_stats: LoadStats | None = None
+        # The statistics of the last load, if recorded
+        self.stats: LoadStats | None = None
+        # Track the source of every value, as is always done with --explain-config
+        self.track_provenance = provenance
+        self._tracing: Provenance | None = None
+        # The sources of the values of the last load, if tracked
+        self.provenance: Provenance | None = None
+        # Validate Lazy() fields on first access, see lazy.Lazy
+        self.lazy = lazy
+        # Print invalid configs and exit, as suits command line applications, or raise a ConflatorValidationError
+        self.exit_on_error = exit_on_error
+        # Top level key of config files listing other config files to merge before them, see includes.py
+        self.include_key = include_key
+        # Validate unions of ConfigModels tagged with a Literal field by looking their tag up. This changes
+        # the model classes themselves, see subclasses.discriminate_unions
+        if discriminate_unions:
+            from . import subclasses
+
+            subclasses.discriminate_unions(self.model)
         self.config_files = (
             [
                 Path(config_file),
@@ -124,26 +506,27 @@ class Conflator:
                 Path.home() / f".{self.app_name}.yaml",
             ]
         )
+        # Parsed config files can be cached on disk, in the default cache directory or the one given
+        self.file_cache: ParsedFileCache | None = None
+        if cache:
+            from .cache import ParsedFileCache, default_cache_dir
 
-    @staticmethod
-    def _find_models(t: Type[BaseModel], seen=None) -> set[Type[BaseModel]]:
-        if seen is None:
-            seen = set()
-
-        if get_origin(t):
-            for a in get_args(t):
-                if isinstance(a, ConfigModel) and a not in seen:
-                    Conflator._find_models(a, seen)
-        else:
-            if issubclass(t, ConfigModel) and t not in seen:
-                seen.add(t)
-                for v in t.model_fields.values():
-                    Conflator._find_models(v.annotation, seen)
+            self.file_cache = ParsedFileCache(default_cache_dir(self.app_name) if cache is True else Path(cache))
+        # The validated result can be snapshotted too, in the same directory
+        self.snapshot_cache: SnapshotCache | None = None
+        if snapshot_cache:
+            from .cache import SnapshotCache, default_cache_dir
+
+            directory = self.file_cache.directory if self.file_cache else default_cache_dir(self.app_name)
+            self.snapshot_cache = SnapshotCache(directory, self.model)
 
-        return seen
+    @staticmethod
+    def _find_models(t: Type[BaseModel]) -> set[Type[BaseModel]]:
+        """The ConfigModels used by a model, including itself, see _discover_models."""
+        return set(_discover_models(t))
 
     @staticmethod
-    def _get_cli_args(model: Type[BaseModel], args: set[CLIArg] = None):
+    def _get_cli_args(model: Type[BaseModel], args: set[_BoundCLIArg] = None) -> set[_BoundCLIArg]:
         if args is None:
             args = set()
         # TODO: model_title = model.model_config.get("title") or model.__name__
@@ -152,101 +535,408 @@ class Conflator:
             description = v.description or ""
 
             for ca in cli_args:
-                ca.description = description
-                args.add(ca)
+                args.add(_BoundCLIArg(ca, description, _argparse_dest(ca.args, ca.kwargs)))
         return args
 
-    def load(self) -> BaseModel:
-        referenced_models = Conflator._find_models(self.model)
-        # rprint(referenced_models)
+    def _cli_dests(self) -> Dict[CLIArg, str]:
+        """
+        Add the CLI arguments of the model to the parser, once per parser, and return the argparse destination
+        of each CLIArg. Arguments of sub-models shared with other models using the parser are only added once.
+        """
+        state = _CLI_DESTS.get(self.parser)
+        if state is None:
+            state = _CLI_DESTS[self.parser] = _ParserState()
+            self._add_common_arguments(state)
+        # Held weakly, as the state lives as long as the parser
+        state.conflator = weakref.ref(self)
+        dests = state.models.get(self.model)
+        if dests is not None:
+            return dests
 
-        if self.cli:
-            # Find all CLI args and then parse them
-            cli_args = set()
-            for m in referenced_models:
-                cli_args |= Conflator._get_cli_args(m, cli_args)
-
-            # Could do a pre-validation here to see if which CLI args actually *need* to be set
-            # and to give more information to the user about what is already set by config
-
-            if self.parser is None:
-                self.parser = argparse.ArgumentParser(
-                    description=f"All arguments can be overriden by environment variables {self.app_name.upper()}_* "
-                    + "or set in config files:\n"
-                    + "\n".join([f" - {cf}" for cf in self.config_files]),
-                    formatter_class=RawTextRichHelpFormatter,
-                )
+        # Find all CLI args
+        cli_args = set()
+        for m in Conflator._find_models(self.model):
+            cli_args |= Conflator._get_cli_args(m, cli_args)
 
-            for ca in cli_args:
+        # Could do a pre-validation here to see if which CLI args actually *need* to be set
+        # and to give more information to the user about what is already set by config
+
+        dests = {}
+        for ca in cli_args:
+            dest = state.added.get(ca.cli_arg)
+            if dest is None:
                 action = self.parser.add_argument(*ca.args, **ca.kwargs, help=ca.description)
-                ca.argparse_key = action.dest
+                dest = state.added[ca.cli_arg] = action.dest
+            dests[ca.cli_arg] = dest
 
-            self.parser.add_argument(
-                "--set",
-                action="append",
-                help="Override config with dot-separated path and value, e.g. --set foo.bar.baz=1",
-                default=[],
-            )
-            self.parser.add_argument(
-                "-f",
-                "--config",
-                action="append",
-                help="Override config with additional configuration files, e.g. --config ./config.yaml",
-                default=[],
-            )
-            PrintSchemaAction = make_print_schema_action(self)
-            self.parser.register("action", "print_schema", PrintSchemaAction)
-            self.parser.add_argument(
-                "--print-schema",
-                action="print_schema",
-                help="Print the JSON schema for the configuration and exit",
-                nargs=0,
-            )
+        state.models[self.model] = dests
+        return dests
 
-            # args = self.parser.parse_args()
-            args, unknown = self.parser.parse_known_args()
+    def _add_common_arguments(self, state: _ParserState):
+        """Add the arguments common to all models to the parser."""
+        self.parser.add_argument(
+            "--set",
+            action="append",
+            help="Override config with dot-separated path and value, e.g. --set foo.bar.baz=1",
+            default=[],
+        )
+        self.parser.add_argument(
+            "-f",
+            "--config",
+            action="append",
+            help="Override config with additional configuration files, e.g. --config ./config.yaml",
+            default=[],
+        )
+        PrintSchemaAction = make_print_schema_action(lambda: state.conflator())
+        self.parser.register("action", "print_schema", PrintSchemaAction)
+        self.parser.add_argument(
+            "--print-schema",
+            action="print_schema",
+            help="Print the JSON schema for the configuration and exit",
+            nargs=0,
+        )
+        self.parser.add_argument(
+            "--explain-config",
+            action="store_true",
+            help="Print where each value of the configuration comes from and exit",
+        )
 
-        else:
-            args = namedtuple("Args", ["config", "set"])(config=[], set=[])
+    def load(self) -> BaseModel:
+        with self._recording():
+            parse_context, config_files = self._prepare()
 
-        # Initialise config dictionary empty
-        self.loaded_config = {}
+            # If nothing has changed since a previous load, reuse its result
+            fingerprint, cached = self._load_snapshot(parse_context, config_files)
+            if cached is not None:
+                return cached
 
-        # Then merge all config files
-        config_files = self.config_files + [Path(f) for f in args.config]
-        for cf in config_files:
-            self.loaded_config = Conflator._merge(self.loaded_config, Conflator._from_file(cf))
+            return self._conflate(parse_context, self._read_config_files(config_files), fingerprint)
 
-        # Then merge all --set arguments from CLI
-        for setting in args.set:
-            path, value = setting.split("=")
-            logging.debug(f"Setting {path} = {value}")
-            self.loaded_config = Conflator._merge(self.loaded_config, Conflator._dot_path_to_nested_dict(path, value))
+    async def aload(self) -> BaseModel:
+        """
+        Load the configuration like load(), reading config files in worker threads so that
+        the event loop is not blocked by file I/O.
+        """
+        import asyncio
 
-        # Finally merge with kwargs passed to the constructor
-        self.loaded_config.update(self.overrides)
+        with self._recording():
+            parse_context, config_files = self._prepare()
 
-        logging.debug(f"Conflated config: {self.loaded_config}")
+            fingerprint, cached = await asyncio.to_thread(self._load_snapshot, parse_context, config_files)
+            if cached is not None:
+                return cached
 
-        # Finally, validate the model, invoking the custom validator to inject CLI args and environment variables
+            with self._stage("read"):
+                layers = await asyncio.gather(*[asyncio.to_thread(self._read_config_file, cf) for cf in config_files])
+                files = list(zip(config_files, layers))
+                if self.include_key is not None:
+                    files = await asyncio.to_thread(self._expand_includes, files)
+            return self._conflate(parse_context, files, fingerprint)
+
+    def _recording(self) -> ContextManager[Any]:
+        """Record statistics of the load within this context, if enabled."""
+        if not self._record_stats:
+            return _NOT_RECORDED
+        return self._record_load()
+
+    @contextlib.contextmanager
+    def _record_load(self) -> Iterator[LoadStats]:
+        from .stats import LoadStats
+
+        stats = LoadStats(span=self._span)
+        self._load_stats = stats
+        try:
+            with stats.stage("load", app_name=self.app_name):
+                yield stats
+        finally:
+            self._load_stats = None
+            self.stats = stats
+            logging.debug("Load statistics of %s:\n%s", self.app_name, stats)
+            if self._on_stats is not None:
+                self._on_stats(stats)
+
+    def _stage(self, name: str) -> ContextManager[Any]:
+        stats = self._load_stats
+        return _NOT_RECORDED if stats is None else stats.stage(name)
+
+    def _prepare(self) -> Tuple[ParseContext, list[Path]]:
+        """Parse the CLI arguments and snapshot the environment, returning them with the config files to read."""
+        if self.cli:
+            with self._stage("cli"):
+                if self.parser is None:
+                    import argparse
+
+                    from rich_argparse import RawTextRichHelpFormatter
+
+                    self.parser = argparse.ArgumentParser(
+                        description="All arguments can be overriden by environment variables "
+                        + f"{self.app_name.upper()}_* or set in config files:\n"
+                        + "\n".join([f" - {cf}" for cf in self.config_files]),
+                        formatter_class=RawTextRichHelpFormatter,
+                    )
+                cli_dests = self._cli_dests()
+
+                # args = self.parser.parse_args()
+                args, unknown = self.parser.parse_known_args()
+
+        else:
+            args = namedtuple("Args", ["config", "set"])(config=[], set=[])
+            cli_dests = {}
+
+        # Snapshot the environment and the CLI values to inject while validating
         parse_context = ParseContext()
         parse_context.cli_args = args
+        parse_context.cli_values = {}
+        for ca, dest in cli_dests.items():
+            value = getattr(args, dest, None)
+            if value is not None:
+                parse_context.cli_values[ca] = value
         parse_context.app_name = self.app_name
+        try:
+            parse_context.settings = [parse_setting(setting) for setting in args.set]
+        except SettingError as e:
+            if not self.exit_on_error:
+                raise
+            self.parser.error(str(e))
+        with self._stage("env"):
+            parse_context.env = _env_snapshot(self.app_name, self.env_case_insensitive)
+        parse_context.stats = self._load_stats
+        parse_context.config_files = self.config_files + [Path(f) for f in args.config]
+        if self.track_provenance or getattr(args, "explain_config", False):
+            from .provenance import Provenance
+
+            parse_context.provenance = Provenance()
+        self._tracing = parse_context.provenance
+        # Every value is validated when tracking where they come from, so the defaults used are known
+        parse_context.lazy = self.lazy and parse_context.provenance is None
+
+        return parse_context, parse_context.config_files
+
+    def _load_snapshot(
+        self, parse_context: ParseContext, config_files: list[Path]
+    ) -> Tuple[str | None, BaseModel | None]:
+        """Return the fingerprint of the inputs to this load, and the snapshotted result if there is one."""
+        # Snapshots do not record where values came from, and would validate lazy fields to store them. Their
+        # fingerprint does not cover included files either.
+        if (
+            self.snapshot_cache is None
+            or parse_context.provenance is not None
+            or parse_context.lazy
+            or self.include_key is not None
+        ):
+            return None, None
+        with self._stage("snapshot"):
+            fingerprint = self._fingerprint(parse_context, config_files)
+            cached = self.snapshot_cache.load(fingerprint, self._model_classes())
+        if cached is None:
+            return fingerprint, None
+        logging.debug("Using snapshot of a previous load")
+        result, self.loaded_config = cached
+        self._last_load = _LastLoad(result, self.loaded_config, parse_context.env, parse_context.cli_values)
+        return fingerprint, result
+
+    def _read_config_files(self, config_files: list[Path]) -> list[Tuple[Path, Any]]:
+        """
+        Read and parse the config files and the files they include, concurrently if enabled, returning the
+        (path, content) of each in the order they are merged.
+        """
+        with self._stage("read"):
+            return self._expand_includes(list(zip(config_files, self._read_layers(config_files))))
+
+    def _read_layers(self, config_files: list[Path]) -> list[Any]:
+        """Read and parse the config files, concurrently if enabled, returning them in the same order."""
+        if self.parallel and len(config_files) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            max_workers = None if self.parallel is True else self.parallel
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conflator") as pool:
+                return list(pool.map(self._read_config_file, config_files))
+        return [self._read_config_file(cf) for cf in config_files]
+
+    def reload(self, previous: BaseModel) -> BaseModel:
+        """
+        Load the configuration again, only re-validating the sub-models whose inputs changed since the
+        load that returned `previous`.
+
+        Unchanged sub-models are reused, and so shared with `previous`, which should not have been modified
+        since it was loaded. Everything is re-validated if the environment or CLI arguments changed, or if
+        `previous` is not the result of the last load of this Conflator.
+        """
+        with self._recording():
+            parse_context, config_files = self._prepare()
+            return self._conflate(parse_context, self._read_config_files(config_files), None, previous)
+
+    def watch(self, **kwargs) -> ConfigWatcher:
+        """
+        Load the configuration and keep it up to date as the config files change, see watcher.ConfigWatcher.
+        Keyword arguments are passed to ConfigWatcher. Stop the returned watcher when done with it.
+        """
+        from .watcher import ConfigWatcher
+
+        watcher = ConfigWatcher(self, **kwargs)
+        watcher.start()
+        return watcher
+
+    @staticmethod
+    def load_many(model: Type[BaseModel], sources: Iterable[Source], **kwargs) -> list[LoadResult]:
+        """
+        Load many configs of a model at once, e.g. one per tenant, returning the config or error of each,
+        see batch.load_many for the keyword arguments.
+        """
+        from .batch import load_many
+
+        return load_many(model, sources, **kwargs)
+
+    def _conflate(
+        self,
+        parse_context: ParseContext,
+        files: list[Tuple[Path, Any]],
+        fingerprint: str | None,
+        previous: BaseModel | None = None,
+    ) -> BaseModel:
+        """Merge the parsed config files with the other sources, in order of precedence, then validate."""
+        with self._stage("merge"):
+            try:
+                self._merge_sources(parse_context, files)
+            except SettingError as e:
+                if not self.exit_on_error:
+                    raise
+                self.parser.error(str(e))
 
+        # Finally, validate the model, invoking the custom validator to inject CLI args and environment variables
         try:
-            result = self.model.model_validate(self.loaded_config, context=parse_context)
+            with self._stage("validate"):
+                result = self._validate(parse_context, previous)
         except ValidationError as e:
-            output = rtree(f"[red]Configuration errors: {e.error_count()}[/red]")
-            for err in e.errors():
-                output.add(f"[red]{err['msg'].upper()}:[/red][cyan] {self._loc_to_dot_sep(err['loc'])}[/cyan]")
-            rprint(output)
+            error = ConflatorValidationError(e, parse_context.provenance)
+            if not self.exit_on_error:
+                raise error from e
+            from rich import print as rprint
+
+            rprint(error)
             rprint("[red]Use --help for more information.[/red]")
             raise SystemExit(e.error_count())
 
+        if fingerprint is not None:
+            with self._stage("store"):
+                self.snapshot_cache.store(fingerprint, result, self.loaded_config, self._model_classes())
+
+        self.provenance = parse_context.provenance
+        if getattr(parse_context.cli_args, "explain_config", False):
+            from rich import get_console
+            from rich.markup import escape
+
+            # Through the console rich.print uses, as the rest of the CLI output, without wrapping long lines
+            get_console().print(escape(self.provenance.explain()), soft_wrap=True)
+            raise SystemExit(0)
+
         return result
 
+    def _merge_sources(self, parse_context: ParseContext, files: list[Tuple[Path, Any]]):
+        """
+        Merge the (path, content) of the parsed config files, --set arguments and constructor overrides into
+        self.loaded_config.
+        """
+        # Merge all config files into an initially empty config, skipping empty files
+        self.loaded_config = merge(
+            {}, *[layer for _, layer in files if layer is not None], strategies=self.merge_strategies
+        )
+
+        # Then apply all --set arguments from CLI, at once
+        if parse_context.settings:
+            logging.debug("Setting %s", parse_context.settings)
+            self.loaded_config = apply_settings(self.loaded_config, parse_context.settings, self.merge_strategies)
+
+        # Finally merge with kwargs passed to the constructor
+        self.loaded_config.update(self.overrides)
+
+        if parse_context.provenance is not None:
+            self._trace_sources(parse_context, files)
+
+        # Formatted lazily, as the config can be large
+        logging.debug("Conflated config: %s", self.loaded_config)
+
+    def _expand_includes(self, files: list[Tuple[Path, Any]]) -> list[Tuple[Path, Any]]:
+        """Add the files included by the config files if include_key is set, reading them concurrently if enabled."""
+        if self.include_key is None:
+            return files
+        from .includes import expand_includes
+
+        if not self.parallel:
+            return expand_includes(files, self.include_key, self._read_config_file)
+        from concurrent.futures import ThreadPoolExecutor
+
+        max_workers = None if self.parallel is True else self.parallel
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conflator") as pool:
+            return expand_includes(files, self.include_key, self._read_config_file, pool.map)
+
+    def _trace_sources(self, parse_context: ParseContext, files: list[Tuple[Path, Any]]):
+        """Record the sources of the merged config, repeating the merge over them."""
+        provenance = parse_context.provenance
+        sources = [(layer, provenance.intern("file", str(path)), provenance._lines.get(path)) for path, layer in files]
+        settings = [(setting, provenance.intern("set", setting.text)) for setting in parse_context.settings]
+        provenance.trace_merge(sources, settings, self.overrides, self.merge_strategies)
+
+    def _validate(self, parse_context: ParseContext, previous: BaseModel | None = None) -> BaseModel:
+        """
+        Validate the merged config, reusing the unchanged sub-models of `previous` if it is the result of
+        the last load, which had the same environment and CLI arguments.
+        """
+        data = self.loaded_config
+        last = self._last_load
+        if (
+            previous is not None
+            and parse_context.provenance is None
+            and last is not None
+            and last.result is previous
+            and last.env == parse_context.env
+            and last.cli_values == parse_context.cli_values
+        ):
+            parse_context.reuse = set()
+            data = _reuse_unchanged(previous, last.loaded_config, data, parse_context.reuse)
+            if data is previous:
+                logging.debug("Config unchanged, reusing the previous result")
+                self._last_load = last._replace(loaded_config=self.loaded_config)
+                return previous
+            logging.debug(f"Reusing {len(parse_context.reuse)} unchanged sub-models")
+
+        result = self.model.model_validate(data, context=parse_context)
+        if parse_context.provenance is not None:
+            parse_context.provenance.annotate(result)
+        self._last_load = _LastLoad(result, self.loaded_config, parse_context.env, parse_context.cli_values)
+        return result
+
+    def _model_classes(self) -> Dict[str, Type[BaseModel]]:
+        from .cache import model_key
+
+        return {model_key(m): m for m in Conflator._find_models(self.model)}
+
+    def _fingerprint(self, parse_context: ParseContext, config_files: list[Path]) -> str:
+        """Fingerprint every input to a load, for the snapshot cache."""
+        from .cache import fingerprint, model_key, version_key
+
+        try:
+            schema = json.dumps(model_schema(self.model), sort_keys=True, default=repr)
+        except Exception:
+            schema = repr(list(self.model.model_fields))
+        parts = [
+            version_key(),
+            model_key(self.model),
+            schema,
+            self.app_name,
+            repr(sorted(parse_context.env.items())),
+            repr(parse_context.cli_args),
+            repr(self.overrides),
+            repr(sorted((self.merge_strategies or {}).items())),
+        ]
+        return fingerprint(parts, [cf.resolve() for cf in config_files])
+
     def schema(self):
-        return self.model.model_json_schema()
+        """
+        The JSON schema of the model, a copy of the one cached until a ConfigModel class is created, see
+        schema.model_schema.
+        """
+        return copy.deepcopy(model_schema(self.model))
 
     @staticmethod
     def _dot_path_to_nested_dict(path: str, value: Any, convert_hyphens_to_underscores: bool = True) -> Dict[str, Any]:
@@ -269,61 +959,62 @@ class Conflator:
         return nested_dict
 
     @staticmethod
-    def _merge(a, b, path=None):
-        # a = self.loaded_config
-        # b = copy.deepcopy(b)
-
-        if path is None:
-            path = []
-
-        if not isinstance(b, dict):
-            if isinstance(a, list) and isinstance(b, list):
-                return a + b
-            # self.loaded_config = b
-            a = b
-
-        for key in b:
-            if key in a:
-                if b[key] is None:
-                    del a[key]
-                elif isinstance(a[key], dict) and isinstance(b[key], dict):
-                    # TODO: cannot merge here as if it was two configs...?
-                    # TODO: need to pass in a[key] as a Conflator object if we want to do this...
-
-                    # a[key] = a[key]._merge(b[key], path + [str(key)])
-                    a[key] = Conflator._merge(a[key], b[key], path + [str(key)])
-                elif isinstance(a[key], list) and isinstance(b[key], list):
-                    a[key] = a[key] + b[key]
-                elif a[key] == b[key]:
-                    pass
-                else:
-                    a[key] = b[key]
-            else:
-                if b[key] is not None:
-                    a[key] = b[key]
-        return a
+    def _merge(a, b, strategies: Dict[str, Strategy] | None = None):
+        """Merge b into a, without modifying either. See merge.merge for the semantics."""
+        return merge(a, b, strategies=strategies)
+
+    @staticmethod
+    def _from_file(path: Path, parse: Callable[[Path, bytes], Any] | None = None):
+        try:
+            with open(path, "rb") as f:
+                return (parse or Conflator._parse)(path, f.read())
+        except FileNotFoundError:
+            logging.debug(f"Skipping {path}, file not found.")
+            return {}
+
+    @staticmethod
+    def _parse(path: Path, content: bytes):
+        if path.suffix == ".yaml" or path.suffix == ".yml":
+            import yaml
 
-    def _from_file(path: Path):
+            return yaml.load(content, Loader=_yaml_loader())
+        else:
+            return json.loads(content)
+
+    def _read_config_file(self, path: Path):
+        parse, cacheable = Conflator._parse, True
+        if self._tracing is not None and path.suffix in (".yaml", ".yml"):
+            # Also records the line of each value, which the file cache does not store
+            parse, cacheable = self._tracing.parse_yaml, False
+        stats = self._load_stats
+        if stats is None:
+            return self._read_parsed(path, parse, cacheable)
+        with stats.file(path) as recorder:
+            return self._read_parsed(path, recorder.wrap(parse), cacheable)
+
+    def _read_parsed(self, path: Path, parse: Callable[[Path, bytes], Any], cacheable: bool):
+        if self.file_cache is None or not cacheable:
+            return Conflator._from_file(path, parse)
         try:
-            with open(path, "r") as f:
-                if path.suffix == ".yaml" or path.suffix == ".yml":
-                    return yaml.safe_load(f)
-                else:
-                    return json.load(f)
+            return self.file_cache.load(path, parse)
         except FileNotFoundError:
             logging.debug(f"Skipping {path}, file not found.")
             return {}
 
     def _update_from_env(self) -> Dict:
         # Try to read from environment variables (case insensitive)
-        env_vars = {k.upper(): v for k, v in os.environ.items()}
+        env_vars = _env_snapshot(self.app_name, case_insensitive=True)
         for k, v in self.model.model_fields.items():
-            key = f"{self.app_name.upper()}_{(v.alias or k).upper()}"
+            key = (v.alias or k).upper()
             if key in env_vars:
                 self.loaded_config[k] = env_vars[key]
 
     def _update_from_cli_args(self):
         if not self.parser:
+            import argparse
+
+            from rich_argparse import RawTextRichHelpFormatter
+
             self.parser = argparse.ArgumentParser(
                 description=f"All arguments can be overriden with {self.app_name.upper()}_ARG."
                 + f"They can also be set in JSON files: /etc/{self.app_name}/config.json and ~/.{self.app_name}apirc"
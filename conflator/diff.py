@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, List, NamedTuple, Tuple
+
+from pydantic import BaseModel
+
+from .paths import Key, child_path, split_path
+
+# Leaf types compared with == directly, without dispatching on the kind of value
+_SCALARS = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+class ConfigDiff(NamedTuple):
+    """
+    The paths that differ between two configs, e.g. "sinks[2].path", with keys quoted as paths.join_path
+    does. A path is only listed once, at the root of the subtree that was added or removed, or at the value
+    that changed.
+    """
+
+    changed: List[str]
+    added: List[str]
+    removed: List[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.added or self.removed)
+
+    def paths(self) -> List[str]:
+        """All of the paths that differ, changed, added or removed."""
+        return self.changed + self.added + self.removed
+
+    def affects(self, prefixes: str | Iterable[str]) -> bool:
+        """Whether anything under, or containing, any of the given paths differs."""
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+        prefixes = [_keys(prefix) for prefix in prefixes]
+        return any(_overlaps(path, prefix) for path in map(_keys, self.paths()) for prefix in prefixes)
+
+
+def _keys(path: str) -> Tuple[Key, ...]:
+    # The empty path is the root, when the configs themselves differ
+    if not path:
+        return ()
+    # Paths in a list at the root start with an index, where split_path expects a key
+    if path.startswith("["):
+        return split_path("_" + path)[1:]
+    return split_path(path)
+
+
+def _overlaps(path: Tuple[Key, ...], prefix: Tuple[Key, ...]) -> bool:
+    # Either path is the other one, or a parent of it
+    n = min(len(path), len(prefix))
+    return path[:n] == prefix[:n]
+
+
+def diff(old: Any, new: Any) -> ConfigDiff:
+    """
+    Compare two validated configs, or two merged config dictionaries, returning the paths that differ.
+
+    Paths use dots between keys and brackets for list indices, e.g. "workers[3].sink.path". Fields of models
+    are named by their field names, keys of dictionaries as they are. Values of different types, such as a
+    list replaced by a dictionary, are reported as changed rather than compared further. Subtrees that are the
+    same object, as shared by Conflator.reload and merge, or that compare equal, are skipped without being
+    traversed in Python.
+    """
+    result = ConfigDiff([], [], [])
+    if old is not new:
+        _diff(old, new, "", result)
+    return result
+
+
+def _fields(model: BaseModel) -> dict:
+    extra = model.__pydantic_extra__
+    return {**model.__dict__, **extra} if extra else model.__dict__
+
+
+def _diff(old: Any, new: Any, path: str, result: ConfigDiff):
+    if isinstance(old, dict) and isinstance(new, dict):
+        _diff_mappings(old, new, path, result)
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_sequences(old, new, path, result)
+    elif isinstance(old, BaseModel) and type(old) is type(new):
+        _diff_mappings(_fields(old), _fields(new), path, result)
+    elif old != new:
+        result.changed.append(path)
+
+
+def _diff_mappings(old: dict, new: dict, path: str, result: ConfigDiff):
+    removed = 0
+    for k, v in old.items():
+        if k not in new:
+            result.removed.append(child_path(path, k))
+            removed += 1
+            continue
+        w = new[k]
+        if v is w:
+            continue
+        if type(v) in _SCALARS and type(w) is type(v):
+            if v != w:
+                result.changed.append(child_path(path, k))
+        # Equality is checked in C, and is much faster than traversing an unchanged subtree here
+        elif v != w:
+            _diff(v, w, child_path(path, k), result)
+    # Only look for added keys if there are more keys in new than old keys that are still there
+    if len(new) > len(old) - removed:
+        result.added.extend(child_path(path, k) for k in new if k not in old)
+
+
+def _diff_sequences(old: list, new: list, path: str, result: ConfigDiff):
+    for i, (v, w) in enumerate(zip(old, new)):
+        if v is w:
+            continue
+        if type(v) in _SCALARS and type(w) is type(v):
+            if v != w:
+                result.changed.append(f"{path}[{i}]")
+        elif v != w:
+            _diff(v, w, f"{path}[{i}]", result)
+    result.added.extend(f"{path}[{i}]" for i in range(len(old), len(new)))
+    result.removed.extend(f"{path}[{i}]" for i in range(len(new), len(old)))
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, List, NamedTuple, Tuple, Union
+
+from pydantic import ValidationError
+
+if TYPE_CHECKING:
+    from rich.tree import Tree
+
+    from .provenance import Provenance
+
+
+class ErrorEntry(NamedTuple):
+    """One error of an invalid config."""
+
+    path: str  # as printed, e.g. "sinks[1] > path"
+    loc: Tuple[Union[str, int], ...]  # as reported by pydantic
+    message: str
+    type: str  # pydantic's error type, e.g. "missing"
+    source: str | None  # where the value, or the closest value enclosing it, was set, if provenance is tracked
+
+
+class ConflatorValidationError(ValueError):
+    """
+    The merged config did not validate, raised by load() with Conflator(exit_on_error=False).
+
+    The entries are only built from the pydantic ValidationError when `errors` is first read, and rich
+    only renders them when the error is printed with rich, so catching and collecting errors is cheap.
+    """
+
+    def __init__(self, error: ValidationError, provenance: Provenance | None = None):
+        super().__init__(error.title)
+        self.validation_error = error
+        self._provenance = provenance
+
+    def error_count(self) -> int:
+        return self.validation_error.error_count()
+
+    @functools.cached_property
+    def errors(self) -> List[ErrorEntry]:
+        from .conflator import Conflator
+
+        entries = []
+        for err in self.validation_error.errors(include_url=False, include_context=False, include_input=False):
+            source = self._provenance.nearest(err["loc"]) if self._provenance is not None else None
+            entries.append(
+                ErrorEntry(
+                    Conflator._loc_to_dot_sep(err["loc"]),
+                    err["loc"],
+                    err["msg"],
+                    err["type"],
+                    None if source is None else str(source),
+                )
+            )
+        return entries
+
+    def __str__(self) -> str:
+        lines = [f"Configuration errors: {self.error_count()}"]
+        for entry in self.errors:
+            source = f" (from {entry.source})" if entry.source else ""
+            lines.append(f"  {entry.path}: {entry.message}{source}")
+        return "\n".join(lines)
+
+    def __rich__(self) -> Tree:
+        from rich.markup import escape
+        from rich.tree import Tree
+
+        tree = Tree(f"[red]Configuration errors: {self.error_count()}[/red]")
+        for entry in self.errors:
+            source = f" [dim](from {escape(entry.source)})[/dim]" if entry.source else ""
+            tree.add(f"[red]{escape(entry.message.upper())}:[/red][cyan] {escape(entry.path)}[/cyan]{source}")
+        return tree
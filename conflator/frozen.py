@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import functools
+import sys
+from collections import namedtuple
+from collections.abc import Mapping
+from typing import Any, Iterator, Tuple
+
+from pydantic import BaseModel
+
+from .lazy import _Unvalidated
+
+
+class FrozenConfig(tuple):
+    """
+    Base class of the read-only views of models returned by freeze().
+
+    Views are tuples of the values of the fields of a model, with attribute access to each field, so they are
+    immutable, hashable, and much smaller than the models, which carry a __dict__ and a set of the fields set
+    on every instance. Views of different models with the same values are not equal.
+    """
+
+    __slots__ = ()
+    # The names of the fields, as in the model, which may differ from the attribute names for extra fields
+    # that are not valid identifiers
+    _keys: Tuple[str, ...] = ()
+
+    def _get(self, key: str, default: Any = None) -> Any:
+        """
+        The value of a field by its name in the model, e.g. for extra fields that are not valid identifiers.
+        Underscored like the methods of namedtuples, so as not to shadow a field.
+        """
+        try:
+            return self[self._keys.index(key)]
+        except ValueError:
+            return default
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+
+class FrozenMap(Mapping):
+    """A read-only, hashable dictionary."""
+
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, data: dict):
+        self._data = data
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenMap):
+            return self._data == other._data
+        return isinstance(other, Mapping) and self._data == dict(other)
+
+    def __repr__(self) -> str:
+        return f"FrozenMap({self._data!r})"
+
+
+@functools.lru_cache(maxsize=None)
+def _frozen_class(model: type, names: Tuple[str, ...]) -> type:
+    # namedtuple provides the C-level accessors of each field, and repr
+    base = namedtuple(f"Frozen{model.__name__}", names, rename=True)
+    return type(base.__name__, (FrozenConfig, base), {"__slots__": (), "_keys": names})
+
+
+def freeze(value: Any) -> Any:
+    """
+    Convert a validated config into a compact, read-only view of it, e.g. to share with forked workers.
+
+    Models become FrozenConfig tuples with attribute access to their fields, lists and tuples become tuples,
+    dictionaries become FrozenMaps, and sets become frozensets. Strings are interned, so that equal strings are
+    only stored once. Private attributes are dropped, and other values are used as they are.
+
+    Reading the view only touches the reference counts of the values read. Workers forked after freezing
+    share the view's memory until they write to it, which is more likely if the garbage collector scans it:
+    call gc.freeze() before forking to prevent that.
+    """
+    cls = type(value)
+    if cls is str:
+        return sys.intern(value)
+    if BaseModel in cls.__mro__:
+        fields = value.__dict__
+        extra = value.__pydantic_extra__
+        names = tuple(fields) + tuple(extra) if extra else tuple(fields)
+        values = [freeze(v) for v in fields.values()]
+        if extra:
+            values.extend(freeze(v) for v in extra.values())
+        return tuple.__new__(_frozen_class(cls, names), values)
+    if cls is list or cls is tuple:
+        return tuple([freeze(v) for v in value])
+    if cls is dict:
+        return FrozenMap({freeze(k): freeze(v) for k, v in value.items()})
+    if cls is set or cls is frozenset:
+        return frozenset(freeze(v) for v in value)
+    if cls is _Unvalidated:
+        return freeze(value.resolve())
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Convert a frozen view back into plain dictionaries and lists, e.g. to validate it again."""
+    if isinstance(value, FrozenConfig):
+        return {k: thaw(v) for k, v in zip(value._keys, value)}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    if isinstance(value, FrozenMap):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, frozenset):
+        return {thaw(v) for v in value}
+    return value
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+
+class IncludeError(ValueError):
+    """An include directive that cannot be followed: not a path, a missing file, or a cycle of includes."""
+
+
+def expand_includes(
+    files: Iterable[Tuple[Path, Any]],
+    key: str,
+    read: Callable[[Path], Any],
+    mapper: Callable[[Callable[[Path], Any], List[Path]], Iterator[Any]] = map,
+) -> List[Tuple[Path, Any]]:
+    """
+    Expand the include directives of parsed config files into the files to merge, in order.
+
+    A config file can include others with a top level `key`, a path or a list of paths relative to the file.
+    The files it includes are merged before it, in order, so its own values take precedence over theirs.
+    Each file is merged once, at the first place it is included, however many files include it, and is only
+    read once. The included files of each level are read with `read`, through `mapper`, e.g. the map of
+    a thread pool to read them concurrently.
+
+    :param files: (path, parsed content) of the config files, in order.
+    :return: (path, parsed content without the directive) of the config files and the files they include.
+    """
+    parsed: Dict[Path, Any] = {}
+    includes: Dict[Path, Tuple[Path, ...]] = {}
+    # Top level files are reported under the path they were given as, included files under their absolute path
+    names: Dict[Path, Path] = {}
+    included_from: Dict[Path, Path] = {}
+
+    def add(path: Path, content: Any):
+        parsed[path], includes[path] = _split(names[path], content, key)
+        for include in includes[path]:
+            included_from.setdefault(include, names[path])
+
+    roots = []
+    for name, content in files:
+        path = _absolute(name)
+        roots.append(path)
+        if path not in parsed:
+            names[path] = name
+            add(path, content)
+
+    pending = _unread(roots, includes, parsed)
+    while pending:
+        for path in pending:
+            if not path.is_file():
+                raise IncludeError(f"{path}, included from {included_from[path]}, not found")
+            names[path] = path
+        for path, content in zip(pending, mapper(read, pending)):
+            add(path, content)
+        pending = _unread(pending, includes, parsed)
+
+    # Merged in post-order: the files included by a file, then the file
+    order = []
+    done = set()
+    for root in roots:
+        if root in done:
+            continue
+        stack = [(root, iter(includes[root]))]
+        visiting = [root]
+        while stack:
+            path, children = stack[-1]
+            for child in children:
+                if child in visiting:
+                    cycle = visiting[visiting.index(child) :] + [child]
+                    raise IncludeError(f"Cycle of includes: {' -> '.join(str(names[p]) for p in cycle)}")
+                if child not in done:
+                    stack.append((child, iter(includes[child])))
+                    visiting.append(child)
+                    break
+            else:
+                stack.pop()
+                visiting.pop()
+                done.add(path)
+                order.append(path)
+    return [(names[path], parsed[path]) for path in order]
+
+
+def _absolute(path: Path) -> Path:
+    return Path(os.path.abspath(path))
+
+
+def _split(path: Path, content: Any, key: str) -> Tuple[Any, Tuple[Path, ...]]:
+    """The content of a config file without its include directive, and the absolute paths it includes."""
+    if not isinstance(content, dict) or key not in content:
+        return content, ()
+    value = content[key]
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise IncludeError(f"Invalid {key!r} in {path}, expected a path or a list of paths")
+    directory = _absolute(path).parent
+    return {k: v for k, v in content.items() if k != key}, tuple(_absolute(directory / v) for v in value)
+
+
+def _unread(paths: Iterable[Path], includes: Dict[Path, Tuple[Path, ...]], parsed: Dict[Path, Any]) -> List[Path]:
+    """The files included by some files that were not read yet, each once, in order."""
+    return list(dict.fromkeys(i for path in paths for i in includes[path] if i not in parsed))
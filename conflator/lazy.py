@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import copy
+from typing import Any, List, Tuple
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import core_schema
+
+_UNSET = object()
+
+
+class Lazy:
+    """
+    Marks a field of a ConfigModel to be validated on first access, when loading with Conflator(lazy=True),
+    e.g. large sections that most processes never read:
+
+        rules: Annotated[List[Rule], Lazy()] = []
+
+    The field's input is kept as it is until then, and validated once, with the same environment variables
+    and CLI arguments as the rest of the config. Only dictionaries and lists are deferred. validate_all()
+    validates every deferred field of a config, e.g. to check a config in CI.
+    """
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: Any) -> core_schema.CoreSchema:
+        schema = handler(source)
+        return core_schema.with_info_wrap_validator_function(
+            _validate_lazily,
+            schema,
+            serialization=core_schema.wrap_serializer_function_ser_schema(_serialize, schema=schema),
+        )
+
+    def __repr__(self):
+        return "Lazy()"
+
+
+class _Unvalidated:
+    """The input of a lazy field, and the validator to validate it with once it is first accessed."""
+
+    __slots__ = ("_input", "_handler", "_value")
+
+    def __init__(self, input: Any, handler: Any):
+        self._input = input
+        self._handler = handler
+        self._value = _UNSET
+
+    def resolve(self) -> Any:
+        if self._value is _UNSET:
+            self._value = self._handler(self._input)
+            # The input is no longer needed, nor the validator and the context it holds on to
+            self._input = self._handler = None
+        return self._value
+
+    def __eq__(self, other):
+        if type(other) is _Unvalidated:
+            if self._value is _UNSET and other._value is _UNSET:
+                return self._input == other._input
+            other = other.resolve()
+        return self.resolve() == other
+
+    __hash__ = None
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.resolve(), memo)
+
+    def __reduce__(self):
+        return (_identity, (self.resolve(),))
+
+    def __repr__(self):
+        return f"<unvalidated {type(self._input).__name__}>" if self._value is _UNSET else repr(self._value)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _validate_lazily(value: Any, handler: Any, info: Any) -> Any:
+    if type(value) is _Unvalidated:
+        if getattr(info.context, "lazy", False):
+            return value
+        value = value.resolve()
+    elif getattr(info.context, "lazy", False) and isinstance(value, (dict, list)):
+        return _Unvalidated(value, handler)
+    return handler(value)
+
+
+def _serialize(value: Any, serializer: Any) -> Any:
+    return serializer(value.resolve() if type(value) is _Unvalidated else value)
+
+
+class _LazyField:
+    """
+    Data descriptor installed on ConfigModels for each lazy field, taking precedence over the instance's
+    __dict__ to validate the field's value on first access, and store it there.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj: Any, cls: type = None) -> Any:
+        if obj is None:
+            # Hidden on the class, where pydantic would take it for the default of the field
+            raise AttributeError(self.name)
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if type(value) is _Unvalidated:
+            try:
+                value = value.resolve()
+            except ValidationError as e:
+                raise _prefixed(e, (self.name,), type(obj).__name__) from None
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj: Any, value: Any):
+        # Not reached by pydantic's own assignments, which set the __dict__ directly
+        obj.__dict__[self.name] = value
+
+
+def _line_errors(error: ValidationError, loc: Tuple[Any, ...]) -> List[dict]:
+    """The errors of a ValidationError, located relative to a parent, to raise them again."""
+    errors = []
+    for e in error.errors():
+        details = {"type": e["type"], "loc": loc + tuple(e["loc"]), "input": e["input"]}
+        if "ctx" in e:
+            details["ctx"] = e["ctx"]
+        errors.append(details)
+    return errors
+
+
+def _prefixed(error: ValidationError, loc: Tuple[Any, ...], title: str) -> ValidationError:
+    return ValidationError.from_exception_data(title, _line_errors(error, loc))
+
+
+def lazy_fields(model: type) -> List[str]:
+    return [name for name, field in model.model_fields.items() if any(isinstance(m, Lazy) for m in field.metadata)]
+
+
+def validate_all(config: Any) -> Any:
+    """
+    Validate every lazy field of a config that was not accessed yet, returning the config.
+    Raises a ValidationError with all of the errors found, located relative to the config.
+    """
+    errors = []
+    _validate_all(config, (), errors)
+    if errors:
+        raise ValidationError.from_exception_data(type(config).__name__, errors)
+    return config
+
+
+def _validate_all(value: Any, loc: Tuple[Any, ...], errors: list):
+    if isinstance(value, BaseModel):
+        data = value.__dict__
+        for name in list(data):
+            v = data[name]
+            if type(v) is _Unvalidated:
+                try:
+                    v = getattr(value, name)
+                except ValidationError as e:
+                    errors.extend(_line_errors(e, loc))
+                    continue
+            _validate_all(v, loc + (name,), errors)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _validate_all(v, loc + (k,), errors)
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            _validate_all(v, loc + (i,), errors)
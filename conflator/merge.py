@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections.abc import Hashable
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Mapping, Tuple, Union
+
+REPLACE = "replace"
+APPEND = "append"
+PREPEND = "prepend"
+
+
+@dataclass(frozen=True)
+class UniqueBy:
+    """
+    Merge strategy for lists of mappings: concatenate the lists, but let a later item replace an earlier
+    one with the same value for `key`, keeping the position of the earlier item.
+    """
+
+    key: str
+
+
+Strategy = Union[str, UniqueBy]
+
+
+def merge(*layers: Any, strategies: Mapping[str, Strategy] | None = None) -> Any:
+    """
+    Merge config layers, later layers taking precedence, without modifying any of them.
+
+    Dictionaries are merged key by key, a None value deleting the key. Lists are concatenated, once, after
+    all layers have been visited. Any other value, or a value of a different type, replaces the previous one.
+    Subtrees that only come from a single layer are shared with it rather than copied, so the result must
+    be treated as read-only where it is shared.
+
+    :param layers: The layers to merge, in increasing order of precedence.
+    :param strategies: Merge strategies for specific dot-separated paths, e.g. {"sinks": "prepend"}.
+        One of "append" (the default for lists), "prepend", "replace" (the last list or dictionary wins
+        outright) or UniqueBy(key).
+    :return: The merged config.
+    """
+    if not layers:
+        return {}
+    if strategies:
+        return _merge_values(list(layers), (), compile_strategies(strategies))
+    return _merge_values(list(layers), None, None)
+
+
+def compile_strategies(strategies: Mapping[str, Strategy]) -> Dict[Tuple[str, ...], Strategy]:
+    """Check merge strategies, keying them by the tuple of keys of their paths."""
+    for strategy in strategies.values():
+        if not isinstance(strategy, UniqueBy) and strategy not in (REPLACE, APPEND, PREPEND):
+            raise ValueError(f"Unknown merge strategy {strategy!r}")
+    return {tuple(path.split(".")): strategy for path, strategy in strategies.items()}
+
+
+def _merge_values(values: list, path: Tuple[str, ...] | None, strategies: Dict[tuple, Strategy] | None) -> Any:
+    # A value that is not of the same kind as the one before it replaces it, so only the trailing run
+    # of dictionaries, or of lists, contributes to the result
+    last = values[-1]
+    if isinstance(last, dict):
+        kind = dict
+    elif isinstance(last, list):
+        kind = list
+    else:
+        return last
+
+    start = len(values) - 1
+    while start > 0 and isinstance(values[start - 1], kind):
+        start -= 1
+    run = values[start:]
+
+    strategy = strategies.get(path) if strategies else None
+    if len(run) == 1 or strategy == REPLACE:
+        return last
+    if kind is dict:
+        return _merge_dicts(run, path, strategies)
+    if strategy == PREPEND:
+        return list(chain.from_iterable(reversed(run)))
+    if isinstance(strategy, UniqueBy):
+        return _unique_by(run, strategy.key)
+    return list(chain.from_iterable(run))
+
+
+def _merge_dicts(dicts: list, path: Tuple[str, ...] | None, strategies: Dict[tuple, Strategy] | None) -> dict:
+    # Collect the values of each key across the dictionaries, then merge each of them once
+    first, *rest = dicts
+    collected = {k: [v] for k, v in first.items()}
+    for d in rest:
+        for k, v in d.items():
+            if v is None:
+                collected.pop(k, None)
+            elif k in collected:
+                collected[k].append(v)
+            else:
+                collected[k] = [v]
+
+    if path is None:
+        return {k: vs[0] if len(vs) == 1 else _merge_values(vs, None, None) for k, vs in collected.items()}
+    return {k: _merge_values(vs, path + (str(k),), strategies) for k, vs in collected.items()}
+
+
+def _unique_by(lists: list, key: str) -> list:
+    result = []
+    positions = {}
+    for item in chain.from_iterable(lists):
+        value = item.get(key) if isinstance(item, dict) else None
+        # Items without a (hashable) value for the key are always kept
+        if value is not None and isinstance(value, Hashable):
+            position = positions.get(value)
+            if position is not None:
+                result[position] = item
+                continue
+            positions[value] = len(result)
+        result.append(item)
+    return result
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Tuple, Union
+
+from .merge import Strategy, _merge_values, compile_strategies
+
+Key = Union[str, int]
+
+# A key, either quoted, with backslash escapes, or bare up to the next separator
+_KEY = re.compile(r'"((?:[^"\\]|\\.)*)"|\'((?:[^\'\\]|\\.)*)\'|([^.\[\]"\'=]+)')
+_INDEX = re.compile(r"\[(\d+)\]")
+_ESCAPE = re.compile(r"\\(.)")
+# The path of a setting, up to the first = that is not quoted
+_SETTING_PATH = re.compile(r'(?:"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|[^=\'"])*')
+_BARE_KEY = re.compile(r"[^.\[\]\"'=\\]+")
+
+_MISSING = object()
+
+
+class SettingError(ValueError):
+    """An invalid --set argument, or one that does not apply to the config it is set in."""
+
+
+def split_path(path: str, convert_hyphens: bool = False) -> Tuple[Key, ...]:
+    """
+    Split a path into its keys and list indices, e.g. 'sinks[2]."file.name"' into ("sinks", 2, "file.name").
+
+    Keys are separated by dots, and can be quoted with double or single quotes to contain dots, brackets,
+    equal signs or quotes, escaped with a backslash. Hyphens in unquoted keys are converted to underscores
+    if `convert_hyphens` is set.
+    """
+    keys: List[Key] = []
+    pos, end = 0, len(path)
+    while True:
+        match = _KEY.match(path, pos)
+        if match is None:
+            raise SettingError(f"Invalid path {path!r}, expected a key at position {pos}")
+        double, single, bare = match.groups()
+        if bare is not None:
+            keys.append(bare.replace("-", "_") if convert_hyphens else bare)
+        else:
+            keys.append(_ESCAPE.sub(r"\1", double if double is not None else single))
+        pos = match.end()
+        while (match := _INDEX.match(path, pos)) is not None:
+            keys.append(int(match.group(1)))
+            pos = match.end()
+        if pos == end:
+            return tuple(keys)
+        if path[pos] != ".":
+            raise SettingError(f"Invalid path {path!r}, expected '.' or '[' at position {pos}")
+        pos += 1
+
+
+def join_path(keys: Iterable[Any]) -> str:
+    """The path of a sequence of keys and list indices, as split_path parses it, quoting keys where needed."""
+    path = ""
+    for key in keys:
+        path = child_path(path, key)
+    return path
+
+
+def child_path(path: str, key: Any) -> str:
+    """The path of a key or list index under path, quoting the key where needed."""
+    if isinstance(key, int) and not isinstance(key, bool):
+        return f"{path}[{key}]"
+    key = str(key)
+    if not _BARE_KEY.fullmatch(key):
+        key = '"' + key.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return f"{path}.{key}" if path else key
+
+
+class Setting(NamedTuple):
+    """A parsed --set argument."""
+
+    keys: Tuple[Key, ...]
+    value: Any
+    text: str  # the argument as given
+
+
+def parse_setting(text: str, convert_hyphens: bool = True) -> Setting:
+    """
+    Parse a --set argument, either path=value for a string value or path:=json for a value of any type,
+    e.g. 'workers[0].threads:=4' or 'labels."app.kubernetes.io/name"=my-app'. Only the first = that is not
+    quoted separates the path from the value, which can contain more.
+    """
+    match = _SETTING_PATH.match(text)
+    path = match.group()
+    if len(path) == len(text):
+        raise SettingError(f"Invalid --set {text!r}, expected path=value or path:=json")
+    # The path ends before an unterminated quote, as it cannot be matched
+    if text[len(path)] != "=":
+        raise SettingError(f"Invalid --set {text!r}, unterminated quote at position {len(path)}")
+    value = text[len(path) + 1 :]
+    if path.endswith(":"):
+        path = path[:-1]
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError as e:
+            raise SettingError(f"Invalid JSON value in --set {text!r}: {e}") from None
+    return Setting(split_path(path, convert_hyphens), value, text)
+
+
+class _Node:
+    """
+    A node of the trie of settings: the values set at its path, and the groups of children set below it, in
+    the order they were set, so that applying them all at once has the same result as one after the other.
+    """
+
+    __slots__ = ("ops",)
+
+    def __init__(self):
+        # ("value", value), ("keys", {key: _Node}) or ("indices", {index: _Node})
+        self.ops: List[Tuple[str, Any]] = []
+
+
+def _insert(root: _Node, setting: Setting):
+    node = root
+    for key in setting.keys:
+        kind = "indices" if isinstance(key, int) else "keys"
+        if not node.ops or node.ops[-1][0] != kind:
+            node.ops.append((kind, {}))
+        children = node.ops[-1][1]
+        child = children.get(key)
+        if child is None:
+            child = children[key] = _Node()
+        node = child
+    node.ops.append(("value", setting.value))
+
+
+def apply_settings(
+    config: Dict[str, Any], settings: Iterable[Setting], strategies: Mapping[str, Strategy] | None = None
+) -> Dict[str, Any]:
+    """
+    Apply --set arguments to a merged config, in order, without modifying it.
+
+    Each value is merged into the value at its path as a config file layer would be, following the merge
+    strategies. List indices address items of the list at that point, and can be one past its end to
+    append an item. All settings are gathered in a trie first, so each container on their paths is only
+    copied once, however many settings there are.
+    """
+    root = _Node()
+    for setting in settings:
+        _insert(root, setting)
+    if not root.ops:
+        return config
+    return _apply(root, config, (), (), compile_strategies(strategies) if strategies else None)
+
+
+def _apply(node: _Node, value: Any, keys: Tuple[Key, ...], path: Tuple[str, ...], strategies: dict | None) -> Any:
+    # path only has the keys of keys, as merge strategies apply to all items of a list
+    for kind, payload in node.ops:
+        if kind == "value":
+            value = payload if value is _MISSING else _merge_values([value, payload], path, strategies)
+        elif kind == "keys":
+            result = dict(value) if isinstance(value, dict) else {}
+            for key, child in payload.items():
+                v = _apply(child, result.get(key, _MISSING), keys + (key,), path + (key,), strategies)
+                # As in config files, None deletes a key
+                if v is None:
+                    result.pop(key, None)
+                else:
+                    result[key] = v
+            value = result
+        else:
+            result = list(value) if isinstance(value, list) else []
+            for index in sorted(payload):
+                if index > len(result):
+                    raise SettingError(
+                        f"Invalid --set {join_path(keys + (index,))}, {join_path(keys)} only has {len(result)} items"
+                    )
+                current = result[index] if index < len(result) else _MISSING
+                v = _apply(payload[index], current, keys + (index,), path, strategies)
+                if index < len(result):
+                    result[index] = v
+                else:
+                    result.append(v)
+            value = result
+    return value
@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from .merge import PREPEND, REPLACE, UniqueBy
+from .paths import Setting, join_path, split_path
+
+
+class Source(NamedTuple):
+    """Where a value came from."""
+
+    kind: str  # "default", "file", "set", "env", "cli" or "override"
+    name: str  # the model field, file path, --set argument, environment variable, CLI flag or override key
+
+    def __str__(self) -> str:
+        if self.kind == "file":
+            return self.name
+        if self.kind == "set":
+            return f"--set {self.name}"
+        return f"{self.kind} {self.name}"
+
+
+class Candidate(NamedTuple):
+    """A value for a path from a source, at a line of that source for YAML files."""
+
+    source: Source
+    line: int | None = None
+
+    def __str__(self) -> str:
+        return str(self.source) if self.line is None else f"{self.source}:{self.line}"
+
+
+class _Node:
+    """A node of the path trie, with the ids of the sources that gave it a value, in order of precedence."""
+
+    __slots__ = ("sources", "lines", "_children", "_single")
+
+    def __init__(self):
+        self.sources: List[int] = []
+        # Lines of the candidates in their source files, only allocated once one is known
+        self.lines: List[int | None] | None = None
+        self._children: Dict[Any, _Node] | None = None
+        # (value, source id, line tree) of a subtree that comes from a single source, whose children are only
+        # created when they are first needed, as most of a config usually comes from a single file
+        self._single: Tuple[Any, int, Any] | None = None
+
+    def add(self, source: int, line: int | None = None):
+        if line is not None and self.lines is None:
+            self.lines = [None] * len(self.sources)
+        self.sources.append(source)
+        if self.lines is not None:
+            self.lines.append(line)
+
+    @property
+    def children(self) -> Dict[Any, _Node] | None:
+        if self._single is not None:
+            value, source, lines = self._single
+            self._single = None
+            if isinstance(value, dict):
+                items = value.items()
+                get = (lambda k: lines.get(str(k), (None, None))) if lines else None
+            else:
+                items = enumerate(value)
+                get = (lambda i: lines[i] if i < len(lines) else (None, None)) if lines else None
+            self._children = {k: _Node.single(v, source, *(get(k) if get else (None, None))) for k, v in items}
+        return self._children
+
+    @children.setter
+    def children(self, children: Dict[Any, _Node] | None):
+        self._single = None
+        self._children = children
+
+    @staticmethod
+    def single(value: Any, source: int, line: int | None = None, lines: Any = None) -> _Node:
+        node = _Node()
+        node.add(source, line)
+        if value and isinstance(value, (dict, list)):
+            node._single = (value, source, lines)
+        return node
+
+    def child(self, key: Any) -> _Node:
+        children = self.children
+        if children is None:
+            children = self._children = {}
+        node = children.get(key)
+        if node is None:
+            node = children[key] = _Node()
+        return node
+
+
+class Provenance:
+    """
+    The sources of every value of a loaded config, recorded with Conflator(provenance=True).
+
+    Paths are written as for --set, with brackets for list indices, e.g. "sinks[2].path". For each path,
+    all of the sources that gave it a value are kept, the one whose value was used last. Sources are
+    interned and stored in a trie of the paths, so no values are copied.
+    """
+
+    def __init__(self):
+        self.sources: List[Source] = []
+        self._ids: Dict[Source, int] = {}
+        self.root = _Node()
+        # Line numbers of the values of each YAML file, keyed by path
+        self._lines: Dict[Path, Any] = {}
+        # Sources of the values injected into each model instance while validating, by id of the instance,
+        # which is kept alive alongside
+        self._injected: Dict[int, Tuple[BaseModel, Dict[str, int]]] = {}
+
+    def intern(self, kind: str, name: str) -> int:
+        source = Source(kind, name)
+        id = self._ids.get(source)
+        if id is None:
+            id = self._ids[source] = len(self.sources)
+            self.sources.append(source)
+        return id
+
+    def parse_yaml(self, path: Path, content: bytes) -> Any:
+        """Parse a YAML config file, recording the line of each of its values."""
+        from .conflator import _yaml_loader
+
+        loader = _yaml_loader()(content)
+        try:
+            # What yaml.load does, keeping hold of the composed nodes and their positions
+            node = loader.get_single_node()
+            data = loader.construct_document(node) if node is not None else None
+        finally:
+            loader.dispose()
+        self._lines[path] = yaml_lines(node)
+        return data
+
+    def _find(self, path: str) -> _Node | None:
+        node = self.root
+        for key in split_path(path):
+            node = node.children.get(key) if node.children else None
+            if node is None:
+                return None
+        return node
+
+    def _candidates(self, node: _Node) -> List[Candidate]:
+        lines = node.lines or [None] * len(node.sources)
+        return [Candidate(self.sources[s], line) for s, line in zip(node.sources, lines)]
+
+    def candidates(self, path: str) -> List[Candidate]:
+        """All of the sources of a value, in increasing order of precedence, so the one used last."""
+        node = self._find(path)
+        return [] if node is None else self._candidates(node)
+
+    def source(self, path: str) -> Candidate | None:
+        """The source of the value used for a path, or None if the path is not in the config."""
+        candidates = self.candidates(path)
+        return candidates[-1] if candidates else None
+
+    def nearest(self, loc: Sequence[Any]) -> Candidate | None:
+        """
+        The source of the value at the location of a validation error, or of the closest value enclosing it
+        that was set, e.g. of the object missing a field, or of a union item for an error within it.
+        """
+        node, found = self.root, None
+        for key in loc:
+            node = node.children.get(key) if node.children else None
+            if node is None:
+                break
+            if node.sources:
+                found = node
+        return None if found is None else self._candidates(found)[-1]
+
+    def items(self) -> Iterator[Tuple[str, List[Candidate]]]:
+        """The path and candidates of each leaf value of the config."""
+        stack = [((), self.root)]
+        while stack:
+            keys, node = stack.pop()
+            if node.children:
+                stack.extend((keys + (k,), child) for k, child in reversed(list(node.children.items())))
+            elif keys:
+                yield join_path(keys), self._candidates(node)
+
+    def explain(self) -> str:
+        """A line per leaf value, with its source and the sources it overrode."""
+        lines = []
+        for path, candidates in self.items():
+            line = f"{path}: {candidates[-1]}"
+            if len(candidates) > 1:
+                line += f" (overrides {', '.join(map(str, reversed(candidates[:-1])))})"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def trace_merge(
+        self,
+        layers: List[Tuple[Any, int, Any]],
+        settings: List[Tuple[Setting, int]],
+        overrides: Dict[str, Any],
+        strategies: Dict[str, Any] | None,
+    ):
+        """
+        Record the sources of the merged config, following the semantics of merge.merge and paths.apply_settings.
+
+        :param layers: (layer, source id, line tree) of each config file, in order.
+        :param settings: (setting, source id) of each --set argument, in order.
+        :param overrides: Constructor overrides, replacing top level keys.
+        """
+        strategies = {tuple(p.split(".")): s for p, s in strategies.items()} if strategies else {}
+        entries = [(layer, source, None, lines) for layer, source, lines in layers if layer is not None]
+        self.root = _trace(_Node(), entries, (), strategies) if entries else _Node()
+
+        for setting, source in settings:
+            parent, node, path = None, self.root, ()
+            for key in setting.keys:
+                parent, node = node, node.child(key)
+                if not isinstance(key, int):
+                    path += (key,)
+            if setting.value is None and not isinstance(setting.keys[-1], int):
+                parent.children.pop(setting.keys[-1])
+            else:
+                _trace_value(node, setting.value, source, path, strategies)
+
+        for key, value in overrides.items():
+            source = self.intern("override", key)
+            node = _Node()
+            # Overrides replace the value outright, so only the previous sources of the key itself are kept
+            previous = self.root.children.get(key) if self.root.children else None
+            if previous is not None:
+                for s, line in zip(previous.sources, previous.lines or [None] * len(previous.sources)):
+                    node.add(s, line)
+            if self.root.children is None:
+                self.root.children = {}
+            self.root.children[key] = _trace(node, [(value, source, None, None)], (key,), strategies)
+
+    def record_injections(self, model: BaseModel, injected: Dict[str, int]):
+        """Record the sources of values injected into a model instance while validating it."""
+        self._injected[id(model)] = (model, injected)
+
+    def annotate(self, result: BaseModel):
+        """Record the values injected while validating, and those left to defaults, once validated."""
+        records = []
+        _annotate(self, result, (), records)
+        self._injected.clear()
+        for keys, source, replaces in records:
+            node = self.root
+            for key in keys:
+                node = node.child(key)
+            node.add(source)
+            if replaces:
+                node.children = None
+
+
+def _trace(node: _Node, entries: list, path: Tuple[str, ...], strategies: dict) -> _Node:
+    # entries are (value, source id, line, line tree) tuples, mirroring merge._merge_values
+    for _, source, line, _ in entries:
+        node.add(source, line)
+
+    last = entries[-1][0]
+    if isinstance(last, dict):
+        kind = dict
+    elif isinstance(last, list):
+        kind = list
+    else:
+        return node
+
+    start = len(entries) - 1
+    while start > 0 and isinstance(entries[start - 1][0], kind):
+        start -= 1
+    run = entries[start:]
+    strategy = strategies.get(path)
+    if strategy == REPLACE:
+        run = run[-1:]
+    if len(run) == 1:
+        value, source, _, lines = run[0]
+        if value:
+            node._single = (value, source, lines)
+        return node
+
+    if kind is dict:
+        collected: Dict[Any, list] = {}
+        for i, (value, source, _, lines) in enumerate(run):
+            for k, v in value.items():
+                if v is None and i > 0:
+                    collected.pop(k, None)
+                    continue
+                line, sub = lines.get(str(k), (None, None)) if lines else (None, None)
+                collected.setdefault(k, []).append((v, source, line, sub))
+        node.children = {k: _trace(_Node(), es, path + (str(k),), strategies) for k, es in collected.items()}
+        return node
+
+    items = []
+    for value, source, _, lines in reversed(run) if strategy == PREPEND else run:
+        for i, v in enumerate(value):
+            line, sub = lines[i] if lines and i < len(lines) else (None, None)
+            items.append([(v, source, line, sub)])
+    if isinstance(strategy, UniqueBy):
+        items = _unique_by(items, strategy.key)
+    node.children = {i: _trace(_Node(), es, path, strategies) for i, es in enumerate(items)}
+    return node
+
+
+def _trace_value(node: _Node, value: Any, source: int, path: Tuple[str, ...], strategies: dict):
+    # Records a --set value merged into the existing value of a node, as merge._merge_values would
+    children = node.children
+    strategy = strategies.get(path)
+    merged = (
+        children
+        and value
+        and isinstance(value, (dict, list))
+        and strategy != REPLACE
+        and isinstance(next(iter(children)), int) == isinstance(value, list)
+    )
+    if not merged:
+        node.children = None
+        node.add(source)
+        if value and isinstance(value, (dict, list)):
+            node._single = (value, source, None)
+        return
+
+    node.add(source)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if v is None:
+                children.pop(k, None)
+            else:
+                _trace_value(node.child(k), v, source, path + (str(k),), strategies)
+        return
+    added = {i: _Node.single(v, source) for i, v in enumerate(value)}
+    if strategy == PREPEND:
+        node.children = {**added, **{len(value) + i: child for i, child in children.items()}}
+    else:
+        # Items that replace others with UniqueBy are recorded as appended
+        node.children = {**children, **{len(children) + i: child for i, child in added.items()}}
+
+
+def _unique_by(items: List[list], key: str) -> List[list]:
+    # As merge._unique_by, a later item replaces an earlier one with the same key, keeping its position
+    result = []
+    positions = {}
+    for item in items:
+        value = item[0][0].get(key) if isinstance(item[0][0], dict) else None
+        if value is not None and not isinstance(value, (dict, list)):
+            position = positions.get(value)
+            if position is not None:
+                result[position] = result[position] + item
+                continue
+            positions[value] = len(result)
+        result.append(item)
+    # Only the last entry of each item was used, the others are overridden candidates
+    return [[(None, s, line, None) for _, s, line, _ in item[:-1]] + item[-1:] for item in result]
+
+
+def _annotate(provenance: Provenance, value: Any, keys: Tuple[Any, ...], records: list):
+    # Collects (keys, source id, replaces) records, so that the trie is only expanded where they are added
+    cls = type(value)
+    if BaseModel in cls.__mro__:
+        injected = provenance._injected.get(id(value))
+        injected = injected[1] if injected is not None and injected[0] is value else {}
+        fields_set = value.model_fields_set
+        data = value.__dict__
+        for name, field in cls.model_fields.items():
+            child = keys + (field.alias or name,)
+            if name in injected:
+                # An injected value replaces the whole value from the config files
+                records.append((child, injected[name], True))
+            elif name not in fields_set:
+                records.append((child, provenance.intern("default", f"{cls.__name__}.{name}"), False))
+            v = data.get(name)
+            if isinstance(v, (list, dict)) or BaseModel in type(v).__mro__:
+                _annotate(provenance, v, child, records)
+    else:
+        for k, v in value.items() if isinstance(value, dict) else enumerate(value):
+            if isinstance(v, (list, dict)) or BaseModel in type(v).__mro__:
+                _annotate(provenance, v, keys + (k,), records)
+
+
+def yaml_lines(node: Any) -> Any:
+    """
+    The line tree of a composed YAML node: {key: (line, line tree)} for mappings, and [(line, line tree)] for
+    sequences.
+    """
+    import yaml
+
+    if isinstance(node, yaml.MappingNode):
+        return {
+            str(k.value): (v.start_mark.line + 1, yaml_lines(v))
+            for k, v in node.value
+            if isinstance(k, yaml.ScalarNode)
+        }
+    if isinstance(node, yaml.SequenceNode):
+        return [(v.start_mark.line + 1, yaml_lines(v)) for v in node.value]
+    return None
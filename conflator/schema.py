@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import functools
+import json
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic.json_schema import DEFAULT_REF_TEMPLATE, JsonSchemaMode, models_json_schema
+
+# Incremented whenever a ConfigModel class is created, as a new subclass can change the schemas of existing
+# models, e.g. of unions of the subclasses of a model discovered when rebuilding them
+_generation = 0
+
+# Schemas of each model, by (by_alias, ref_template, mode), with the generation and core schema they were
+# generated from. Models are held weakly, as they may be created dynamically.
+_SCHEMAS: weakref.WeakKeyDictionary[type, Dict[Tuple[Any, ...], Tuple[int, Any, Dict[str, Any]]]] = (
+    weakref.WeakKeyDictionary()
+)
+
+DEFINITIONS_FILE = "definitions.json"
+
+
+def invalidate():
+    """Invalidate every cached schema, e.g. once the classes they depend on changed."""
+    global _generation
+    _generation += 1
+
+
+def model_schema(
+    model: Type[BaseModel],
+    *,
+    by_alias: bool = True,
+    ref_template: str = DEFAULT_REF_TEMPLATE,
+    mode: JsonSchemaMode = "validation",
+) -> Dict[str, Any]:
+    """
+    The JSON schema of a model, as model.model_json_schema() returns it, generated once per model and
+    parameters until a ConfigModel class is created or the model is rebuilt.
+
+    The schema is shared between calls, so it should be copied before being modified.
+    """
+    key = (by_alias, ref_template, mode)
+    cached = _SCHEMAS.setdefault(model, {})
+    entry = cached.get(key)
+    core_schema = model.__pydantic_core_schema__
+    if entry is None or entry[0] != _generation or entry[1] is not core_schema:
+        schema = model.model_json_schema(by_alias=by_alias, ref_template=ref_template, mode=mode)
+        entry = cached[key] = (_generation, core_schema, schema)
+    return entry[2]
+
+
+def models_schema(
+    models: Iterable[Type[BaseModel]],
+    *,
+    by_alias: bool = True,
+    ref_template: str = DEFAULT_REF_TEMPLATE,
+    mode: JsonSchemaMode = "validation",
+) -> Tuple[Dict[Type[BaseModel], Dict[str, Any]], Dict[str, Any]]:
+    """
+    The JSON schemas of many models, generated together so the definitions of the sub-models they share
+    are only generated and included once.
+
+    Returns a reference to the definition of each model, e.g. {"$ref": "#/$defs/AppConfig"}, and the
+    schema holding the definitions, {"$defs": {...}}. Both are cached as model_schema's are.
+    """
+    models = tuple(models)
+    core_schemas = tuple(id(m.__pydantic_core_schema__) for m in models)
+    return _models_schema(models, core_schemas, by_alias, ref_template, mode, _generation)
+
+
+@functools.lru_cache(maxsize=16)
+def _models_schema(
+    models: Tuple[Type[BaseModel], ...],
+    core_schemas: Tuple[int, ...],
+    by_alias: bool,
+    ref_template: str,
+    mode: JsonSchemaMode,
+    generation: int,
+) -> Tuple[Dict[Type[BaseModel], Dict[str, Any]], Dict[str, Any]]:
+    refs, definitions = models_json_schema([(m, mode) for m in models], by_alias=by_alias, ref_template=ref_template)
+    return {m: refs[(m, mode)] for m in models}, definitions
+
+
+def write_schemas(
+    models: Iterable[Type[BaseModel]],
+    directory: Path,
+    *,
+    by_alias: bool = True,
+    mode: JsonSchemaMode = "validation",
+) -> Dict[Type[BaseModel], Path]:
+    """
+    Write the JSON schema of each model to a file in a directory, named after the model, e.g. for editors
+    to validate config files with. The definitions of all models and their sub-models are written once, to
+    definitions.json, which the schema of each model refers to.
+
+    Files whose content did not change are left as they are. Returns the path of the schema of each model.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    refs, definitions = models_schema(
+        models, by_alias=by_alias, ref_template=f"{DEFINITIONS_FILE}#/$defs/{{model}}", mode=mode
+    )
+    _write_json(directory / DEFINITIONS_FILE, definitions)
+    paths = {}
+    for model, ref in refs.items():
+        # Definitions are named after the models, qualified by pydantic where the names of models clash
+        name = ref["$ref"].rpartition("/")[2]
+        paths[model] = _write_json(directory / f"{name}.json", ref)
+    return paths
+
+
+def _write_json(path: Path, value: Any) -> Path:
+    content = json.dumps(value, indent=2) + "\n"
+    try:
+        if path.read_text() == content:
+            return path
+    except FileNotFoundError:
+        pass
+    path.write_text(content)
+    return path
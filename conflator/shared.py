@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Generic, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+# Header of the shared memory segment: a magic string, the sequence number and the length of the payload.
+# The sequence number is odd while a new version is being written, and twice the version otherwise.
+_HEADER = struct.Struct("<8sQQ")
+_MAGIC = b"CONFLATR"
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+
+M = TypeVar("M", bound=BaseModel)
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Only the process that created a segment should unlink it, but before Python 3.13 every process that
+    # attaches to one registers it with a resource tracker, which unlinks it when the process exits. Processes
+    # started by multiprocessing share the tracker of their parent, so unregistering it afterwards would undo
+    # the registration of the creator: it is not registered at all instead.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedConfig:
+    """
+    A validated config published to shared memory by one process, for other processes to read without
+    loading and validating it themselves, e.g. the workers of a pre-fork server.
+
+    The config is stored as JSON, with a version number that is incremented by each publish, so that readers
+    can cheaply check for new versions, for instance after the publisher reloaded the config:
+
+        shared = SharedConfig.create(size=1 << 20)
+        shared.publish(Conflator("my_app", AppConfig).load())
+        # in each worker, given shared.name
+        config = SharedConfigReader(name, AppConfig).get()
+
+    Readers never block the publisher: a reader that sees a version being written retries once it is complete.
+    The creating process should close() the segment, and unlink() it once it is no longer needed.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self._shm = shm
+        self._lock = threading.Lock()
+        self._seq = _SEQ.unpack_from(shm.buf, _SEQ_OFFSET)[0]
+
+    @classmethod
+    def create(cls, name: str | None = None, size: int = 1 << 20) -> SharedConfig:
+        """Create a segment with room for `size` bytes of JSON, with a random name unless one is given."""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER.size + size)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, 0, 0)
+        return cls(shm)
+
+    @property
+    def name(self) -> str:
+        """The name of the segment, to attach readers to it."""
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._shm.size - _HEADER.size
+
+    @property
+    def version(self) -> int:
+        """The version of the config last published, 0 if none was."""
+        return self._seq // 2
+
+    def publish(self, config: Any) -> int:
+        """Publish a new version of the config, a model or JSON-serialisable value, returning its version."""
+        if isinstance(config, BaseModel):
+            payload = config.model_dump_json(by_alias=True, round_trip=True).encode()
+        else:
+            payload = json.dumps(config).encode()
+        if len(payload) > self.capacity:
+            raise ValueError(f"The config is {len(payload)} bytes, larger than the {self.capacity} bytes shared")
+
+        with self._lock:
+            buf = self._shm.buf
+            seq = self._seq + 1
+            _SEQ.pack_into(buf, _SEQ_OFFSET, seq)
+            _HEADER.pack_into(buf, 0, _MAGIC, seq, len(payload))
+            buf[_HEADER.size : _HEADER.size + len(payload)] = payload
+            self._seq = seq + 1
+            _SEQ.pack_into(buf, _SEQ_OFFSET, self._seq)
+            return self._seq // 2
+
+    def close(self):
+        self._shm.close()
+
+    def unlink(self):
+        """Remove the segment, once every reader has attached to it or is done with it."""
+        self._shm.unlink()
+
+    def __enter__(self) -> SharedConfig:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+
+class SharedConfigReader(Generic[M]):
+    """
+    Reads the config published to a SharedConfig, validating each new version once.
+
+    Reading waits for a version being written to be complete, for up to `timeout` seconds, as the publisher
+    may have died while writing it.
+    """
+
+    def __init__(self, name: str, model: Type[M], timeout: float = 1.0):
+        self.model = model
+        self.timeout = timeout
+        self._shm = _attach(name)
+        if bytes(self._shm.buf[: len(_MAGIC)]) != _MAGIC:
+            self._shm.close()
+            raise ValueError(f"Shared memory {name} does not hold a published config")
+        self._version = 0
+        self._config: M | None = None
+
+    @property
+    def version(self) -> int:
+        """The latest published version, 0 if none was. Reading it does not read the config."""
+        return _SEQ.unpack_from(self._shm.buf, _SEQ_OFFSET)[0] // 2
+
+    def read(self, timeout: float | None = None) -> Tuple[int, bytes]:
+        """
+        Return a consistent copy of the latest (version, JSON payload). Raises TimeoutError if none could be
+        read within `timeout` seconds, by default the timeout of the reader.
+        """
+        buf = self._shm.buf
+        capacity = self._shm.size - _HEADER.size
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            _, seq, length = _HEADER.unpack_from(buf, 0)
+            if not seq & 1 and length <= capacity:
+                payload = bytes(buf[_HEADER.size : _HEADER.size + length])
+                # Only valid if no new version started being written while copying it
+                if _SEQ.unpack_from(buf, _SEQ_OFFSET)[0] == seq:
+                    return seq // 2, payload
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not read a complete config from {self._shm.name}, was it being published?")
+            time.sleep(0)
+
+    def get(self) -> M:
+        """The latest published config, only validated again if a new version was published."""
+        if self._config is None or self.version != self._version:
+            version, payload = self.read()
+            if version == 0:
+                raise LookupError("No config has been published yet")
+            self._config = self.model.model_validate_json(payload)
+            self._version = version
+        return self._config
+
+    def close(self):
+        self._config = None
+        self._shm.close()
+
+    def __enter__(self) -> SharedConfigReader[M]:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
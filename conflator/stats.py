@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, NamedTuple
+
+# Called with a span name and attributes, returning a context manager around the span, as
+# opentelemetry's Tracer.start_as_current_span does
+SpanCallback = Callable[[str, Dict[str, Any]], ContextManager[Any]]
+
+
+class StageStats(NamedTuple):
+    wall: float  # seconds
+    cpu: float  # seconds of CPU time used by the whole process, including worker threads
+
+
+class FileStats(NamedTuple):
+    path: Path
+    bytes: int | None  # None if the file does not exist
+    read_time: float  # seconds to read and parse the file, or to load it from the cache
+    parse_time: float  # seconds spent parsing, 0 if it was cached or does not exist
+    loader: str  # "json", "yaml (libyaml)", "yaml (python)", "cache" or "missing"
+
+
+@dataclass
+class LoadStats:
+    """
+    Statistics of a single load, recorded when a Conflator is created with stats=True.
+
+    Stages are "load" (the whole load), "cli", "env", "snapshot", "read", "merge", "validate" and "store",
+    each only if it ran. Validation includes injecting environment variables and CLI arguments.
+    """
+
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    files: List[FileStats] = field(default_factory=list)
+    models_validated: int = 0
+    env_injections: int = 0
+    cli_injections: int = 0
+    span: SpanCallback | None = field(default=None, repr=False, compare=False)
+
+    def _span(self, name: str, attributes: Dict[str, Any]) -> ContextManager[Any]:
+        return self.span("conflator." + name, attributes) if self.span is not None else contextlib.nullcontext()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Time a stage, within a span if a span callback was given. Yields the span, if any."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            with self._span(name, attributes) as span:
+                yield span
+        finally:
+            self.stages[name] = StageStats(time.perf_counter() - wall, time.process_time() - cpu)
+
+    @contextlib.contextmanager
+    def file(self, path: Path) -> Iterator[_FileRecorder]:
+        """Record the reading of a config file, which should be parsed by the wrap()ed parse function."""
+        recorder = _FileRecorder(path)
+        start = time.perf_counter()
+        with self._span("read_file", {"path": str(path)}) as span:
+            try:
+                yield recorder
+            finally:
+                stats = recorder.stats(time.perf_counter() - start)
+                # Files may be read concurrently, appending is thread-safe
+                self.files.append(stats)
+                if hasattr(span, "set_attribute"):
+                    span.set_attribute("bytes", stats.bytes or 0)
+                    span.set_attribute("loader", stats.loader)
+
+    def __str__(self) -> str:
+        lines = [f"{name:<10} {s.wall * 1e3:9.3f} ms wall {s.cpu * 1e3:9.3f} ms cpu" for name, s in self.stages.items()]
+        for f in self.files:
+            size = "missing" if f.bytes is None else f"{f.bytes} bytes"
+            lines.append(f"  {f.path}: {size}, {f.loader}, parsed in {f.parse_time * 1e3:.3f} ms")
+        lines.append(
+            f"{self.models_validated} models validated, "
+            f"{self.env_injections} environment variables and {self.cli_injections} CLI arguments injected"
+        )
+        return "\n".join(lines)
+
+
+class _FileRecorder:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.bytes = None
+        self.parse_time = 0.0
+        self.loader = None
+
+    def wrap(self, parse: Callable[[Path, bytes], Any]) -> Callable[[Path, bytes], Any]:
+        """Wrap a parse function to record the size of the content, the time taken and the loader used."""
+
+        def recording_parse(path: Path, content: bytes) -> Any:
+            from .conflator import yaml_backend
+
+            self.bytes = len(content)
+            self.loader = f"yaml ({yaml_backend()})" if path.suffix in (".yaml", ".yml") else "json"
+            start = time.perf_counter()
+            try:
+                return parse(path, content)
+            finally:
+                self.parse_time = time.perf_counter() - start
+
+        return recording_parse
+
+    def stats(self, read_time: float) -> FileStats:
+        loader, size = self.loader, self.bytes
+        if loader is None:
+            # Not parsed, so either loaded from the cache or missing
+            try:
+                size = self.path.stat().st_size
+                loader = "cache"
+            except OSError:
+                loader = "missing"
+        return FileStats(self.path, size, read_time, self.parse_time, loader)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import types
+import weakref
+from typing import Annotated, Any, Dict, Iterable, List, Literal, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, Field
+from pydantic.fields import FieldInfo
+
+from . import schema
+from .conflator import ConfigModel, _annotation_models, _discover_models
+
+_UNION_TYPES = (Union, getattr(types, "UnionType", Union))
+
+# Subclasses of each class, with the generation of ConfigModel classes they were found in
+_SUBCLASSES: weakref.WeakKeyDictionary[type, Tuple[int, Dict[str, type]]] = weakref.WeakKeyDictionary()
+
+# Root models whose unions were discriminated, with the core schema they had afterwards
+_DISCRIMINATED: weakref.WeakKeyDictionary[type, Any] = weakref.WeakKeyDictionary()
+
+
+def subclasses(base: type) -> Dict[str, type]:
+    """
+    All the subclasses of a class, direct or not, by name, in the order they are found.
+
+    Classes defined again under the same name, e.g. in reloaded modules, replace the earlier ones. The
+    result is cached until a ConfigModel class is created, and shared between calls.
+    """
+    cached = _SUBCLASSES.get(base)
+    if cached is not None and cached[0] == schema._generation:
+        return cached[1]
+    found: Dict[str, type] = {}
+    seen = {base}
+    stack = list(reversed(base.__subclasses__()))
+    while stack:
+        cls = stack.pop()
+        if cls in seen:
+            # Reached again through another base
+            continue
+        seen.add(cls)
+        found.pop(cls.__name__, None)
+        found[cls.__name__] = cls
+        stack.extend(reversed(cls.__subclasses__()))
+    _SUBCLASSES[base] = (schema._generation, found)
+    return found
+
+
+def tagged_union(base: Type[BaseModel], tag: str) -> Any:
+    """
+    The discriminated union of the subclasses of a model that set a Literal tag field, e.g.
+    List[tagged_union(Action, "name")] for a list of actions of any kind, dispatched on their name.
+    """
+    members = tuple(cls for cls in subclasses(base).values() if _tags(cls, tag) is not None)
+    if not members:
+        raise TypeError(f"No subclass of {base.__name__} has a Literal field {tag!r}")
+    if len(members) == 1:
+        return members[0]
+    return Annotated[Union[members], Field(discriminator=tag)]
+
+
+def _tags(model: type, name: str) -> Tuple[Any, ...] | None:
+    """The values of a required Literal field of a model, None if it has no such field."""
+    field = model.model_fields.get(name)
+    if field is None or not field.is_required() or get_origin(field.annotation) is not Literal:
+        return None
+    return get_args(field.annotation)
+
+
+def _common_tag(members: Iterable[type]) -> str | None:
+    """A field that all models of a union have as a required Literal, with values that tell them apart."""
+    members = list(members)
+    for name in members[0].model_fields:
+        values = set()
+        for model in members:
+            tags = _tags(model, name)
+            if tags is None or not values.isdisjoint(tags):
+                break
+            values.update(tags)
+        else:
+            return name
+    return None
+
+
+def _discriminated(t: Any) -> Any:
+    """The annotation with its unions of tagged ConfigModels discriminated, itself if it has none."""
+    origin = get_origin(t)
+    if origin is None or origin is Literal:
+        return t
+    args = get_args(t)
+    if origin is Annotated:
+        if any(isinstance(m, FieldInfo) and m.discriminator is not None for m in t.__metadata__):
+            return t
+        inner = _discriminated(args[0])
+        return t if inner is args[0] else Annotated[(inner, *t.__metadata__)]
+    if origin in _UNION_TYPES:
+        members = [a for a in args if a is not type(None)]
+        if len(members) > 1 and all(isinstance(m, type) and issubclass(m, ConfigModel) for m in members):
+            tag = _common_tag(members)
+            if tag is not None:
+                union = Annotated[Union[tuple(members)], Field(discriminator=tag)]
+                return Optional[union] if len(members) < len(args) else union
+    new = tuple(_discriminated(a) for a in args)
+    if all(a is b for a, b in zip(new, args)):
+        return t
+    if origin in _UNION_TYPES:
+        return Union[new]
+    if hasattr(t, "copy_with"):
+        return t.copy_with(new)
+    return types.GenericAlias(origin, new)
+
+
+def discriminate_unions(root: Type[BaseModel]) -> bool:
+    """
+    Validate the unions of ConfigModels used by a model, that all have a Literal field set to different
+    values, such as the kinds of actions in a list of actions, as discriminated unions on that field.
+
+    Pydantic otherwise tries every model of a union in turn for each value, while a discriminated union
+    looks the model up by its tag. Fields are only changed where pydantic would accept the same values
+    either way, as the tags are required. The models are rebuilt, their sub-models first. Returns whether
+    any union was discriminated; done once per root model until it is rebuilt.
+
+    The model classes are changed in place, so this applies to every later validation of the models in the
+    process, with or without a Conflator, and their validation errors for values whose tag is invalid or
+    missing are those of discriminated unions.
+    """
+    core_schema = getattr(root, "__pydantic_core_schema__", None)
+    if _DISCRIMINATED.get(root) is core_schema:
+        return False
+    changed = set()
+    for model in _discover_models(root):
+        for field in model.model_fields.values():
+            if field.discriminator is not None:
+                continue
+            annotation = _discriminated(field.annotation)
+            if annotation is not field.annotation:
+                # model_rebuild(force=True) builds the schema from the model's FieldInfos, as of pydantic 2.6
+                field.annotation = annotation
+                changed.add(model)
+    if changed:
+        # Models embed the core schemas of their sub-models when they are built, so the models using the
+        # changed ones are rebuilt too, after them
+        for model, children in _dependencies_first(root):
+            if model in changed or not changed.isdisjoint(children):
+                model.model_rebuild(force=True)
+                changed.add(model)
+    _DISCRIMINATED[root] = root.__pydantic_core_schema__
+    return bool(changed)
+
+
+def _dependencies_first(root: Type[BaseModel]) -> List[Tuple[Type[BaseModel], List[Type[BaseModel]]]]:
+    """
+    The pydantic models used by a model, including itself, with the models used by their fields, each after
+    those (but for recursive models).
+    """
+    order = []
+    seen = {root}
+    stack = [(root, _field_models(root), 0)]
+    while stack:
+        model, children, i = stack.pop()
+        while i < len(children) and children[i] in seen:
+            i += 1
+        if i < len(children):
+            child = children[i]
+            seen.add(child)
+            stack.append((model, children, i + 1))
+            stack.append((child, _field_models(child), 0))
+        else:
+            order.append((model, children))
+    return order
+
+
+def _field_models(model: Type[BaseModel]) -> List[Type[BaseModel]]:
+    return [m for field in model.model_fields.values() for m in _annotation_models(field.annotation, model)[0]]
@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from .diff import diff
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from pydantic import BaseModel
+
+    from .conflator import Conflator
+
+# inotify(7) event masks
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ONLYDIR = 0x01000000
+
+# Config files are watched through their directories, as editors and tools such as Kubernetes replace
+# files (or the symlinks to them) by renaming rather than writing to them in place
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal inotify bindings through ctypes, watching directories for changes to named entries."""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._ctypes = ctypes
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, directory: Path) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(directory))
+        return wd
+
+    def read(self) -> List[Tuple[int, int, str]]:
+        """Return the pending (watch descriptor, mask, name) events, without blocking."""
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(buf[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _inotify_available() -> bool:
+    return sys.platform.startswith("linux")
+
+
+def _stat_key(path: Path) -> Tuple[int, int, int, int] | None:
+    # Following symlinks, so that swapping the target of a symlinked config file is a change too
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino, st.st_dev
+
+
+class _Subscription(NamedTuple):
+    callback: Callable[[Any, Any], Any]
+    loop: asyncio.AbstractEventLoop | None
+    on_error: Callable[[Exception], Any] | None
+    paths: Tuple[str, ...] | None
+
+
+class ConfigWatcher:
+    """
+    Watches the config files of a Conflator, and the files they include, and reloads the configuration when
+    they change.
+
+    Changes are detected with inotify on Linux, by watching the directories of the config files, and by
+    polling their modification times otherwise (or for files whose directory does not exist yet). Bursts
+    of changes are debounced into a single reload, for which only the files that changed are parsed again.
+    The merged config is then re-validated incrementally, see Conflator.reload, and the new configuration
+    replaces the previous one as a whole, so `config` always returns a complete, valid configuration.
+
+    If a changed file cannot be parsed, or the configuration fails to validate, the previous configuration
+    is kept and the error is logged and passed to the error callbacks of the subscribers.
+
+    The CLI arguments and environment are read once, when the watcher starts. The Conflator should not be
+    used to load the configuration otherwise while it is being watched.
+
+        with ConfigWatcher(Conflator("app", Config)) as watcher:
+            watcher.subscribe(lambda old, new: print(f"Config changed to {new}"))
+            serve(lambda: watcher.config)
+    """
+
+    def __init__(
+        self,
+        conflator: Conflator,
+        debounce: float = 0.2,
+        poll_interval: float = 1.0,
+        use_inotify: bool | None = None,
+    ):
+        """
+        :param conflator: The Conflator whose config files to watch.
+        :param debounce: Seconds to wait for further changes after a change, before reloading.
+        :param poll_interval: Seconds between checks of the files that are polled rather than watched.
+        :param use_inotify: Whether to use inotify, by default if the platform supports it.
+        """
+        self.conflator = conflator
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = _inotify_available() if use_inotify is None else use_inotify
+        # The error of the last failed reload, reset by a successful one
+        self.last_error: Exception | None = None
+
+        self._config: BaseModel | None = None
+        self._subscriptions: List[_Subscription] = []
+        # Serialises reloads and their notifications; re-entrant so that callbacks may call refresh()
+        self._lock = threading.RLock()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+        self._files: List[Path] = []
+        self._layers: Dict[Path, Any] = {}
+        self._stat_keys: Dict[Path, Tuple[int, int, int, int] | None] = {}
+        # Files that changed but could not be parsed, retried with the next change
+        self._dirty: Set[Path] = set()
+        self._inotify: _Inotify | None = None
+        self._watches: Dict[int, Path] = {}
+        self._watched: Dict[Path, Set[Path]] = {}
+        # Polled files, with their state when last polled
+        self._polled: Dict[Path, Tuple[int, int, int, int] | None] = {}
+        self._next_poll = 0.0
+        self._wake: Tuple[int, int] | None = None
+
+    @property
+    def config(self) -> BaseModel:
+        """The current configuration. Hold on to the returned object for a consistent view of it."""
+        if self._config is None:
+            raise RuntimeError("The watcher has not been started")
+        return self._config
+
+    def subscribe(
+        self,
+        callback: Callable[[Any, Any], Any],
+        loop: asyncio.AbstractEventLoop | None = None,
+        on_error: Callable[[Exception], Any] | None = None,
+        paths: str | Iterable[str] | None = None,
+    ) -> Callable[[], None]:
+        """
+        Call `callback(old, new)` whenever the configuration changes, and `on_error(exception)` whenever a
+        reload fails.
+
+        Callbacks are called in the watcher thread, in order, unless an event loop is given, in which case
+        they are scheduled on it with call_soon_threadsafe, or as tasks if they are coroutine functions.
+
+        :param paths: Only call `callback` if something under one of these paths changed, e.g. "server" or
+            "sinks[0].path", see diff.diff.
+        :return: A function that cancels the subscription.
+        """
+        if isinstance(paths, str):
+            paths = (paths,)
+        subscription = _Subscription(callback, loop, on_error, None if paths is None else tuple(paths))
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+        return unsubscribe
+
+    def start(self) -> BaseModel:
+        """Load the configuration and start watching its files, returning the initial configuration."""
+        if self._thread is not None:
+            raise RuntimeError("The watcher has already been started")
+        conflator = self.conflator
+        self._context, files = conflator._prepare()
+        # A file may be given more than once, it is still only watched and parsed once
+        self._files = [Path(os.path.abspath(f)) for f in files]
+        unique = list(dict.fromkeys(self._files))
+
+        # Record the state of the files before reading them, so that no change goes unnoticed
+        self._stat_keys = {f: _stat_key(f) for f in unique}
+        self._layers = dict(zip(unique, conflator._read_layers(unique)))
+        self._config = conflator._conflate(self._context, self._expand(), None)
+
+        # The files they include are watched too
+        self._setup_watches(list(self._layers))
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="conflator-watcher", daemon=True)
+        self._thread.start()
+        return self._config
+
+    def stop(self, timeout: float | None = None):
+        """Stop watching, waiting for a reload in progress to finish. The watcher can be started again."""
+        self._stopped.set()
+        if self._wake is not None:
+            os.write(self._wake[1], b"\0")
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if self._wake is not None:
+            for fd in self._wake:
+                os.close(fd)
+            self._wake = None
+        # Watches belong to the closed inotify instance, a restart sets them up again
+        self._watches.clear()
+        self._watched.clear()
+        self._polled.clear()
+
+    def __enter__(self) -> ConfigWatcher:
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def refresh(self, paths: List[Path] | None = None) -> bool:
+        """
+        Reload the configuration now if any of the given files, by default any config file, has changed
+        since it was last read, regardless of whether a change was detected. Returns whether it changed.
+        """
+        paths = list(self._stat_keys) if paths is None else [Path(os.path.abspath(p)) for p in paths]
+        return self._apply({p for p in paths if self._changed(p)})
+
+    def _expand(self) -> List[Tuple[Path, Any]]:
+        """The config files and the files they include, in the order they are merged."""
+        files = [(f, self._layers[f]) for f in self._files]
+        if self.conflator.include_key is None:
+            return files
+        from .includes import expand_includes
+
+        return expand_includes(files, self.conflator.include_key, self._read_included)
+
+    def _read_included(self, path: Path) -> Any:
+        # Included files are only read once, and then again when they change, like the config files
+        if path not in self._layers:
+            self._stat_keys[path] = _stat_key(path)
+            self._layers[path] = self.conflator._read_config_file(path)
+            # Newly included by a change, as those included initially are watched once they are all read
+            if self._thread is threading.current_thread() and self._inotify is not None:
+                self._watch(path)
+            elif self._thread is not None:
+                # Watches are only changed by the watcher thread, which watches polled files when it polls them
+                self._polled[path] = self._stat_keys[path]
+                self._next_poll = 0.0
+                if self._wake is not None:
+                    os.write(self._wake[1], b"\1")
+        return self._layers[path]
+
+    def _setup_watches(self, files: List[Path]):
+        if not self.use_inotify:
+            self._polled = {f: self._stat_keys[f] for f in files}
+            return
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError) as e:
+            logging.debug(f"inotify is not available, polling config files instead: {e}")
+            self._polled = {f: self._stat_keys[f] for f in files}
+            return
+        self._wake = os.pipe()
+        for f in files:
+            self._watch(f)
+
+    def _watch(self, path: Path) -> bool:
+        """Watch the directory of path with inotify, or poll the file if that is not possible."""
+        directory = path.parent
+        if directory not in self._watched:
+            try:
+                wd = self._inotify.add_watch(directory)
+            except OSError as e:
+                logging.debug(f"Polling {path}, cannot watch {directory}: {e}")
+                self._polled[path] = self._stat_keys.get(path)
+                return False
+            self._watches[wd] = directory
+            self._watched[directory] = set()
+        self._watched[directory].add(path)
+        self._polled.pop(path, None)
+        return True
+
+    def _changed(self, path: Path) -> bool:
+        return path in self._dirty or _stat_key(path) != self._stat_keys.get(path)
+
+    def _run(self):
+        while True:
+            changed = self._wait(None)
+            if changed is None:
+                return
+            if not changed:
+                continue
+            # Wait until no further changes arrive within the debounce period, to reload once per burst
+            deadline = time.monotonic() + self.debounce
+            while (remaining := deadline - time.monotonic()) > 0:
+                more = self._wait(remaining)
+                if more is None:
+                    return
+                if more:
+                    changed |= more
+                    deadline = time.monotonic() + self.debounce
+            try:
+                self._apply(changed)
+            except Exception:
+                logging.exception("Unexpected error while reloading the configuration")
+
+    def _wait(self, timeout: float | None) -> Set[Path] | None:
+        """Block until files may have changed or timeout expires, returning the changed files or None if stopped."""
+        if self._polled:
+            until_poll = max(0.0, self._next_poll - time.monotonic())
+            timeout = until_poll if timeout is None else min(timeout, until_poll)
+
+        if self._inotify is None:
+            if self._stopped.wait(timeout):
+                return None
+            changed = set()
+        else:
+            ready, _, _ = select.select([self._wake[0], self._inotify.fd], [], [], timeout)
+            if self._stopped.is_set():
+                return None
+            if self._wake[0] in ready:
+                # Woken up to poll files included since
+                os.read(self._wake[0], 64)
+            changed = self._read_events() if self._inotify.fd in ready else set()
+
+        if self._polled and time.monotonic() >= self._next_poll:
+            self._next_poll = time.monotonic() + self.poll_interval
+            for path, seen in list(self._polled.items()):
+                # Start watching files whose directory has since been created
+                if self._inotify is not None and path.parent.is_dir() and self._watch(path):
+                    changed.add(path)
+                    continue
+                key = _stat_key(path)
+                if key != seen:
+                    self._polled[path] = key
+                    changed.add(path)
+        return changed
+
+    def _read_events(self) -> Set[Path]:
+        changed = set()
+        for wd, mask, name in self._inotify.read():
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost, so check every watched file
+                changed.update(p for paths in self._watched.values() for p in paths if self._changed(p))
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            paths = self._watched[directory]
+            if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                # The directory itself has gone, so poll its files until it comes back
+                del self._watches[wd]
+                del self._watched[directory]
+                self._polled.update((p, None) for p in paths)
+                changed.update(paths)
+                continue
+            named = directory / name
+            if named in paths:
+                changed.add(named)
+            else:
+                # Another entry, such as the target of a symlinked config file, so check them all
+                changed.update(p for p in paths if self._changed(p))
+        return changed
+
+    def _apply(self, changed: Set[Path]) -> bool:
+        """Re-parse the changed files, then re-merge and re-validate, swapping in the result if it is valid."""
+        changed = changed | self._dirty
+        if not changed:
+            return False
+        conflator = self.conflator
+        with self._lock:
+            old = self._config
+            loaded_config = conflator.loaded_config
+            errors = []
+            for path in changed:
+                self._stat_keys[path] = _stat_key(path)
+                try:
+                    self._layers[path] = conflator._read_config_file(path)
+                    self._dirty.discard(path)
+                except Exception as e:
+                    # Keep the last successfully parsed contents, and try again on the next change
+                    self._dirty.add(path)
+                    errors.append(e)
+
+            try:
+                if errors:
+                    raise errors[0]
+                conflator._merge_sources(self._context, self._expand())
+                new = conflator._validate(self._context, old)
+            except Exception as e:
+                conflator.loaded_config = loaded_config
+                self.last_error = e
+                logging.error(f"Keeping the previous configuration, reloading it failed: {e}")
+                for s in self._subscriptions:
+                    if s.on_error is not None:
+                        self._dispatch(s.on_error, s.loop, e)
+                return False
+
+            self.last_error = None
+            if new is old:
+                return False
+            self._config = new
+            logging.info(f"Reloaded the configuration after changes to {', '.join(sorted(map(str, changed)))}")
+            differences = None
+            for s in self._subscriptions:
+                if s.paths is not None:
+                    # Only compared if a subscriber is interested in specific paths, and then only once
+                    if differences is None:
+                        differences = diff(old, new)
+                    if not differences.affects(s.paths):
+                        continue
+                self._dispatch(s.callback, s.loop, old, new)
+            return True
+
+    @staticmethod
+    def _dispatch(callback: Callable, loop: asyncio.AbstractEventLoop | None, *args: Any):
+        try:
+            if loop is None:
+                callback(*args)
+                return
+            import asyncio
+
+            if asyncio.iscoroutinefunction(callback):
+                asyncio.run_coroutine_threadsafe(callback(*args), loop)
+            else:
+                loop.call_soon_threadsafe(callback, *args)
+        except Exception:
+            logging.exception(f"Error in config watcher callback {callback!r}")
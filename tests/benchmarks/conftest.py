@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+
+class Bench:
+    def __init__(self, request):
+        self.name = request.node.name
+        self.config = request.config
+
+    def __call__(self, fn, *args, repeat=5, number=1, label=None, **kwargs):
+        """Best-of-`repeat` wall time in seconds for `number` calls of fn(*args, **kwargs)."""
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn(*args, **kwargs)
+            best = min(best, (time.perf_counter() - start) / number)
+        return self.record(best, label or fn.__name__)
+
+    def record(self, seconds, label):
+        """Report a timing measured otherwise, comparing it with the baseline if there is one."""
+        name = f"{self.name}[{label}]"
+        self.config.benchmark_results[name] = seconds
+        baseline = self.config.benchmark_baseline.get(name)
+        if baseline is None:
+            print(f"{name}: {seconds * 1e3:.3f} ms")
+            return seconds
+        ratio = seconds / baseline
+        print(f"{name}: {seconds * 1e3:.3f} ms, {ratio:.2f}x baseline")
+        tolerance = self.config.getoption("--conflator-bench-tolerance")
+        if ratio > tolerance:
+            pytest.fail(f"{name} regressed: {seconds * 1e3:.3f} ms vs {baseline * 1e3:.3f} ms in the baseline")
+        return seconds
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request)
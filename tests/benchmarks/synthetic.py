@@ -0,0 +1,64 @@
+"""Generators of synthetic models and matching configs for the benchmarks."""
+
+from typing import Annotated, List, Literal, Union
+
+from pydantic import Field, create_model
+
+from conflator import ConfigModel, EnvVar
+
+
+def wide_model(n_fields):
+    """A flat model of n_fields int, str and list fields, every third of them settable from the environment."""
+    types = [(int, 0), (str, ""), (List[int], [])]
+    fields = {}
+    for i in range(n_fields):
+        t, default = types[i % 3]
+        fields[f"field_{i}"] = (Annotated[t, EnvVar(f"FIELD_{i}")] if i % 3 == 0 else t, default)
+    return create_model(f"Wide{n_fields}", __base__=ConfigModel, **fields)
+
+
+def wide_config(n_fields, layer=0):
+    values = [lambda i: i + layer, lambda i: f"value-{i}-{layer}", lambda i: [i, layer]]
+    return {f"field_{i}": values[i % 3](i) for i in range(n_fields)}
+
+
+def deep_model(depth, n_siblings=3):
+    """Models nested depth deep, each with n_siblings scalar fields and a child."""
+    model = create_model("Deep0", __base__=ConfigModel, **{f"value_{j}": (int, 0) for j in range(n_siblings)})
+    for d in range(1, depth + 1):
+        fields = {f"value_{j}": (int, 0) for j in range(n_siblings)}
+        model = create_model(f"Deep{d}", __base__=ConfigModel, child=(model, None), **fields)
+    return model
+
+
+def deep_config(depth, n_siblings=3, layer=0):
+    node = {f"value_{j}": j + layer for j in range(n_siblings)}
+    for _ in range(depth):
+        node = {"child": node, **{f"value_{j}": j + layer for j in range(n_siblings)}}
+    return node
+
+
+def union_model(n_kinds, discriminated=True):
+    """A list of actions discriminated by their name, as in tests/test_subclasses.py, or of a plain union of them."""
+    kinds = tuple(
+        create_model(
+            f"Action{k}",
+            __base__=ConfigModel,
+            name=(Literal[f"action-{k}"], ...),
+            enabled=(bool, True),
+            weight=(float, 1.0),
+            tags=(List[str], []),
+        )
+        for k in range(n_kinds)
+    )
+    action = Annotated[Union[kinds], Field(discriminator="name")] if discriminated else Union[kinds]
+    return create_model(f"Actions{n_kinds}", __base__=ConfigModel, actions=(List[action], []))
+
+
+def union_config(n_kinds, n_items):
+    return {
+        "actions": [
+            {"name": f"action-{i % n_kinds}", "enabled": i % 2 == 0, "weight": i / 3, "tags": [f"t{i % 7}"]}
+            for i in range(n_items)
+        ]
+    }
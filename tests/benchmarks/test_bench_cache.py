@@ -0,0 +1,54 @@
+from typing import List
+
+import pytest
+import yaml
+
+from conflator import ConfigModel, Conflator
+
+
+class Sink(ConfigModel):
+    kind: str
+    path: str
+
+
+class Worker(ConfigModel):
+    name: str
+    enabled: bool
+    threads: int
+    tags: List[str]
+    sink: Sink
+
+
+class Config(ConfigModel):
+    workers: List[Worker] = []
+
+
+@pytest.fixture(scope="module")
+def config_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("config") / "config.yaml"
+    workers = [
+        {
+            "name": f"worker-{i}",
+            "enabled": i % 2 == 0,
+            "threads": i % 16,
+            "tags": [f"tag-{j}" for j in range(5)],
+            "sink": {"kind": "file", "path": f"/var/lib/app/{i}.out"},
+        }
+        for i in range(2_000)
+    ]
+    path.write_text(yaml.safe_dump({"workers": workers}))
+    return path
+
+
+@pytest.mark.parametrize("mode", ["uncached", "file_cache", "snapshot_cache"])
+def test_cached_load(tmp_path, bench, config_file, mode):
+    options = {"cache": tmp_path} if mode != "uncached" else {}
+    if mode == "snapshot_cache":
+        options["snapshot_cache"] = True
+
+    def load():
+        return Conflator("bench", Config, cli=False, config_file=config_file, **options).load()
+
+    # Warm up the caches
+    assert len(load().workers) == 2_000
+    bench(load, repeat=5, label=mode)
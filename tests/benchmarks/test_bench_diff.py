@@ -0,0 +1,29 @@
+import copy
+
+from conflator import diff
+
+
+def tree(n_groups, n_leaves):
+    return {
+        f"group_{g}": {"items": [{"name": f"item-{i}", "port": i} for i in range(n_leaves)]} for g in range(n_groups)
+    }
+
+
+def test_diff_100k_leaves(bench):
+    # 100 groups of 500 items of 2 leaves
+    old = tree(100, 500)
+    new = copy.deepcopy(old)
+    new["group_50"]["items"][250]["port"] = -1
+    assert diff(old, new).changed == ["group_50.items[250].port"]
+    bench(diff, old, new, label="equal copies")
+
+    # As shared by merge and reload, unchanged subtrees are the same objects
+    shared = {**old, "group_50": new["group_50"]}
+    bench(diff, old, shared, label="shared subtrees")
+
+    everything = tree(100, 500)
+    for group in everything.values():
+        for item in group["items"]:
+            item["port"] += 1
+    assert len(diff(old, everything).changed) == 50_000
+    bench(diff, old, everything, label="all changed")
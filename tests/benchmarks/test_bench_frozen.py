@@ -0,0 +1,46 @@
+import gc
+import json
+import tracemalloc
+
+from synthetic import union_config, union_model
+
+from conflator import freeze
+
+KINDS, ITEMS = 10, 20_000
+
+
+def retained(build):
+    """Bytes allocated by build() that are still allocated afterwards, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+def test_memory_and_access(bench):
+    model = union_model(KINDS)
+    text = json.dumps(union_config(KINDS, ITEMS))
+
+    model_size, config = retained(lambda: model.model_validate(json.loads(text)))
+    frozen_size, frozen = retained(lambda: freeze(model.model_validate(json.loads(text))))
+    ratio = model_size / frozen_size
+    print(f"models: {model_size / 1e6:.1f} MB, frozen: {frozen_size / 1e6:.1f} MB, {ratio:.1f}x smaller")
+    assert frozen_size * 3 < model_size
+
+    def read(config):
+        total = 0.0
+        for action in config.actions:
+            total += action.weight
+            if action.enabled and action.tags[0] == "t1":
+                total += 1
+        return total
+
+    assert read(frozen) == read(config)
+    bench(read, config, label="model access")
+    bench(read, frozen, label="frozen access")
+    bench(freeze, config, label="freeze")
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+# Budget for importing conflator once pydantic itself has been imported and warmed up, in seconds
+IMPORT_BUDGET = 0.05
+
+WARM_PYDANTIC = """
+from pydantic import BaseModel, model_validator
+
+class Warmup(BaseModel):
+    x: int = 0
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def wrap(cls, value, handler, info):
+        return handler(value)
+"""
+
+TIMED_IMPORT = """
+import time
+
+start = time.perf_counter()
+import conflator
+print(time.perf_counter() - start)
+"""
+
+
+def test_import_time(bench):
+    # Each import runs in a fresh interpreter, the best of a few is compared with the budget
+    times = []
+    for _ in range(5):
+        result = subprocess.run(
+            [sys.executable, "-c", WARM_PYDANTIC + TIMED_IMPORT], capture_output=True, text=True, check=True
+        )
+        times.append(float(result.stdout))
+    seconds = bench.record(min(times), "import conflator")
+    assert seconds < IMPORT_BUDGET
@@ -0,0 +1,271 @@
+import contextlib
+import io
+import json
+import subprocess
+import sys
+from typing import Annotated
+
+import pytest
+import yaml
+from pydantic import create_model
+from pydantic.json_schema import DEFAULT_REF_TEMPLATE
+from synthetic import deep_config, deep_model, union_config, union_model, wide_config, wide_model
+
+from conflator import ConfigModel, Conflator, ConflatorValidationError, Lazy
+from conflator.conflator import _MODELS
+from conflator.merge import merge
+from conflator.paths import apply_settings, parse_setting
+from conflator.schema import _models_schema, write_schemas
+from conflator.subclasses import discriminate_unions
+
+WIDE = 1_000
+# Deeper models exceed the recursion limit of pydantic when generating their schema
+DEEP = 20
+KINDS, ITEMS = 10, 5_000
+
+
+@pytest.fixture(scope="module")
+def models():
+    return {"wide": wide_model(WIDE), "deep": deep_model(DEEP), "union": union_model(KINDS)}
+
+
+@pytest.fixture(scope="module")
+def configs():
+    return {"wide": wide_config(WIDE), "deep": deep_config(DEEP), "union": union_config(KINDS, ITEMS)}
+
+
+def write(path, config):
+    path.write_text(yaml.safe_dump(config) if path.suffix == ".yaml" else json.dumps(config))
+    return path
+
+
+@pytest.mark.parametrize("shape", ["wide", "deep", "union"])
+def test_load(tmp_path, monkeypatch, bench, models, configs, shape):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    path = write(tmp_path / "config.json", configs[shape])
+
+    def load():
+        return Conflator("bench", models[shape], config_file=path).load()
+
+    load()
+    bench(load, label=shape)
+
+
+@pytest.mark.parametrize("shape", ["wide", "deep", "union"])
+def test_schema(bench, models, shape):
+    conflator = Conflator("bench", models[shape], cli=False)
+    bench(models[shape].model_json_schema, label=shape)
+    bench(conflator.schema, label=f"{shape}, cached")
+
+
+def test_schemas_of_many_models(tmp_path, bench):
+    # Models sharing most of their sub-models, as for the commands of an application
+    wide, deep = wide_model(WIDE // 10), deep_model(DEEP)
+    apps = [create_model(f"App{i}", __base__=ConfigModel, wide=(wide, None), deep=(deep, None)) for i in range(20)]
+    bench(lambda: [m.model_json_schema() for m in apps], label="separately")
+    batch = _models_schema.__wrapped__
+    bench(lambda: batch(tuple(apps), (), True, DEFAULT_REF_TEMPLATE, "validation", 0), label="batch")
+    bench(write_schemas, apps, tmp_path, label="write_schemas, cached")
+
+
+@pytest.mark.parametrize("suffix", [".json", ".yaml"])
+def test_from_file(tmp_path, bench, configs, suffix):
+    path = write(tmp_path / f"config{suffix}", configs["union"])
+    bench(Conflator._from_file, path, label=suffix[1:])
+
+
+def test_many_layers(tmp_path, monkeypatch, bench, models):
+    # 50 -f layers, each overriding a tenth of the fields of a wide model
+    argv = ["prog"]
+    for layer in range(50):
+        config = {k: v for i, (k, v) in enumerate(wide_config(WIDE, layer).items()) if i % 10 == layer % 10}
+        argv += ["-f", str(write(tmp_path / f"layer{layer}.json", config))]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    def load():
+        return Conflator("bench", models["wide"], config_file=tmp_path / "missing.json").load()
+
+    assert load().field_0 == 40
+    bench(load, label="load")
+    layers = [Conflator._from_file(tmp_path / f"layer{layer}.json") for layer in range(50)]
+    bench(merge, *layers, label="merge")
+    bench(lambda: [Conflator._merge(a, b) for a, b in zip(layers, layers[1:])], label="_merge")
+
+
+def test_long_set_list(monkeypatch, bench, models):
+    argv = ["prog"]
+    for i in range(0, WIDE, 3):
+        argv += ["--set", f"field_{i}={i * 2}"]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    def load():
+        return Conflator("bench", models["wide"], cli=True, config_file="missing.json").load()
+
+    assert load().field_3 == 6
+    bench(load, label=f"{len(argv) // 2} settings")
+
+
+def test_apply_settings(bench, configs):
+    # Nested settings into a large config, applied at once or merged one by one as they were before
+    config = {"wide": configs["wide"], "deep": configs["deep"], "actions": configs["union"]["actions"]}
+    texts = [f"wide.field_{i}={i}" for i in range(0, WIDE, 3)]
+    texts += [".".join(["deep"] + ["child"] * d + [f"value_{d % 3}"]) + f"={d}" for d in range(DEEP)]
+    settings = [parse_setting(t) for t in texts]
+
+    def one_by_one():
+        result = config
+        for text in texts:
+            path, value = text.split("=")
+            result = Conflator._merge(result, Conflator._dot_path_to_nested_dict(path, value))
+        return result
+
+    assert one_by_one() == apply_settings(config, settings)
+    bench(one_by_one, repeat=3, label=f"{len(texts)} settings, merged one by one")
+    bench(apply_settings, config, settings, label=f"{len(texts)} settings, at once")
+    bench(lambda: [parse_setting(t) for t in texts], label="parse")
+
+    indexed = [parse_setting(f"actions[{i}].weight:=2.0") for i in range(0, ITEMS, 10)]
+    bench(apply_settings, config, indexed, label=f"{len(indexed)} list items")
+
+
+def test_large_environment(monkeypatch, bench, models):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    # Variables for the model's fields, among many unrelated ones
+    for i in range(0, WIDE, 3):
+        monkeypatch.setenv(f"BENCH_FIELD_{i}", str(i))
+    for i in range(10_000):
+        monkeypatch.setenv(f"UNRELATED_{i}", "x")
+
+    def load():
+        return Conflator("bench", models["wide"], config_file="missing.json").load()
+
+    assert load().field_3 == 3
+    bench(load, label="load")
+
+
+def test_import_time(bench):
+    def import_conflator():
+        subprocess.run([sys.executable, "-c", "import conflator"], check=True)
+
+    interpreter = bench(subprocess.run, [sys.executable, "-c", "pass"], check=True, label="interpreter")
+    total = bench(import_conflator, label="python -c 'import conflator'")
+    bench.record(total - interpreter, "import conflator")
+
+
+@pytest.mark.parametrize("suffix", [".json", ".yaml"])
+def test_provenance_overhead(tmp_path, monkeypatch, bench, models, configs, suffix):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    path = write(tmp_path / f"config{suffix}", configs["union"])
+
+    for provenance in (False, True):
+        conflator = Conflator("bench", models["union"], config_file=path, provenance=provenance)
+        bench(conflator.load, repeat=3, label=f"provenance={provenance}")
+    assert len(list(conflator.provenance.items())) == ITEMS * 4
+
+
+def test_lazy_load(tmp_path, monkeypatch, bench, models, configs):
+    # A small config alongside a large section that is only validated when read
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    actions = models["union"].model_fields["actions"].annotation
+    model = create_model(
+        "LazyActions", __base__=ConfigModel, level=(str, "info"), actions=(Annotated[actions, Lazy()], [])
+    )
+    path = write(tmp_path / "config.json", {"level": "debug", **configs["union"]})
+
+    for lazy in (False, True):
+        conflator = Conflator("bench", model, config_file=path, lazy=lazy)
+        bench(lambda: conflator.load().level, label=f"lazy={lazy}")
+    bench(lambda: len(conflator.load().actions), label="lazy, then read")
+
+
+def test_find_models(bench):
+    # A discriminated union of several hundred models, as generated from their subclasses
+    model = union_model(500)
+
+    def uncached():
+        _MODELS.clear()
+        return Conflator._find_models(model)
+
+    assert len(uncached()) == 501
+    bench(uncached, label="500 models")
+    bench(Conflator._find_models, model, label="500 models, cached")
+
+
+def test_discriminate_unions(bench):
+    # A list of 10k items of a union of 500 models, written without a discriminator. Pydantic tries the
+    # models in turn for each item, which takes too long for more than a tenth of them.
+    model, config = union_model(500, discriminated=False), union_config(500, 10_000)
+    bench(model.model_validate, {"actions": config["actions"][:1_000]}, repeat=1, label="500 kinds, union, 1k items")
+    bench(discriminate_unions, model, repeat=1, label="discriminate")
+    assert len(model.model_validate(config).actions) == 10_000
+    bench(model.model_validate, config, label="500 kinds, discriminated, 10k items")
+
+
+@pytest.mark.parametrize("suffix", [".json", ".yaml"])
+def test_load_many(tmp_path, bench, models, suffix):
+    # The small configs of many tenants
+    tenants = 2_000
+    sources = [write(tmp_path / f"tenant{i}{suffix}", union_config(KINDS, 20)) for i in range(tenants)]
+
+    def one_by_one():
+        return [Conflator("bench", models["union"], cli=False, config_file=source).load() for source in sources]
+
+    results = Conflator.load_many(models["union"], sources)
+    assert all(r.ok for r in results) and len(results[0].config.actions) == 20
+    for label, kwargs in [("threads", {}), ("processes", {"processes": True})]:
+        seconds = bench(Conflator.load_many, models["union"], sources, repeat=3, label=label, **kwargs)
+        print(f"{label}: {tenants / seconds:.0f} configs/s")
+    seconds = bench(one_by_one, repeat=1, label="one by one")
+    print(f"one by one: {tenants / seconds:.0f} configs/s")
+
+
+def test_validation_errors(tmp_path, bench, models, configs):
+    # Loads of an invalid config, as by a validator of many configs, printing the errors or raising them
+    config = {"actions": [{**action, "weight": "heavy"} for action in configs["union"]["actions"][:100]]}
+    path = write(tmp_path / "config.json", config)
+
+    def printed():
+        conflator = Conflator("bench", models["union"], cli=False, config_file=path)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):
+            conflator.load()
+
+    def raised():
+        conflator = Conflator("bench", models["union"], cli=False, config_file=path, exit_on_error=False)
+        with contextlib.suppress(ConflatorValidationError):
+            conflator.load()
+
+    bench(printed, label="print and exit")
+    bench(raised, label="raise")
+
+
+def test_includes(tmp_path, monkeypatch, bench, models):
+    # 50 groups of a wide config, each including 20 of 100 shared fragments
+    fragments = [write(tmp_path / f"fragment{i}.yaml", wide_config(WIDE // 10, i)) for i in range(100)]
+    groups = {}
+    for g in range(50):
+        included = [fragments[(g * 7 + j) % 100] for j in range(20)]
+        groups[write(tmp_path / f"group{g}.yaml", {"include": [f.name for f in included], "field_0": g})] = included
+    main = write(tmp_path / "main.yaml", {"include": [group.name for group in groups]})
+
+    def load(**kwargs):
+        return Conflator("bench", models["wide"], config_file=main, include_key="include", **kwargs).load()
+
+    # The same files spliced into -f arguments, each fragment once, where the includes merge it
+    argv, seen = ["prog"], set()
+    for group, included in groups.items():
+        for fragment in included:
+            if fragment not in seen:
+                seen.add(fragment)
+                argv += ["-f", str(fragment)]
+        argv += ["-f", str(group)]
+
+    def spliced():
+        return Conflator("bench", models["wide"], config_file=tmp_path / "missing.json").load()
+
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    included = load()
+    bench(load, label="150 files, included")
+    bench(load, parallel=True, label="150 files, included, parallel")
+    monkeypatch.setattr(sys, "argv", argv)
+    assert spliced() == included
+    bench(spliced, label="150 files, -f")
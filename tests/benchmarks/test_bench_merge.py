@@ -0,0 +1,78 @@
+import copy
+
+import pytest
+
+from conflator.merge import merge
+
+
+def legacy_merge(a, b):
+    """The previous in-place Conflator._merge, for comparison."""
+    if not isinstance(b, dict):
+        if isinstance(a, list) and isinstance(b, list):
+            return a + b
+        a = b
+
+    for key in b:
+        if key in a:
+            if b[key] is None:
+                del a[key]
+            elif isinstance(a[key], dict) and isinstance(b[key], dict):
+                a[key] = legacy_merge(a[key], b[key])
+            elif isinstance(a[key], list) and isinstance(b[key], list):
+                a[key] = a[key] + b[key]
+            elif a[key] == b[key]:
+                pass
+            else:
+                a[key] = b[key]
+        else:
+            if b[key] is not None:
+                a[key] = b[key]
+    return a
+
+
+def wide_layers(n_layers, n_items):
+    return [
+        {
+            "sources": [{"name": f"source-{layer}-{i}", "port": i} for i in range(n_items)],
+            "sinks": [{"name": f"sink-{layer}-{i}"} for i in range(n_items)],
+            "settings": {f"key_{i}": layer for i in range(n_items)},
+        }
+        for layer in range(n_layers)
+    ]
+
+
+def deep_layers(n_layers, depth):
+    layers = []
+    for layer in range(n_layers):
+        node = {"leaf": layer, "values": [layer]}
+        for d in range(depth):
+            node = {f"level_{d}": node, f"sibling_{d}": {"value": layer}}
+        layers.append(node)
+    return layers
+
+
+@pytest.mark.parametrize(
+    "name,layers",
+    [
+        ("wide", wide_layers(10, 5_000)),
+        ("deep", deep_layers(10, 200)),
+    ],
+)
+def test_merge_layers(bench, name, layers):
+    # The legacy merge mutates its inputs, so give each run a fresh copy, made outside of the timings
+    copies = [copy.deepcopy(layers) for _ in range(6)]
+
+    def run_legacy():
+        result = {}
+        for layer in copies.pop():
+            result = legacy_merge(result, layer)
+        return result
+
+    def run_merge():
+        return merge({}, *layers)
+
+    assert run_merge() == run_legacy()
+
+    legacy = bench(run_legacy, repeat=5, label=f"{name}-legacy")
+    engine = bench(run_merge, repeat=5, label=f"{name}-merge")
+    print(f"{name}: {legacy / engine:.1f}x")
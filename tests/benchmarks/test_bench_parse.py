@@ -0,0 +1,46 @@
+import json
+
+import pytest
+import yaml
+
+from conflator import Conflator, yaml_backend
+from conflator.conflator import _yaml_loader
+
+
+def synthetic_config(n_items):
+    return {
+        "workers": [
+            {
+                "name": f"worker-{i}",
+                "enabled": i % 2 == 0,
+                "threads": i % 16,
+                "ratio": i / 7,
+                "tags": [f"tag-{j}" for j in range(5)],
+                "sink": {"kind": "file", "path": f"/var/lib/app/{i}.out"},
+            }
+            for i in range(n_items)
+        ]
+    }
+
+
+@pytest.mark.parametrize("suffix,backend", [(".json", "json"), (".yaml", "libyaml"), (".yaml", "python")])
+def test_parse_throughput(tmp_path, monkeypatch, bench, suffix, backend):
+    if backend == "python":
+        monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+    elif backend == "libyaml" and not hasattr(yaml, "CSafeLoader"):
+        pytest.skip("PyYAML was built without libyaml")
+    _yaml_loader.cache_clear()
+    if suffix == ".yaml":
+        assert yaml_backend() == backend
+
+    config = synthetic_config(5_000)
+    path = tmp_path / f"config{suffix}"
+    path.write_text(json.dumps(config) if suffix == ".json" else yaml.safe_dump(config))
+    size_mb = path.stat().st_size / 1e6
+
+    try:
+        seconds = bench(Conflator._from_file, path, repeat=3, label=backend)
+        assert Conflator._from_file(path) == config
+    finally:
+        _yaml_loader.cache_clear()
+    print(f"{path.name} ({backend}): {size_mb:.1f} MB, {size_mb / seconds:.1f} MB/s")
@@ -0,0 +1,71 @@
+import json
+from typing import List
+
+from pydantic import field_validator
+
+from conflator import ConfigModel, Conflator
+
+
+class Sink(ConfigModel):
+    kind: str
+    path: str
+
+    @field_validator("path")
+    @classmethod
+    def absolute(cls, v):
+        assert v.startswith("/")
+        return v
+
+
+class Worker(ConfigModel):
+    name: str
+    threads: int
+    tags: List[str]
+    sink: Sink
+
+
+class Config(ConfigModel):
+    workers: List[Worker] = []
+
+
+def write(path, changed):
+    workers = [
+        {
+            "name": f"worker-{i}",
+            "threads": i % 16,
+            "tags": ["a", "b"],
+            "sink": {"kind": "file", "path": f"/out/{i}" if i != 17 else f"/changed/{changed}"},
+        }
+        for i in range(10_000)
+    ]
+    path.write_text(json.dumps({"workers": workers}))
+
+
+def test_reload_one_change(tmp_path, bench):
+    # Two config files differing only in the sink of one worker, alternated between loads
+    paths = [tmp_path / "a.json", tmp_path / "b.json"]
+    for i, path in enumerate(paths):
+        write(path, i)
+
+    conflator = Conflator("bench", Config, cli=False)
+    conflator.config_files = paths[:1]
+    result = conflator.load()
+
+    def alternate():
+        conflator.config_files = [paths[1]] if conflator.config_files == [paths[0]] else [paths[0]]
+
+    def load():
+        alternate()
+        conflator.load()
+
+    def reload():
+        nonlocal result
+        alternate()
+        result = conflator.reload(result)
+
+    parse = bench(Conflator._from_file, paths[0], repeat=5, label="parse")
+    full = bench(load, repeat=5, label="load")
+    result = conflator.load()
+    incremental = bench(reload, repeat=5, label="reload")
+    print(f"excluding parsing: load {(full - parse) * 1e3:.1f} ms, reload {(incremental - parse) * 1e3:.1f} ms")
+    assert result.workers[17].sink.path.startswith("/changed/")
@@ -0,0 +1,31 @@
+from typing import Annotated
+
+from pydantic import create_model
+
+from conflator import ConfigModel, EnvVar
+from conflator.conflator import ParseContext
+
+
+class Marker:
+    """Unrelated annotation metadata, ignored by both pydantic and conflator."""
+
+
+def make_model(n_fields, n_markers):
+    fields = {
+        f"field_{i}": (Annotated[(int, *[Marker() for _ in range(n_markers)], EnvVar())], i) for i in range(n_fields)
+    }
+    return create_model(f"Model_{n_fields}_{n_markers}", __base__=ConfigModel, **fields)
+
+
+def test_validation_independent_of_metadata_size(bench):
+    context = ParseContext()
+    context.app_name = "bench"
+    data = {f"field_{i}": i for i in range(50)}
+
+    timings = {}
+    for n_markers in (0, 200):
+        model = make_model(50, n_markers)
+        timings[n_markers] = bench(model.model_validate, data, context=context, number=200, label=f"{n_markers}")
+
+    # Previously every validation rescanned all metadata, growing linearly with n_markers
+    assert timings[200] < 2 * timings[0]
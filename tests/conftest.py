@@ -0,0 +1,79 @@
+import json
+import platform
+from pathlib import Path
+
+import pytest
+
+DEFAULT_BASELINE = Path(__file__).parent.parent / ".conflator-bench" / "baseline.json"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks in tests/benchmarks (skipped by default)",
+    )
+    parser.addoption(
+        "--conflator-bench-save",
+        nargs="?",
+        const=str(DEFAULT_BASELINE),
+        default=None,
+        metavar="PATH",
+        help="Save benchmark timings as a baseline, by default to .conflator-bench/baseline.json",
+    )
+    parser.addoption(
+        "--conflator-bench-compare",
+        nargs="?",
+        const=str(DEFAULT_BASELINE),
+        default=None,
+        metavar="PATH",
+        help="Fail benchmarks slower than in a saved baseline, by default the one --conflator-bench-save writes",
+    )
+    parser.addoption(
+        "--conflator-bench-tolerance",
+        type=float,
+        default=1.5,
+        help="Ratio to the baseline timing above which a benchmark fails with --conflator-bench-compare (default 1.5)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: performance benchmark, only run with --benchmark")
+    # Timings of this run, by benchmark name, and those of the baseline to compare them with
+    config.benchmark_results = {}
+    config.benchmark_baseline = {}
+    compare = config.getoption("--conflator-bench-compare")
+    if compare:
+        try:
+            config.benchmark_baseline = json.loads(Path(compare).read_text())["results"]
+        except FileNotFoundError:
+            raise pytest.UsageError(f"No benchmark baseline at {compare}, save one with --conflator-bench-save first")
+
+
+def pytest_collection_modifyitems(config, items):
+    benchmarks = Path(__file__).parent / "benchmarks"
+    run_benchmarks = config.getoption("--benchmark")
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark")
+    for item in items:
+        if benchmarks in item.path.parents:
+            item.add_marker(pytest.mark.benchmark)
+            if not run_benchmarks:
+                item.add_marker(skip)
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("--conflator-bench-save")
+    results = session.config.benchmark_results
+    if not path or not results:
+        return
+    path = Path(path)
+    # Update the timings of the benchmarks that ran, keeping those of the others
+    try:
+        saved = json.loads(path.read_text())["results"]
+    except FileNotFoundError:
+        saved = {}
+    saved.update(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    machine = {"python": platform.python_version(), "machine": platform.machine(), "node": platform.node()}
+    path.write_text(json.dumps({"machine": machine, "results": dict(sorted(saved.items()))}, indent=2) + "\n")
@@ -0,0 +1,61 @@
+import json
+from typing import Annotated, List
+
+import pytest
+import yaml
+
+from conflator import ConfigModel, Conflator, ConflatorValidationError, EnvVar
+
+
+class Sink(ConfigModel):
+    path: str
+
+
+class Tenant(ConfigModel):
+    name: str
+    region: Annotated[str, EnvVar("REGION")] = "eu"
+    quota: int = 10
+    sinks: List[Sink] = []
+
+
+@pytest.fixture
+def sources(tmp_path):
+    base = tmp_path / "base.yaml"
+    base.write_text(yaml.safe_dump({"quota": 5, "sinks": [{"path": "/base"}]}))
+    (tmp_path / "a.json").write_text(json.dumps({"name": "a"}))
+    (tmp_path / "b.yaml").write_text(yaml.safe_dump({"name": "b", "sinks": [{"path": "/b"}]}))
+    (tmp_path / "invalid.json").write_text(json.dumps({"name": "c", "quota": "many"}))
+    (tmp_path / "malformed.yaml").write_text("name: [d")
+    return [
+        tmp_path / "a.json",
+        [base, tmp_path / "b.yaml"],
+        {"name": "e", "quota": 1},
+        str(tmp_path / "invalid.json"),
+        [base, tmp_path / "malformed.yaml"],
+    ]
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_load_many(sources, processes):
+    results = Conflator.load_many(Tenant, sources, processes=processes, workers=2)
+    assert [r.source for r in results] == sources
+    assert [r.ok for r in results] == [True, True, True, False, False]
+
+    a, b, e = (r.config for r in results[:3])
+    assert a == Tenant(name="a")
+    assert b.quota == 5 and [s.path for s in b.sinks] == ["/base", "/b"]
+    assert e.quota == 1
+    assert isinstance(results[3].error, ConflatorValidationError)
+    assert isinstance(results[4].error, yaml.YAMLError)
+
+
+def test_load_many_as_load(tmp_path, monkeypatch, sources):
+    monkeypatch.setenv("TENANTS_REGION", "us")
+    results = Conflator.load_many(Tenant, sources[:1] + [tmp_path / "missing.json"], app_name="tenants")
+    assert results[0].config == Conflator("tenants", Tenant, cli=False, config_file=sources[0]).load()
+    assert results[0].config.region == "us"
+    # Unlike load(), which skips missing config files, each source is expected to exist
+    assert isinstance(results[1].error, FileNotFoundError)
+
+    results = Conflator.load_many(Tenant, sources[:2], overrides={"quota": 7})
+    assert [r.config.quota for r in results] == [7, 7]
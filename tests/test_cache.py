@@ -0,0 +1,242 @@
+import os
+import threading
+from pathlib import Path
+from typing import Annotated, List
+from unittest.mock import patch
+
+import pytest
+import yaml
+from pydantic import ConfigDict, PrivateAttr, ValidationError
+
+from conflator import ConfigModel, Conflator, EnvVar
+from conflator.cache import ParsedFileCache, default_cache_dir
+
+
+class Config(ConfigModel):
+    name: str = "default"
+    values: List[int] = []
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    parse = Conflator._parse
+
+    def counting_parse(path, content):
+        calls.append(path)
+        return parse(path, content)
+
+    monkeypatch.setattr(Conflator, "_parse", staticmethod(counting_parse))
+    return calls
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({"name": "cached", "values": [1, 2]}))
+    return path
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir("app") == tmp_path / "conflator" / "app"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    assert default_cache_dir("app") == Path.home() / ".cache" / "conflator" / "app"
+
+
+def test_cache_disabled_by_default(config_file):
+    assert Conflator("app", Config, cli=False, config_file=config_file).file_cache is None
+
+
+def test_cache_hit(tmp_path, config_file, parse_count):
+    for _ in range(3):
+        conflator = Conflator("app", Config, cli=False, config_file=config_file, cache=tmp_path / "cache")
+        config = conflator.load()
+        assert config.name == "cached"
+        assert config.values == [1, 2]
+    assert len(parse_count) == 1
+
+
+def test_cache_invalidated_by_content(tmp_path, config_file, parse_count):
+    cache = ParsedFileCache(tmp_path / "cache")
+    stat = config_file.stat()
+    assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+
+    # Same size and modification time, only the content hash differs
+    config_file.write_text(config_file.read_text().replace("cached", "edited"))
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert config_file.stat().st_size == stat.st_size
+    assert cache.load(config_file, Conflator._parse)["name"] == "edited"
+    assert len(parse_count) == 2
+
+
+def test_cache_corrupt_entry(tmp_path, config_file, parse_count):
+    cache = ParsedFileCache(tmp_path / "cache")
+    cache.load(config_file, Conflator._parse)
+    for entry in cache.directory.glob("*.pickle"):
+        entry.write_bytes(b"not a pickle")
+    assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+    assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+    assert len(parse_count) == 2
+
+
+def test_cache_missing_file(tmp_path):
+    conflator = Conflator("app", Config, cli=False, config_file=tmp_path / "missing.yaml", cache=tmp_path / "cache")
+    assert conflator.load() == Config()
+
+
+def test_cache_unwritable_directory(tmp_path, config_file):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    cache = ParsedFileCache(blocker / "cache")
+    assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_cache_untrusted_directory(tmp_path, config_file, parse_count, monkeypatch):
+    cache = ParsedFileCache(tmp_path / "cache")
+    cache.load(config_file, Conflator._parse)
+
+    # Entries in a directory others can write to, or that the user does not own, are not unpickled
+    os.chmod(cache.directory, 0o777)
+    assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+    os.chmod(cache.directory, 0o700)
+    with monkeypatch.context() as m:
+        m.setattr(os, "getuid", lambda: os.stat(cache.directory).st_uid + 1)
+        assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+    assert len(parse_count) == 3
+
+    assert cache.load(config_file, Conflator._parse)["name"] == "cached"
+    assert len(parse_count) == 3
+
+
+def test_cache_concurrent(tmp_path, config_file):
+    cache = ParsedFileCache(tmp_path / "cache")
+    results = []
+
+    def load():
+        for _ in range(20):
+            results.append(cache.load(config_file, Conflator._parse))
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r == {"name": "cached", "values": [1, 2]} for r in results)
+    assert list(cache.directory.glob(".tmp-*")) == []
+    cache.clear()
+    assert list(cache.directory.glob("*.pickle")) == []
+
+
+class Nested(ConfigModel):
+    key: Annotated[str, EnvVar("KEY")] = "nested"
+
+
+class SnapshotConfig(ConfigModel):
+    name: str = "default"
+    values: List[int] = []
+    nested: Nested = Nested()
+
+
+@pytest.fixture
+def validate_count(monkeypatch):
+    calls = []
+    validate = SnapshotConfig.model_validate.__func__
+
+    def counting_validate(cls, *args, **kwargs):
+        calls.append(cls)
+        return validate(cls, *args, **kwargs)
+
+    monkeypatch.setattr(SnapshotConfig, "model_validate", classmethod(counting_validate))
+    return calls
+
+
+def snapshot_load(tmp_path, config_file, **overrides):
+    return Conflator(
+        "app", SnapshotConfig, cli=False, config_file=config_file, snapshot_cache=True, cache=tmp_path, **overrides
+    ).load()
+
+
+def test_snapshot_hit(tmp_path, config_file, validate_count):
+    first = snapshot_load(tmp_path, config_file)
+    second = snapshot_load(tmp_path, config_file)
+    assert len(validate_count) == 1
+    assert second == first
+    assert second.model_fields_set == first.model_fields_set
+    assert isinstance(second.nested, Nested)
+    assert second.values == [1, 2]
+
+    # Rehydrated models still validate assignment
+    with pytest.raises(ValidationError):
+        second.values = "not a list"
+
+
+def test_snapshot_invalidation(tmp_path, config_file, monkeypatch, validate_count):
+    snapshot_load(tmp_path, config_file)
+
+    config_file.write_text(yaml.safe_dump({"name": "changed"}))
+    assert snapshot_load(tmp_path, config_file).name == "changed"
+    assert len(validate_count) == 2
+
+    monkeypatch.setenv("APP_KEY", "from_env")
+    assert snapshot_load(tmp_path, config_file).nested.key == "from_env"
+    assert len(validate_count) == 3
+
+    assert snapshot_load(tmp_path, config_file, name="override").name == "override"
+    assert len(validate_count) == 4
+
+    monkeypatch.setattr("conflator.cache.version_key", lambda: "upgraded")
+    snapshot_load(tmp_path, config_file, name="override")
+    assert len(validate_count) == 5
+
+    snapshot_load(tmp_path, config_file, name="override")
+    assert len(validate_count) == 5
+
+
+def test_snapshot_merge_strategies(tmp_path, config_file, validate_count):
+    other = tmp_path / "other.yaml"
+    other.write_text(yaml.safe_dump({"values": [3]}))
+
+    def load(**kwargs):
+        with patch("sys.argv", ["test_script.py", "-f", str(other)]):
+            return Conflator(
+                "app", SnapshotConfig, config_file=config_file, snapshot_cache=True, cache=tmp_path, **kwargs
+            ).load()
+
+    assert load().values == [1, 2, 3]
+    assert load(merge_strategies={"values": "replace"}).values == [3]
+    assert load(merge_strategies={"values": "replace"}).values == [3]
+    assert len(validate_count) == 2
+
+
+def test_snapshot_argv(tmp_path, config_file, validate_count):
+    def load(argv):
+        with patch("sys.argv", ["test_script.py"] + argv):
+            return Conflator("app", SnapshotConfig, config_file=config_file, snapshot_cache=True, cache=tmp_path).load()
+
+    assert load(["--set", "name=first"]).name == "first"
+    assert load(["--set", "name=second"]).name == "second"
+    assert load(["--set", "name=second"]).name == "second"
+    assert len(validate_count) == 2
+
+
+class ExtraConfig(ConfigModel):
+    model_config = ConfigDict(extra="allow")
+    _private: int = PrivateAttr(default=3)
+
+    name: str = "default"
+
+
+def test_snapshot_extra_and_private(tmp_path, config_file):
+    def load():
+        return Conflator(
+            "app", ExtraConfig, cli=False, config_file=config_file, snapshot_cache=True, cache=tmp_path
+        ).load()
+
+    first = load()
+    second = load()
+    assert second == first
+    assert second.values == [1, 2]
+    assert second._private == 3
@@ -1,6 +1,8 @@
+import argparse
 import io
 import json
 from contextlib import redirect_stdout
+from typing import List, Optional
 from unittest.mock import patch
 
 from annotated_types import Annotated
@@ -65,3 +67,63 @@ def test_cli_schema_printing():
         assert parsed["properties"]["test_email"] == email_fields
         assert parsed["properties"]["test_key"]["title"] == "Test Key"
         assert parsed["properties"]["nested_config"]["default"] == {"nested_field": "default_nested"}
+
+
+def test_repeated_load():
+    conflator = Conflator("polytope", Config)
+    with patch("sys.argv", ["test_script.py", "--test-email", "first@example.com"]):
+        assert conflator.load().test_email == "first@example.com"
+    with patch("sys.argv", ["test_script.py", "--test-email", "second@example.com"]):
+        assert conflator.load().test_email == "second@example.com"
+    with patch("sys.argv", ["test_script.py"]):
+        assert conflator.load().test_email == "default@example.com"
+
+
+def test_shared_parser():
+    parser = argparse.ArgumentParser()
+    with patch("sys.argv", ["test_script.py", "--test-email", "cli@example.com", "--nested", "cli_nested"]):
+        for _ in range(2):
+            config = Conflator("polytope", Config, argparser=parser).load()
+            assert config.test_email == "cli@example.com"
+            assert config.nested_config.nested_field == "cli_nested"
+
+
+def test_parser_shared_by_models():
+    # Both models have the --nested argument of NestedConfig, which is only added once
+    parser = argparse.ArgumentParser()
+    with patch("sys.argv", ["test_script.py", "--nested", "cli_nested"]):
+        assert Conflator("polytope", Config, argparser=parser).load().nested_config.nested_field == "cli_nested"
+        assert Conflator("polytope", ConfigWithCLI, argparser=parser).load().arg1.nested_field == "cli_nested"
+
+    # The schema printed is that of the model being loaded, not of the first one
+    buf = io.StringIO()
+    with patch("sys.argv", ["test_script.py", "--print-schema"]), redirect_stdout(buf):
+        try:
+            Conflator("polytope", ConfigWithCLI, argparser=parser).load()
+        except SystemExit:
+            pass
+    assert list(json.loads(buf.getvalue())["properties"]) == ["arg1"]
+
+
+def test_cli_args_not_mutated():
+    cli_arg = Config.model_fields["test_email"].metadata[-1]
+    before = dict(vars(cli_arg))
+    with patch("sys.argv", ["test_script.py"]):
+        Conflator("polytope", Config).load()
+    assert vars(cli_arg) == before
+
+
+class Sink(ConfigModel):
+    level: Annotated[str, CLIArg("--sink-level")] = "info"
+
+
+class ConfigWithSinks(ConfigModel):
+    sinks: Optional[List[Sink]] = None
+
+
+def test_cli_arg_in_nested_generic(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"sinks": [{}, {"level": "error"}]}))
+    with patch("sys.argv", ["test_script.py", "--sink-level", "debug"]):
+        config = Conflator("test", ConfigWithSinks, config_file=path).load()
+    assert [s.level for s in config.sinks] == ["debug", "debug"]
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import pytest
+import yaml
+
+from conflator import ConfigModel, Conflator, yaml_backend
+from conflator.conflator import _yaml_loader
+
+
+class Config(ConfigModel):
+    name: str = "default"
+    values: List[int] = []
+    mapping: Dict[str, str] = {}
+
+
+CONFIG = {"name": "from_file", "values": [1, 2, 3], "mapping": {"a": "b"}}
+
+
+@pytest.fixture
+def pure_python_yaml(monkeypatch):
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+    _yaml_loader.cache_clear()
+    yield
+    _yaml_loader.cache_clear()
+
+
+@pytest.mark.parametrize("suffix", [".json", ".yaml", ".yml"])
+def test_load_config_file(tmp_path, suffix):
+    path = tmp_path / f"config{suffix}"
+    path.write_text(json.dumps(CONFIG) if suffix == ".json" else yaml.safe_dump(CONFIG))
+    config = Conflator("app", Config, cli=False, config_file=path).load()
+    assert config.model_dump() == CONFIG
+
+
+def test_missing_config_file(tmp_path):
+    config = Conflator("app", Config, cli=False, config_file=tmp_path / "missing.yaml").load()
+    assert config == Config()
+
+
+def test_yaml_backend():
+    expected = "libyaml" if hasattr(yaml, "CSafeLoader") else "python"
+    assert yaml_backend() == expected
+
+
+def test_yaml_backend_fallback(tmp_path, pure_python_yaml):
+    assert yaml_backend() == "python"
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(CONFIG))
+    assert Conflator._from_file(path) == CONFIG
+
+
+def test_yaml_safe_loading(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("name: !!python/object/apply:os.getcwd []\n")
+    with pytest.raises(yaml.constructor.ConstructorError):
+        Conflator._from_file(path)
+
+
+@pytest.fixture
+def layers(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"layer{i}.yaml"
+        path.write_text(yaml.safe_dump({"name": f"layer{i}", "values": [i], "mapping": {str(i): str(i)}}))
+        paths.append(path)
+    # Missing files are skipped, wherever they are in the order
+    paths.insert(3, tmp_path / "missing.yaml")
+    return paths
+
+
+@pytest.fixture
+def slow_reads(monkeypatch):
+    """Make earlier files slower to read, so that concurrent reads complete out of order."""
+    from_file = Conflator._from_file
+
+    def slow_from_file(path, parse=None):
+        time.sleep(0.01 * (7 - int(path.stem[-1]) if path.stem[-1].isdigit() else 0))
+        return from_file(path, parse)
+
+    monkeypatch.setattr(Conflator, "_from_file", staticmethod(slow_from_file))
+
+
+def load_layers(paths, **kwargs):
+    conflator = Conflator("app", Config, cli=False, **kwargs)
+    conflator.config_files = paths
+    return conflator
+
+
+@pytest.mark.parametrize("parallel", [True, 2])
+def test_parallel_read(layers, slow_reads, parallel):
+    expected = load_layers(layers).load()
+    assert expected.name == "layer5"
+    assert expected.values == [0, 1, 2, 3, 4, 5]
+    assert load_layers(layers, parallel=parallel).load() == expected
+
+
+def test_aload(layers, slow_reads):
+    expected = load_layers(layers).load()
+
+    async def main():
+        # The event loop keeps running while the files are read
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        config = await load_layers(layers).aload()
+        ticker.cancel()
+        return config, ticks
+
+    config, ticks = asyncio.run(main())
+    assert config == expected
+    assert ticks > 0
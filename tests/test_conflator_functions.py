@@ -1,9 +1,10 @@
-from typing import Annotated
+from typing import Annotated, Dict, List, Literal, Optional, Tuple, Union
 from unittest.mock import patch
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 from conflator import CLIArg, ConfigModel, Conflator, EnvVar
+from conflator.conflator import _discover_models
 
 
 class TestLoading:
@@ -28,6 +29,38 @@ class TestLoading:
         for model in found_models:
             assert model in [NewConfig, NestedConfig]
 
+    def test_find_models_in_generics(self):
+        class A(ConfigModel):
+            kind: Literal["a"] = "a"
+
+        class B(ConfigModel):
+            kind: Literal["b"] = "b"
+
+        class C(ConfigModel):
+            pass
+
+        class D(ConfigModel):
+            pass
+
+        class Plain(BaseModel):
+            d: Optional[D] = None
+
+        class Root(ConfigModel):
+            items: List[Annotated[Union[A, B], Field(discriminator="kind")]] = []
+            by_name: Dict[str, Tuple[C, ...]] = {}
+            plain: Plain | None = None
+            later: Optional["Later"] = None
+
+        assert Conflator._find_models(Root) == {Root, A, B, C, D}
+
+        # Forward references are resolved once they can be
+        class Later(ConfigModel):
+            pass
+
+        Root.model_rebuild()
+        assert Conflator._find_models(Root) == {Root, A, B, C, D, Later}
+        assert _discover_models(Root) is _discover_models(Root)
+
     def test_get_cli_args(self):
         class Config(ConfigModel):
             test_email: Annotated[str, Field(), EnvVar("TEST_EMAIL"), CLIArg("--test-email")] = "default@example.com"
@@ -158,56 +191,56 @@ class TestLoading:
             conflator._update_from_env()
         assert conflator.loaded_config == {"test_key": "env_key_2"}
 
-        Conflator._merge(conflator.loaded_config, {"test_email": "new_default@example.com"})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_email": "new_default@example.com"})
         assert conflator.loaded_config == {
             "test_key": "env_key_2",
             "test_email": "new_default@example.com",
         }
 
-        Conflator._merge(conflator.loaded_config, {"test_key": "env_key_3"})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": "env_key_3"})
         assert conflator.loaded_config == {
             "test_key": "env_key_3",
             "test_email": "new_default@example.com",
         }
 
-        Conflator._merge(conflator.loaded_config, {"test_key": None})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": None})
         assert conflator.loaded_config == {"test_email": "new_default@example.com"}
 
-        Conflator._merge(conflator.loaded_config, {"test_key": [1, 2]})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": [1, 2]})
         assert conflator.loaded_config == {
             "test_email": "new_default@example.com",
             "test_key": [1, 2],
         }
 
-        Conflator._merge(conflator.loaded_config, {"test_key": [3, 4]})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": [3, 4]})
         assert conflator.loaded_config == {
             "test_email": "new_default@example.com",
             "test_key": [1, 2, 3, 4],
         }
 
-        Conflator._merge(conflator.loaded_config, {"test_key": None})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": None})
         assert conflator.loaded_config == {"test_email": "new_default@example.com"}
 
-        Conflator._merge(conflator.loaded_config, {"test_key": {"test": 1}})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": {"test": 1}})
         assert conflator.loaded_config == {
             "test_email": "new_default@example.com",
             "test_key": {"test": 1},
         }
 
-        Conflator._merge(conflator.loaded_config, {"test_key": [2]})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": [2]})
         assert conflator.loaded_config == {
             "test_email": "new_default@example.com",
             "test_key": [2],
         }
 
         # TODO: implement this...
-        Conflator._merge(conflator.loaded_config, {"test_key": {"test_1": 2}})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"test_key": {"test_1": 2}})
         assert conflator.loaded_config == {
             "test_email": "new_default@example.com",
             "test_key": {"test_1": 2},
         }
 
-        Conflator._merge(conflator.loaded_config, {"new_test_key": {"test_1": 2}})
+        conflator.loaded_config = Conflator._merge(conflator.loaded_config, {"new_test_key": {"test_1": 2}})
         assert conflator.loaded_config == {
             "test_email": "new_default@example.com",
             "test_key": {"test_1": 2},
@@ -218,6 +251,13 @@ class TestLoading:
         result = Conflator._merge(conflator.loaded_config, [2])
         assert result == [1, 2]
 
+        # Neither input is modified
+        a = {"test_key": {"test_1": [1]}, "deleted": 1}
+        b = {"test_key": {"test_1": [2], "test_2": 2}, "deleted": None}
+        assert Conflator._merge(a, b) == {"test_key": {"test_1": [1, 2], "test_2": 2}}
+        assert a == {"test_key": {"test_1": [1]}, "deleted": 1}
+        assert b == {"test_key": {"test_1": [2], "test_2": 2}, "deleted": None}
+
     def test_update_from_env(self, monkeypatch):
         class Config(ConfigModel):
             test_email: Annotated[str, Field(), EnvVar("TEST_EMAIL"), CLIArg("--test-email")] = "default@example.com"
@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional
+
+from conflator import ConfigModel, diff
+from conflator.diff import ConfigDiff
+
+
+class Sink(ConfigModel):
+    path: str
+    level: str = "info"
+
+
+class Config(ConfigModel):
+    name: str = "app"
+    sinks: List[Sink] = []
+    named: Dict[str, Sink] = {}
+    extra: Optional[Dict[str, int]] = None
+
+
+def test_dicts():
+    old = {"a": 1, "b": {"c": [1, 2, 3], "d": {"e": "x"}}, "gone": True}
+    new = {"a": 1, "b": {"c": [1, 5], "d": {"e": "y"}}, "new": {"f": 1}}
+    result = diff(old, new)
+    assert result == ConfigDiff(changed=["b.c[1]", "b.d.e"], added=["new"], removed=["b.c[2]", "gone"])
+    assert result.affects("b.d")
+    assert result.affects("b.c[2].x")
+    assert not result.affects("a")
+    assert not result.affects("b.cc")
+
+
+def test_quoted_keys():
+    old = {"hosts": {"a.example.com": 1, "b": 1}}
+    new = {"hosts": {"a.example.com": 2}, 'say "hi"': [1]}
+    result = diff(old, new)
+    assert result == ConfigDiff(changed=['hosts."a.example.com"'], added=['"say \\"hi\\""'], removed=["hosts.b"])
+    assert result.affects('hosts."a.example.com"')
+    assert not result.affects("hosts.a")
+    assert result.affects('"say \\"hi\\""[0]')
+    assert diff([1, 2], [1, 3]).affects("[1]")
+    assert not diff([1, 2], [1, 3]).affects("[0]")
+
+
+def test_identical():
+    config = {"a": [1, 2], "b": {"c": 1}}
+    assert not diff(config, config)
+    assert not diff(config, {"a": [1, 2], "b": {"c": 1}})
+
+
+def test_models():
+    old = Config(sinks=[{"path": "/a"}, {"path": "/b"}], named={"x": {"path": "/x"}})
+    new = Config(name="other", sinks=[{"path": "/a"}, {"path": "/b", "level": "debug"}], extra={"k": 1})
+    result = diff(old, new)
+    assert result.changed == ["name", "sinks[1].level", "extra"]
+    assert result.removed == ["named.x"]
+    assert result.added == []
+
+
+def test_type_changes():
+    assert diff({"a": [1]}, {"a": {"b": 1}}).changed == ["a"]
+    assert diff({"a": 1}, {"a": "1"}).changed == ["a"]
+    assert diff([Sink(path="/a")], [Config()]).changed == ["[0]"]
+
+
+def test_shared_subtrees_are_not_traversed():
+    class Exploding(dict):
+        def items(self):
+            raise AssertionError("traversed")
+
+    shared = Exploding(a=1)
+    assert diff({"shared": shared, "b": 1}, {"shared": shared, "b": 2}).changed == ["b"]
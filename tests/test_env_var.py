@@ -4,6 +4,7 @@ from annotated_types import Annotated
 from pydantic import Field
 
 from conflator import CLIArg, ConfigModel, Conflator, EnvVar
+from conflator.conflator import _env_snapshot
 
 
 class NestedConfig(ConfigModel):
@@ -31,3 +32,27 @@ def test_environment_variable_override(monkeypatch):
 
     assert config.test_email == "env@example.com"
     assert config.test_key == "env_key"
+
+
+def test_environment_variable_case_insensitive(monkeypatch):
+    monkeypatch.setenv("appname_test_key", "env_key")
+
+    with patch("sys.argv", ["test_script.py"]):
+        config = Conflator("appname", Config).load()
+        assert config.test_key == "default_key"
+
+        config = Conflator("appname", Config, env_case_insensitive=True).load()
+        assert config.test_key == "env_key"
+
+
+def test_environment_snapshot(monkeypatch):
+    monkeypatch.setenv("APPNAME_TEST_KEY", "env_key")
+    monkeypatch.setenv("OTHER_TEST_KEY", "other_key")
+
+    snapshot = _env_snapshot("appname")
+    assert snapshot["TEST_KEY"] == "env_key"
+    assert "OTHER_TEST_KEY" not in snapshot
+
+    # Later changes to the environment do not affect an existing snapshot
+    monkeypatch.setenv("APPNAME_TEST_KEY", "changed")
+    assert snapshot["TEST_KEY"] == "env_key"
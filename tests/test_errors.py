@@ -0,0 +1,66 @@
+import sys
+from typing import List
+
+import pytest
+from pydantic import ValidationError
+
+from conflator import ConfigModel, Conflator, ConflatorValidationError
+from conflator.errors import ErrorEntry
+from conflator.paths import SettingError
+
+
+class Sink(ConfigModel):
+    name: str
+    level: str = "info"
+
+
+class Config(ConfigModel):
+    port: int = 80
+    sinks: List[Sink] = []
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("port: many\nsinks:\n  - name: a\n  - level: debug\n")
+    return path
+
+
+def test_raises_structured_errors(config_file):
+    conflator = Conflator("app", Config, cli=False, config_file=config_file, exit_on_error=False)
+    with pytest.raises(ConflatorValidationError) as info:
+        conflator.load()
+    error = info.value
+    assert isinstance(error.__cause__, ValidationError) and error.validation_error is error.__cause__
+    assert error.error_count() == 2
+    # Only built when read
+    assert "errors" not in error.__dict__
+    message = "Input should be a valid integer, unable to parse string as an integer"
+    assert error.errors == [
+        ErrorEntry("port", ("port",), message, "int_parsing", None),
+        ErrorEntry("sinks[1] > name", ("sinks", 1, "name"), "Field required", "missing", None),
+    ]
+    assert str(error).splitlines()[1:] == [f"  {e.path}: {e.message}" for e in error.errors]
+
+
+def test_errors_with_sources(config_file):
+    conflator = Conflator("app", Config, cli=False, config_file=config_file, exit_on_error=False, provenance=True)
+    with pytest.raises(ConflatorValidationError) as info:
+        conflator.load()
+    # The line of the invalid value, and of the item missing a field
+    assert [e.source for e in info.value.errors] == [f"{config_file}:1", f"{config_file}:4"]
+
+
+def test_exits_by_default(config_file, capsys):
+    with pytest.raises(SystemExit) as info:
+        Conflator("app", Config, cli=False, config_file=config_file).load()
+    assert info.value.code == 2
+    output = capsys.readouterr().out
+    assert "Configuration errors: 2" in output and "sinks[1] > name" in output
+
+
+def test_invalid_setting(monkeypatch, tmp_path):
+    monkeypatch.setattr(sys, "argv", ["prog", "--set", "sinks[3].name=a"])
+    conflator = Conflator("app", Config, config_file=tmp_path / "missing.json", exit_on_error=False)
+    with pytest.raises(SettingError):
+        conflator.load()
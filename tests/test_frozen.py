@@ -0,0 +1,93 @@
+import copy
+import pickle
+from typing import Dict, List, Set
+
+import pytest
+from pydantic import ConfigDict, PrivateAttr
+
+from conflator import ConfigModel, freeze
+from conflator.frozen import FrozenConfig, FrozenMap, thaw
+
+
+class Sink(ConfigModel):
+    model_config = ConfigDict(extra="allow")
+    path: str
+    level: str = "info"
+
+
+class Config(ConfigModel):
+    name: str = "app"
+    sinks: List[Sink] = []
+    limits: Dict[str, int] = {}
+    tags: Set[str] = set()
+    _secret: str = PrivateAttr("hidden")
+
+
+@pytest.fixture
+def config():
+    return Config(
+        name="service",
+        sinks=[{"path": "/a"}, {"path": "/b", "level": "debug", "not-an-identifier": 1}],
+        limits={"cpu": 2},
+        tags={"x"},
+    )
+
+
+def test_view(config):
+    frozen = freeze(config)
+    assert isinstance(frozen, FrozenConfig)
+    assert frozen.name == "service"
+    assert frozen.sinks[1].level == "debug"
+    assert frozen.sinks[1]._get("not-an-identifier") == 1
+    assert frozen.sinks[0]._get("missing", 0) == 0
+    assert frozen.limits == FrozenMap({"cpu": 2})
+    assert frozen.limits["cpu"] == 2
+    assert frozen.tags == frozenset({"x"})
+    assert not hasattr(frozen, "_secret")
+    assert repr(frozen.sinks[0]) == "FrozenSink(path='/a', level='info')"
+
+
+def test_read_only_and_hashable(config):
+    frozen = freeze(config)
+    with pytest.raises(AttributeError):
+        frozen.name = "other"
+    with pytest.raises(TypeError):
+        frozen.limits["cpu"] = 3
+    assert hash(frozen) == hash(freeze(config.model_copy(deep=True)))
+    assert frozen == freeze(config)
+    assert frozen != freeze(Config())
+    assert {frozen: 1}[freeze(config)] == 1
+
+
+def test_views_of_different_models_differ():
+    class Other(ConfigModel):
+        path: str
+        level: str = "info"
+
+    assert freeze(Sink(path="/a")) != freeze(Other(path="/a"))
+
+
+def test_fields_named_like_methods():
+    class Lookup(ConfigModel):
+        get: str = "value"
+        count: int = 2
+
+    frozen = freeze(Lookup())
+    assert (frozen.get, frozen.count) == ("value", 2)
+    assert frozen._get("get") == "value"
+
+
+def test_strings_are_interned(config):
+    a = freeze(Sink(path="".join(["/var/", "log"])))
+    b = freeze(Sink(path="".join(["/var/", "log"])))
+    assert a.path is b.path
+
+
+def test_thaw(config):
+    assert Config.model_validate(thaw(freeze(config))) == config
+    assert copy.deepcopy(freeze(config)) == freeze(config)
+
+
+def test_not_a_model():
+    assert freeze({"a": [1, {"b": "c"}]}) == FrozenMap({"a": (1, FrozenMap({"b": "c"}))})
+    assert pickle.loads(pickle.dumps(freeze({"a": [1]}))) == FrozenMap({"a": (1,)})
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+
+def import_times(code):
+    """Run code with -X importtime, returning {module: (self us, cumulative us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_no_heavy_imports():
+    times = import_times(
+        "import json, tempfile, pathlib\n"
+        "from conflator import ConfigModel, Conflator\n"
+        "class Config(ConfigModel):\n"
+        "    x: int = 0\n"
+        "with tempfile.TemporaryDirectory() as d:\n"
+        "    path = pathlib.Path(d) / 'config.json'\n"
+        "    path.write_text(json.dumps({'x': 1}))\n"
+        "    assert Conflator('app', Config, cli=False, config_file=path).load().x == 1\n"
+    )
+    for module in ["argparse", "rich", "rich_argparse", "yaml"]:
+        assert module not in times
+
+
+def test_optional_modules_are_not_imported():
+    # Modules of optional features are imported when they are first used, not by importing conflator
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, conflator; print(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set(result.stdout.split())
+    for module in ["batch", "cache", "includes", "provenance", "shared", "stats", "subclasses", "watcher"]:
+        assert f"conflator.{module}" not in modules
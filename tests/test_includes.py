@@ -0,0 +1,143 @@
+import asyncio
+import sys
+import threading
+from typing import Dict, List
+
+import pytest
+
+from conflator import ConfigModel, Conflator
+from conflator.includes import IncludeError
+from conflator.provenance import Candidate, Source
+from conflator.watcher import ConfigWatcher, _inotify_available
+
+
+class Config(ConfigModel):
+    host: str = "localhost"
+    port: int = 80
+    sinks: List[str] = []
+    labels: Dict[str, str] = {}
+
+
+@pytest.fixture
+def files(tmp_path):
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "fragments").mkdir()
+    (tmp_path / "shared" / "common.yaml").write_text("host: common\nport: 1\nsinks: [common]\n")
+    (tmp_path / "fragments" / "a.yaml").write_text("include: ../shared/common.yaml\nport: 2\nsinks: [a]\n")
+    (tmp_path / "fragments" / "b.yaml").write_text("include: [../shared/common.yaml]\nsinks: [b]\nlabels: {b: x}\n")
+    main = tmp_path / "main.yaml"
+    main.write_text("include: [fragments/a.yaml, fragments/b.yaml]\nsinks: [main]\nlabels: {main: x}\n")
+    return main
+
+
+class Reads(list):
+    """The names of the files parsed, and the threads they were parsed in."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    reads = Reads()
+    parse = Conflator._parse
+
+    def counting(path, content):
+        reads.append(path.name)
+        reads.threads.add(threading.current_thread())
+        return parse(path, content)
+
+    monkeypatch.setattr(Conflator, "_parse", staticmethod(counting))
+    return reads
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_includes(files, reads, parallel):
+    config = Conflator("app", Config, config_file=files, include_key="include", parallel=parallel).load()
+    # Included files are merged first, each once, at the first place they are included
+    assert config.sinks == ["common", "a", "b", "main"]
+    assert (config.host, config.port) == ("common", 2)
+    assert config.labels == {"b": "x", "main": "x"}
+    assert sorted(reads) == ["a.yaml", "b.yaml", "common.yaml", "main.yaml"]
+
+
+def test_aload_includes(files, reads):
+    config = asyncio.run(Conflator("app", Config, config_file=files, include_key="include").aload())
+    assert config.sinks == ["common", "a", "b", "main"]
+    # Included files are read in worker threads too, not blocking the event loop
+    assert threading.main_thread() not in reads.threads
+
+
+def test_includes_are_opt_in(files, reads):
+    config = Conflator("app", Config, config_file=files).load()
+    assert config.sinks == ["main"]
+
+
+def test_included_from_several_config_files(files, reads, monkeypatch):
+    other = files.parent / "fragments" / "a.yaml"
+    monkeypatch.setattr(sys, "argv", ["prog", "-f", str(other)])
+    config = Conflator("app", Config, config_file=files, include_key="include").load()
+    assert config.sinks == ["common", "a", "b", "main"]
+    assert reads.count("a.yaml") == 1
+
+
+def test_include_errors(tmp_path, reads):
+    a, b = tmp_path / "a.yaml", tmp_path / "b.yaml"
+    a.write_text("include: b.yaml\n")
+    b.write_text("include: [a.yaml]\n")
+    with pytest.raises(IncludeError, match=f"Cycle of includes: {a} -> {b} -> {a}"):
+        Conflator("app", Config, config_file=a, include_key="include").load()
+
+    b.write_text("include: missing.yaml\n")
+    with pytest.raises(IncludeError, match=f"{tmp_path / 'missing.yaml'}, included from {b}, not found"):
+        Conflator("app", Config, config_file=a, include_key="include").load()
+
+    b.write_text("include: {path: a.yaml}\n")
+    with pytest.raises(IncludeError, match="expected a path or a list of paths"):
+        Conflator("app", Config, config_file=a, include_key="include").load()
+
+
+def test_provenance_of_included_values(files, reads):
+    conflator = Conflator("app", Config, config_file=files, include_key="include", provenance=True)
+    conflator.load()
+    common = Source("file", str(files.parent / "shared" / "common.yaml"))
+    a = Source("file", str(files.parent / "fragments" / "a.yaml"))
+    assert conflator.provenance.source("host") == Candidate(common, 1)
+    assert conflator.provenance.candidates("port") == [Candidate(common, 2), Candidate(a, 2)]
+
+
+def test_load_many_with_includes(files, reads):
+    tenants = []
+    for name in ("x", "y"):
+        tenants.append(files.parent / f"{name}.yaml")
+        tenants[-1].write_text(f"include: main.yaml\nhost: {name}\n")
+    results = Conflator.load_many(Config, tenants, include_key="include")
+    assert [r.config.host for r in results] == ["x", "y"]
+    assert results[0].config.sinks == ["common", "a", "b", "main"]
+    assert sorted(reads) == ["a.yaml", "b.yaml", "common.yaml", "main.yaml", "x.yaml", "y.yaml"]
+
+
+@pytest.mark.parametrize("use_inotify", [False, True] if _inotify_available() else [False])
+def test_watch_included_files(files, reads, use_inotify):
+    conflator = Conflator("app", Config, config_file=files, include_key="include")
+    changed = threading.Event()
+    with ConfigWatcher(conflator, debounce=0.05, poll_interval=0.02, use_inotify=use_inotify) as watcher:
+        watcher.subscribe(lambda old, new: changed.set())
+        reads.clear()
+
+        # Only the included file that changed is read again
+        (files.parent / "fragments" / "c.yaml").write_text("sinks: [c]\n")
+        (files.parent / "fragments" / "b.yaml").write_text("include: c.yaml\nsinks: [b2]\n")
+        assert changed.wait(5)
+        assert watcher.config.sinks == ["common", "a", "c", "b2", "main"]
+        assert sorted(reads) == ["b.yaml", "c.yaml"]
+
+        # Files included since the watcher started are watched too
+        changed.clear()
+        reads.clear()
+        (files.parent / "fragments" / "c.yaml").write_text("sinks: [c2]\n")
+        assert changed.wait(5)
+        assert watcher.config.sinks == ["common", "a", "c2", "b2", "main"]
+        assert reads == ["c.yaml"]
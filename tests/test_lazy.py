@@ -0,0 +1,83 @@
+import copy
+import json
+import pickle
+from typing import Annotated, Dict, List
+
+import pytest
+from pydantic import ValidationError
+
+from conflator import ConfigModel, Conflator, EnvVar, Lazy, diff, freeze, validate_all
+from conflator.lazy import _Unvalidated
+
+
+class Rule(ConfigModel):
+    name: str
+    limit: Annotated[int, EnvVar("LIMIT")] = 1
+
+
+class Config(ConfigModel):
+    level: str = "info"
+    rules: Annotated[List[Rule], Lazy()] = []
+    datasets: Annotated[Dict[str, Rule], Lazy()] = {}
+
+
+def load(tmp_path, config, **kwargs):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+    return Conflator("app", Config, cli=False, config_file=path, **kwargs).load()
+
+
+def test_validated_on_first_access(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_LIMIT", "5")
+    stats = []
+    config = load(tmp_path, {"rules": [{"name": "a"}, {"name": "b"}]}, lazy=True, stats=stats.append)
+    assert stats[0].models_validated == 1
+    assert type(config.__dict__["rules"]) is _Unvalidated
+
+    rules = config.rules
+    assert [r.limit for r in rules] == [5, 5]
+    # Memoized in the instance
+    assert config.__dict__["rules"] is rules
+    assert config.rules is rules
+    assert config.datasets == {}
+
+
+def test_eager_without_lazy(tmp_path):
+    config = load(tmp_path, {"rules": [{"name": "a"}]})
+    assert type(config.__dict__["rules"]) is list
+    with pytest.raises(SystemExit):
+        load(tmp_path, {"rules": [{"limit": 2}]})
+
+
+def test_errors_on_access(tmp_path):
+    config = load(tmp_path, {"rules": [{"name": "a"}, {"limit": "x"}]}, lazy=True)
+    assert config.level == "info"
+    with pytest.raises(ValidationError) as e:
+        config.rules
+    assert [err["loc"] for err in e.value.errors()] == [("rules", 1, "name"), ("rules", 1, "limit")]
+
+
+def test_validate_all(tmp_path):
+    config = load(tmp_path, {"rules": [{"name": "a"}], "datasets": {"x": {}}}, lazy=True)
+    with pytest.raises(ValidationError) as e:
+        validate_all(config)
+    assert [err["loc"] for err in e.value.errors()] == [("datasets", "x", "name")]
+    assert type(config.__dict__["rules"]) is list
+
+    config = load(tmp_path, {"rules": [{"name": "a"}]}, lazy=True)
+    assert validate_all(config) is config
+    assert not any(type(v) is _Unvalidated for v in config.__dict__.values())
+
+
+def test_unvalidated_values_are_resolved_when_used(tmp_path):
+    config = load(tmp_path, {"rules": [{"name": "a"}]}, lazy=True)
+    assert config.model_dump()["rules"] == [{"name": "a", "limit": 1}]
+    assert freeze(config).rules[0].name == "a"
+    assert copy.deepcopy(config).rules[0].name == "a"
+    assert pickle.loads(pickle.dumps(config)).rules[0].name == "a"
+    # Validating without Conflator validates everything
+    assert type(Config.model_validate(load(tmp_path, {"rules": [{"name": "a"}]}, lazy=True)).__dict__["rules"]) is list
+
+    other = load(tmp_path, {"rules": [{"name": "b"}]}, lazy=True)
+    assert diff(config, other).changed == ["rules"]
+    assert not diff(config, load(tmp_path, {"rules": [{"name": "a"}]}, lazy=True))
@@ -115,3 +115,18 @@ class TestLoading:
         assert config.options == 1
         config.options = "a"
         assert config.options == "a"
+
+    def test_overrides_of_fields_named_like_options(self, monkeypatch):
+        class Config(ConfigModel):
+            stats: bool = False
+            cache: Dict[str, int] = {}
+
+        monkeypatch.setattr("sys.argv", ["prog"])
+        conflator = Conflator("test", Config, stats=True, cache={"size": 3})
+        assert conflator.load() == Config(stats=True, cache={"size": 3})
+        assert conflator.stats is None and conflator.file_cache is None
+
+        # The options are still available with a prefix
+        conflator = Conflator("test", Config, stats=True, conflator_stats=True)
+        assert conflator.load().stats
+        assert conflator.stats is not None
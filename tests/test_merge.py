@@ -0,0 +1,81 @@
+import copy
+from typing import Dict, List
+
+import pytest
+import yaml
+
+from conflator import ConfigModel, Conflator
+from conflator.merge import UniqueBy, merge
+
+LAYERS = [
+    {"a": 1, "list": [1], "nested": {"x": [1], "y": {"z": 1}, "gone": 1}, "shared": {"deep": [1, 2]}},
+    {"a": 2, "list": [2], "nested": {"x": [2], "y": "replaced", "gone": None}},
+    {"list": [3], "nested": {"x": [3], "y": {"z": 3}}, "new": {"k": "v"}},
+]
+
+
+def test_merge_layers():
+    layers = copy.deepcopy(LAYERS)
+    result = merge({}, *layers)
+    assert result == {
+        "a": 2,
+        "list": [1, 2, 3],
+        "nested": {"x": [1, 2, 3], "y": {"z": 3}},
+        "shared": {"deep": [1, 2]},
+        "new": {"k": "v"},
+    }
+    # The layers are untouched, and subtrees from a single layer are shared rather than copied
+    assert layers == LAYERS
+    assert result["shared"] is layers[0]["shared"]
+    assert result["new"] is layers[2]["new"]
+
+
+def test_merge_matches_pairwise_merge():
+    pairwise = {}
+    for layer in LAYERS:
+        pairwise = Conflator._merge(pairwise, layer)
+    assert merge({}, *LAYERS) == pairwise
+
+
+def test_merge_replacing_types():
+    assert merge({"a": [1]}, {"a": {"b": 1}}, {"a": [2]}) == {"a": [2]}
+    assert merge({"a": {"b": 1}}, {"a": 1}, {"a": {"c": 1}}) == {"a": {"c": 1}}
+    assert merge({"a": 1}, {"a": None}, {"a": [1]}, {"a": [2]}) == {"a": [1, 2]}
+    assert merge() == {}
+
+
+def test_merge_strategies():
+    layers = [
+        {"sinks": [{"name": "a", "v": 1}, {"name": "b", "v": 1}], "tags": [1], "nested": {"m": {"x": 1}}},
+        {"sinks": [{"name": "b", "v": 2}, {"name": "c", "v": 2}, {"v": 3}], "tags": [2], "nested": {"m": {"y": 2}}},
+    ]
+    result = merge(*layers, strategies={"sinks": UniqueBy("name"), "tags": "prepend", "nested.m": "replace"})
+    assert result == {
+        "sinks": [{"name": "a", "v": 1}, {"name": "b", "v": 2}, {"name": "c", "v": 2}, {"v": 3}],
+        "tags": [2, 1],
+        "nested": {"m": {"y": 2}},
+    }
+    assert merge(*layers, strategies={"tags": "replace"})["tags"] == [2]
+
+    with pytest.raises(ValueError):
+        merge(*layers, strategies={"tags": "shuffle"})
+
+
+class Config(ConfigModel):
+    tags: List[str] = []
+    mapping: Dict[str, int] = {}
+
+
+def test_conflator_merge_strategies(tmp_path):
+    paths = []
+    for i, layer in enumerate([{"tags": ["a"], "mapping": {"x": 1}}, None, {"tags": ["b"], "mapping": {"y": 2}}]):
+        path = tmp_path / f"layer{i}.yaml"
+        # The second file is empty, and so skipped
+        path.write_text(yaml.safe_dump(layer) if layer else "")
+        paths.append(path)
+
+    conflator = Conflator("app", Config, cli=False, merge_strategies={"tags": "prepend", "mapping": "replace"})
+    conflator.config_files = paths
+    config = conflator.load()
+    assert config.tags == ["b", "a"]
+    assert config.mapping == {"y": 2}
@@ -0,0 +1,112 @@
+import sys
+
+import pytest
+
+from conflator import ConfigModel, Conflator
+from conflator.merge import merge
+from conflator.paths import SettingError, apply_settings, join_path, parse_setting, split_path
+
+
+def test_split_and_join_path():
+    assert split_path("a.b[3].c") == ("a", "b", 3, "c")
+    assert split_path("matrix[0][1]") == ("matrix", 0, 1)
+    assert split_path('labels."app.kubernetes.io/name"') == ("labels", "app.kubernetes.io/name")
+    assert split_path("a.'say \\'hi\\''.b") == ("a", "say 'hi'", "b")
+    assert split_path("log-level.max-size", convert_hyphens=True) == ("log_level", "max_size")
+    assert split_path('"log-level"', convert_hyphens=True) == ("log-level",)
+    for keys in [("a", "b", 3, "c"), ("labels", "x.y[1]", 0), ("q", 'say "hi"'), ("", "a=b")]:
+        assert split_path(join_path(keys)) == keys
+
+    for invalid in ["", "a..b", "a.", "[0]", "a[x]", "a[0]b", 'a."b']:
+        with pytest.raises(SettingError):
+            split_path(invalid)
+
+
+def test_parse_setting():
+    assert parse_setting("a.b=1") == (("a", "b"), "1", "a.b=1")
+    # Only the first = separates the path from the value
+    assert parse_setting("url=http://x?a=b").value == "http://x?a=b"
+    assert parse_setting('"a=b".c=d').keys == ("a=b", "c")
+    assert parse_setting("a.b:=1").value == 1
+    assert parse_setting('a:={"b": [true, null]}').value == {"b": [True, None]}
+    assert parse_setting("a=").value == ""
+
+    for invalid in ["a.b", "a:=nope"]:
+        with pytest.raises(SettingError):
+            parse_setting(invalid)
+    # An unterminated quote is not dropped from the path
+    for invalid in ['a"b=c', "a'b=c", '"a=b', "a.'b:=1"]:
+        with pytest.raises(SettingError, match="unterminated quote"):
+            parse_setting(invalid)
+
+
+def apply(config, *settings, strategies=None):
+    return apply_settings(config, [parse_setting(s) for s in settings], strategies)
+
+
+def sequentially(config, *settings):
+    # Each setting as a layer of its own, as --set arguments were merged before
+    for s in settings:
+        setting = parse_setting(s)
+        layer = setting.value
+        for key in reversed(setting.keys):
+            layer = {key: layer}
+        config = merge(config, layer)
+    return config
+
+
+def test_apply_settings():
+    config = {"a": {"b": 1, "c": [1]}, "d": "x"}
+    settings = ["a.b=2", "a.c:=[2]", 'd:={"e": 1}', "d.f=3", "a=scalar", "a.g=4", 'd:={"e": null}']
+    assert apply(config, *settings) == sequentially(config, *settings) == {"a": {"g": "4"}, "d": {"f": "3"}}
+    assert config == {"a": {"b": 1, "c": [1]}, "d": "x"}
+    # null deletes keys, as in config files
+    assert apply(config, "a.b:=null", "h.i:=null") == {"a": {"c": [1]}, "d": "x", "h": {}}
+
+    # Untouched subtrees are shared
+    config = {"a": {"b": 1}, "big": {"x": [1, 2, 3]}}
+    assert apply(config, "a.b=2")["big"] is config["big"]
+    assert apply(config) is config
+
+
+def test_apply_indices():
+    config = {"sinks": [{"path": "/a"}, {"path": "/b"}]}
+    result = apply(config, "sinks[1].path=/c", "sinks[2].path=/d", 'sinks[0]:={"level": 1}')
+    assert result == {"sinks": [{"path": "/a", "level": 1}, {"path": "/c"}, {"path": "/d"}]}
+    assert apply({}, "matrix[0][0]:=1", "matrix[0][1]:=2") == {"matrix": [[1, 2]]}
+
+    with pytest.raises(SettingError, match=r"sinks\[3\], sinks only has 2 items"):
+        apply(config, "sinks[3].path=/e")
+
+
+def test_apply_strategies():
+    config = {"tags": ["a"], "sinks": [{"name": "a", "path": "/a"}]}
+    assert apply(config, 'tags:=["b"]') == {"tags": ["a", "b"], "sinks": config["sinks"]}
+    assert apply(config, 'tags:=["b"]', strategies={"tags": "replace"})["tags"] == ["b"]
+    assert apply(config, 'tags:=["b"]', strategies={"tags": "prepend"})["tags"] == ["b", "a"]
+
+
+class Sink(ConfigModel):
+    path: str
+    size: int = 0
+
+
+class Config(ConfigModel):
+    name: str = "app"
+    sinks: list[Sink] = []
+
+
+def test_load(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "config.json"
+    path.write_text('{"sinks": [{"path": "/a"}]}')
+    monkeypatch.setattr(sys, "argv", ["prog", "--set", "sinks[0].size:=10", "--set", "name=a=b"])
+    config = Conflator("app", Config, config_file=path).load()
+    assert config.sinks[0].size == 10
+    assert config.name == "a=b"
+
+    for setting, error in [("name", "Invalid --set 'name'"), ("sinks[5].path=/b", "Invalid --set sinks[5]")]:
+        monkeypatch.setattr(sys, "argv", ["prog", "--set", setting])
+        with pytest.raises(SystemExit) as e:
+            Conflator("app", Config, config_file=path).load()
+        assert e.value.code == 2
+        assert error in capsys.readouterr().err
@@ -0,0 +1,126 @@
+import json
+import sys
+from typing import Annotated, List
+
+import pytest
+
+from conflator import CLIArg, ConfigModel, Conflator, EnvVar
+from conflator.merge import UniqueBy
+from conflator.provenance import Candidate, Source
+
+
+class Sink(ConfigModel):
+    name: str
+    path: str = "/dev/null"
+    level: Annotated[str, EnvVar("SINK_LEVEL")] = "info"
+
+
+class Config(ConfigModel):
+    port: Annotated[int, CLIArg("--port")] = 80
+    host: str = "localhost"
+    sinks: List[Sink] = []
+    tags: List[str] = []
+
+
+@pytest.fixture
+def files(tmp_path):
+    base = tmp_path / "base.yaml"
+    base.write_text("host: example.com\nport: 1\nsinks:\n  - name: a\n    path: /a\ntags: [x]\n")
+    local = tmp_path / "local.json"
+    local.write_text(json.dumps({"port": 2, "sinks": [{"name": "b"}], "tags": ["y"]}))
+    return [base, local]
+
+
+def load(monkeypatch, files, argv=(), **kwargs):
+    monkeypatch.setattr(sys, "argv", ["prog", *argv])
+    conflator = Conflator("app", Config, provenance=True, **kwargs)
+    conflator.config_files = files
+    return conflator, conflator.load()
+
+
+def test_files_and_defaults(files, monkeypatch):
+    conflator, config = load(monkeypatch, files)
+    p = conflator.provenance
+    base, local = (Source("file", str(f)) for f in files)
+
+    assert p.source("host") == Candidate(base, 1)
+    assert p.candidates("port") == [Candidate(base, 2), Candidate(local)]
+    assert p.source("sinks[0].path") == Candidate(base, 5)
+    assert p.source("sinks[1].name") == Candidate(local)
+    assert p.source("sinks[1].path") == Candidate(Source("default", "Sink.path"))
+    assert p.source("tags[1]") == Candidate(local)
+    assert p.source("missing") is None
+
+    paths = dict(p.items())
+    assert set(paths) == {
+        "port",
+        "host",
+        "sinks[0].name",
+        "sinks[0].path",
+        "sinks[0].level",
+        "sinks[1].name",
+        "sinks[1].path",
+        "sinks[1].level",
+        "tags[0]",
+        "tags[1]",
+    }
+    assert f"port: {local} (overrides {base}:2)" in p.explain().splitlines()
+
+
+def test_set_env_cli_and_overrides(files, monkeypatch):
+    monkeypatch.setenv("APP_SINK_LEVEL", "debug")
+    conflator, config = load(monkeypatch, files, ["--port", "3", "--set", "host=set.example.com"], tags=["z"])
+    p = conflator.provenance
+    assert config.port == 3
+
+    assert p.source("port") == Candidate(Source("cli", "--port"))
+    assert p.source("host") == Candidate(Source("set", "host=set.example.com"))
+    assert str(p.source("host")) == "--set host=set.example.com"
+    assert [str(c) for c in p.candidates("sinks[0].level")] == ["env APP_SINK_LEVEL"]
+    # Overrides replace the whole value
+    assert p.candidates("tags")[-1] == Candidate(Source("override", "tags"))
+    assert [c.source.kind for c in p.candidates("tags[0]")] == ["override"]
+    assert p.source("tags[1]") is None
+
+
+def test_set_indices_and_json(files, monkeypatch):
+    argv = ["--set", "sinks[1].path=/set", "--set", 'tags:=["t"]', "--set", 'sinks[2]:={"name": "c"}']
+    conflator, config = load(monkeypatch, files, argv)
+    p = conflator.provenance
+    assert [s.path for s in config.sinks] == ["/a", "/set", "/dev/null"]
+    assert p.candidates("sinks[1].path") == [Candidate(Source("set", "sinks[1].path=/set"))]
+    assert p.source("sinks[1].name") == Candidate(Source("file", str(files[1])))
+    assert p.source("sinks[2].name") == Candidate(Source("set", argv[5]))
+    # Lists are appended to, as from config files
+    assert config.tags == ["x", "y", "t"]
+    assert p.source("tags[2]") == Candidate(Source("set", argv[3]))
+
+
+def test_merge_strategies(files, monkeypatch):
+    files[1].write_text(json.dumps({"sinks": [{"name": "a", "path": "/b"}]}))
+    conflator, config = load(monkeypatch, files, merge_strategies={"sinks": UniqueBy("name")})
+    p = conflator.provenance
+    assert len(config.sinks) == 1
+    assert [c.source.name for c in p.candidates("sinks[0]")] == [str(files[0]), str(files[1])]
+    assert p.source("sinks[0].path").source.name == str(files[1])
+
+
+def test_explain_config_flag(files, monkeypatch, capsys):
+    conflator = Conflator("app", Config)
+    conflator.config_files = files
+    monkeypatch.setattr(sys, "argv", ["prog", "--explain-config"])
+    with pytest.raises(SystemExit) as e:
+        conflator.load()
+    assert e.value.code == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert f"host: {files[0]}:1" in lines
+    # Printed with rich, but paths are not taken as markup
+    assert f"sinks[1].name: {files[1]}" in lines
+
+
+def test_disabled_by_default(files, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    conflator = Conflator("app", Config)
+    conflator.config_files = files
+    conflator.load()
+    assert conflator.provenance is None
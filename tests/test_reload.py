@@ -0,0 +1,96 @@
+from typing import Annotated, Dict, List
+
+import pytest
+import yaml
+from pydantic import field_validator
+
+from conflator import ConfigModel, Conflator, EnvVar
+
+validated = []
+
+
+class Sink(ConfigModel):
+    path: str
+
+    @field_validator("path")
+    @classmethod
+    def record(cls, v):
+        validated.append(v)
+        return v
+
+
+class Worker(ConfigModel):
+    name: str
+    sink: Sink
+
+
+class Config(ConfigModel):
+    workers: List[Worker] = []
+    named: Dict[str, Sink] = {}
+    level: Annotated[str, EnvVar("LEVEL")] = "info"
+
+
+def write(path, n_workers, changed=None):
+    workers = [
+        {"name": f"w{i}", "sink": {"path": f"/out/{i}" if i != changed else "/changed"}} for i in range(n_workers)
+    ]
+    path.write_text(yaml.safe_dump({"workers": workers, "named": {"a": {"path": "/named/a"}}}))
+
+
+@pytest.fixture
+def conflator(tmp_path):
+    path = tmp_path / "config.yaml"
+    write(path, 20)
+    validated.clear()
+    return Conflator("app", Config, cli=False, config_file=path)
+
+
+def test_reload_only_changed(conflator):
+    first = conflator.load()
+    assert len(validated) == 21
+
+    validated.clear()
+    write(conflator.config_files[0], 20, changed=17)
+    second = conflator.reload(first)
+    assert validated == ["/changed"]
+    assert second.workers[17].sink.path == "/changed"
+    assert first.workers[17].sink.path == "/out/17"
+
+    # Unchanged sub-models are reused, changed ones are new
+    assert second.workers[16] is first.workers[16]
+    assert second.named["a"] is first.named["a"]
+    assert second.workers[17] is not first.workers[17]
+    assert second == conflator.load()
+
+
+def test_reload_unchanged(conflator):
+    first = conflator.load()
+    validated.clear()
+    assert conflator.reload(first) is first
+    assert validated == []
+
+
+def test_reload_list_grows(conflator):
+    first = conflator.load()
+    validated.clear()
+    write(conflator.config_files[0], 21)
+    second = conflator.reload(first)
+    assert len(second.workers) == 21
+    assert second == conflator.load()
+
+
+def test_reload_env_changed(conflator, monkeypatch):
+    first = conflator.load()
+    validated.clear()
+    monkeypatch.setenv("APP_LEVEL", "debug")
+    second = conflator.reload(first)
+    assert second.level == "debug"
+    assert len(validated) == 21
+
+
+def test_reload_other_result(conflator):
+    first = conflator.load()
+    conflator.load()
+    validated.clear()
+    assert conflator.reload(first) == first
+    assert len(validated) == 21
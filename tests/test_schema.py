@@ -0,0 +1,66 @@
+import json
+import os
+from typing import List
+
+from conflator import ConfigModel, Conflator
+from conflator.schema import DEFINITIONS_FILE, model_schema, models_schema, write_schemas
+
+
+class Sink(ConfigModel):
+    path: str
+
+
+class Server(ConfigModel):
+    port: int = 80
+    sinks: List[Sink] = []
+
+
+class Worker(ConfigModel):
+    threads: int = 1
+    sinks: List[Sink] = []
+
+
+def test_schema_is_cached():
+    schema = model_schema(Server)
+    assert schema == Server.model_json_schema()
+    assert model_schema(Server) is schema
+    assert model_schema(Server, mode="serialization") is not schema
+
+    # Creating a model may change the schema of others
+    class Other(ConfigModel):
+        pass
+
+    assert model_schema(Server) is not schema
+    schema = model_schema(Server)
+    Server.model_rebuild(force=True)
+    assert model_schema(Server) is not schema
+
+
+def test_conflator_schema_is_a_copy():
+    conflator = Conflator("app", Server, cli=False)
+    schema = conflator.schema()
+    assert schema == Server.model_json_schema()
+    schema["properties"]["port"]["default"] = 0
+    assert conflator.schema() == Server.model_json_schema()
+
+
+def test_models_schema_shares_definitions():
+    refs, definitions = models_schema([Server, Worker])
+    assert refs == {Server: {"$ref": "#/$defs/Server"}, Worker: {"$ref": "#/$defs/Worker"}}
+    assert set(definitions["$defs"]) == {"Server", "Worker", "Sink"}
+    assert models_schema([Server, Worker])[1] is definitions
+
+
+def test_write_schemas(tmp_path):
+    paths = write_schemas([Server, Worker], tmp_path)
+    assert paths == {Server: tmp_path / "Server.json", Worker: tmp_path / "Worker.json"}
+    assert json.loads(paths[Server].read_text()) == {"$ref": f"{DEFINITIONS_FILE}#/$defs/Server"}
+    definitions = json.loads((tmp_path / DEFINITIONS_FILE).read_text())
+    assert definitions["$defs"]["Server"]["properties"]["sinks"]["items"] == {"$ref": f"{DEFINITIONS_FILE}#/$defs/Sink"}
+
+    # Only changed files are written again
+    os.utime(paths[Server], ns=(0, 0))
+    paths[Worker].write_text("{}")
+    write_schemas([Server, Worker], tmp_path)
+    assert paths[Server].stat().st_mtime_ns == 0
+    assert json.loads(paths[Worker].read_text()) == {"$ref": f"{DEFINITIONS_FILE}#/$defs/Worker"}
@@ -0,0 +1,102 @@
+import json
+import multiprocessing
+import time
+from typing import List
+
+import pytest
+
+from conflator import ConfigModel, Conflator
+from conflator.shared import _HEADER, _MAGIC, SharedConfig, SharedConfigReader
+
+
+class Sink(ConfigModel):
+    path: str
+
+
+class Config(ConfigModel):
+    level: str = "info"
+    port: int = 80
+    sinks: List[Sink] = []
+
+
+def worker(name, results, published):
+    # Runs in a spawned process, reading the first version then waiting for the second one
+    reader = SharedConfigReader(name, Config)
+    first = reader.get()
+    results.put((reader.version, first.model_dump()))
+    published.wait(30)
+    while reader.version < 2:
+        time.sleep(0.01)
+    second = reader.get()
+    results.put((reader.version, second.model_dump()))
+    reader.close()
+
+
+def test_workers_read_published_versions(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"level": "debug", "sinks": [{"path": "/a"}]}))
+    conflator = Conflator("app", Config, cli=False, config_file=path)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    published = context.Event()
+    with SharedConfig.create(size=4096) as shared:
+        config = conflator.load()
+        assert shared.publish(config) == 1
+        workers = [
+            context.Process(target=worker, args=(shared.name, results, published), daemon=True) for _ in range(3)
+        ]
+        for w in workers:
+            w.start()
+        first = [results.get(timeout=30) for _ in workers]
+        assert first == [(1, {"level": "debug", "port": 80, "sinks": [{"path": "/a"}]})] * 3
+
+        path.write_text(json.dumps({"level": "error", "port": 8080}))
+        assert shared.publish(conflator.reload(config)) == 2
+        published.set()
+        second = [results.get(timeout=30) for _ in workers]
+        assert second == [(2, {"level": "error", "port": 8080, "sinks": []})] * 3
+        for w in workers:
+            w.join(10)
+            assert w.exitcode == 0
+
+        # Workers exiting does not remove the segment
+        with SharedConfigReader(shared.name, Config) as reader:
+            assert reader.get().port == 8080
+
+
+def test_reader_only_validates_new_versions():
+    with SharedConfig.create(size=1024) as shared:
+        reader = SharedConfigReader(shared.name, Config)
+        assert reader.version == 0
+        with pytest.raises(LookupError):
+            reader.get()
+
+        shared.publish({"port": 1})
+        config = reader.get()
+        assert config.port == 1
+        assert reader.get() is config
+
+        shared.publish(Config(port=2))
+        assert reader.version == 2
+        assert reader.get().port == 2
+        reader.close()
+
+
+def test_config_too_large():
+    with SharedConfig.create(size=16) as shared:
+        with pytest.raises(ValueError, match="larger than"):
+            shared.publish(Config(sinks=[Sink(path="/a" * 10)]))
+        assert shared.version == 0
+
+
+def test_publisher_died_while_writing():
+    with SharedConfig.create(size=1024) as shared:
+        shared.publish({"port": 1})
+        # As left by a publisher that died after starting to write version 2
+        _HEADER.pack_into(shared._shm.buf, 0, _MAGIC, 3, 0)
+        with SharedConfigReader(shared.name, Config, timeout=0.05) as reader:
+            start = time.monotonic()
+            with pytest.raises(TimeoutError):
+                reader.get()
+            assert time.monotonic() - start < 1
@@ -0,0 +1,102 @@
+import contextlib
+import json
+import logging
+import sys
+from typing import Annotated, List
+
+import yaml
+
+from conflator import CLIArg, ConfigModel, Conflator, EnvVar
+from conflator.stats import LoadStats
+
+
+class Sink(ConfigModel):
+    path: str
+    level: Annotated[str, EnvVar("SINK_LEVEL")] = "info"
+
+
+class Config(ConfigModel):
+    port: Annotated[int, CLIArg("--port")] = 80
+    sinks: List[Sink] = []
+
+
+def conflator(tmp_path, **kwargs):
+    (tmp_path / "a.json").write_text(json.dumps({"sinks": [{"path": "/a"}, {"path": "/b"}]}))
+    (tmp_path / "b.yaml").write_text(yaml.safe_dump({"port": 1}))
+    conflator = Conflator("app", Config, **kwargs)
+    conflator.config_files = [tmp_path / "a.json", tmp_path / "b.yaml", tmp_path / "missing.json"]
+    return conflator
+
+
+def test_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    c = conflator(tmp_path)
+    c.load()
+    assert c.stats is None
+
+
+def test_load_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "--port", "8080"])
+    monkeypatch.setenv("APP_SINK_LEVEL", "debug")
+    received = []
+    c = conflator(tmp_path, stats=received.append)
+    config = c.load()
+    assert config.port == 8080
+
+    stats = c.stats
+    assert received == [stats]
+    assert set(stats.stages) == {"load", "cli", "env", "read", "merge", "validate"}
+    assert all(s.wall >= 0 and s.cpu >= 0 for s in stats.stages.values())
+    assert stats.stages["load"].wall >= stats.stages["validate"].wall
+
+    assert [(f.path.name, f.loader) for f in stats.files] == [
+        ("a.json", "json"),
+        ("b.yaml", "yaml (libyaml)" if hasattr(yaml, "CSafeLoader") else "yaml (python)"),
+        ("missing.json", "missing"),
+    ]
+    assert stats.files[0].bytes == (tmp_path / "a.json").stat().st_size
+    assert stats.files[2].bytes is None
+
+    assert stats.models_validated == 3
+    assert stats.env_injections == 2
+    assert stats.cli_injections == 1
+    assert "3 models validated" in str(stats)
+
+
+def test_cached_and_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    c = conflator(tmp_path, stats=True, cache=tmp_path / "cache")
+    first = c.load()
+    c.reload(first)
+    assert [f.loader for f in c.stats.files] == ["cache", "cache", "missing"]
+    # Nothing changed, so nothing was validated again
+    assert c.stats.models_validated == 0
+
+
+def test_spans(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(sys, "argv", ["prog"])
+    spans = []
+
+    class Span:
+        def __init__(self, name, attributes):
+            self.name = name
+            self.attributes = dict(attributes)
+
+        def set_attribute(self, key, value):
+            self.attributes[key] = value
+
+    @contextlib.contextmanager
+    def span(name, attributes):
+        s = Span(name, attributes)
+        yield s
+        spans.append(s)
+
+    c = conflator(tmp_path, span=span)
+    with caplog.at_level(logging.DEBUG):
+        c.load()
+    assert isinstance(c.stats, LoadStats)
+    assert [s.name for s in spans][-1] == "conflator.load"
+    assert spans[-1].attributes == {"app_name": "app"}
+    files = [s for s in spans if s.name == "conflator.read_file"]
+    assert [s.attributes["loader"] for s in files][0] == "json"
+    assert "Load statistics of app" in caplog.text
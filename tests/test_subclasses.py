@@ -1,12 +1,13 @@
 from dataclasses import dataclass, field
-from typing import Literal, Union
+from typing import Dict, List, Literal, Optional, Union, get_args
 
 import pytest
 import yaml
 from annotated_types import Annotated
-from pydantic import ConfigDict, Field
+from pydantic import ConfigDict, Field, ValidationError
 
 from conflator import ConfigModel, Conflator
+from conflator.subclasses import subclasses, tagged_union
 
 
 class Action(ConfigModel):
@@ -127,3 +128,80 @@ def test_subclasses_extra_key():
         )
         conflator = Conflator("test-app", Config, cli=False, **config)
         config = conflator.load()
+
+
+def test_subclasses_registry():
+    assert subclasses(Action) == {"Source": Source, "Process": Process, "Sink": Sink}
+
+    # A hierarchy of its own, so that the subclasses of Action are the same for the other tests
+    class Step(ConfigModel):
+        name: str
+
+    class Fetch(Step):
+        name: Literal["Fetch"]
+        url: str
+
+    class Store(Step):
+        name: Literal["Store"]
+
+    assert list(subclasses(Step)) == ["Fetch", "Store"]
+
+    class Batch(Fetch):
+        name: Literal["Batch"]
+        size: int
+
+    assert list(subclasses(Step)) == ["Fetch", "Batch", "Store"]
+
+    class Pipeline(ConfigModel):
+        steps: List[tagged_union(Step, "name")] = []
+
+    pipeline = Pipeline(steps=[{"name": "Batch", "url": "https://example.com", "size": 2}])
+    assert isinstance(pipeline.steps[0], Batch)
+
+
+class Shape(ConfigModel):
+    kind: str
+
+
+class Circle(Shape):
+    kind: Literal["circle"]
+    radius: float
+
+
+class Square(Shape):
+    kind: Literal["square"]
+    side: float
+
+
+class Point(Shape):
+    # The tag has a default, so it is not discriminated on
+    kind: Literal["point"] = "point"
+
+
+class Drawing(ConfigModel):
+    shapes: List[Union[Circle, Square]] = []
+    anything: Optional[Union[Circle, Square, Point]] = None
+
+
+class Canvas(ConfigModel):
+    drawings: Dict[str, Drawing] = {}
+
+
+def test_unions_are_discriminated():
+    # Only on request, as the models are changed
+    Conflator("test-app", Canvas, cli=False)
+    assert Drawing.model_fields["shapes"].annotation == List[Union[Circle, Square]]
+
+    Conflator("test-app", Canvas, cli=False, discriminate_unions=True)
+    (shape,) = get_args(Drawing.model_fields["shapes"].annotation)
+    assert get_args(shape)[0] == Union[Circle, Square] and shape.__metadata__[0].discriminator == "kind"
+    assert Drawing.model_fields["anything"].annotation == Optional[Union[Circle, Square, Point]]
+
+    drawings = {"a": {"shapes": [{"kind": "square", "side": 1}]}}
+    canvas = Conflator("test-app", Canvas, cli=False, drawings=drawings).load()
+    assert canvas.drawings["a"].shapes == [Square(kind="square", side=1)]
+    assert Canvas(drawings={"a": {"anything": {}}}).drawings["a"].anything == Point()
+    # Only the model of the tag is tried
+    with pytest.raises(ValidationError) as e:
+        Canvas(drawings={"a": {"shapes": [{"kind": "triangle"}, {"kind": "circle"}]}})
+    assert [error["type"] for error in e.value.errors()] == ["union_tag_invalid", "missing"]
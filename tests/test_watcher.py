@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import List
+
+import pytest
+
+from conflator import ConfigModel, Conflator
+from conflator.watcher import ConfigWatcher, _inotify_available
+
+
+class Sink(ConfigModel):
+    path: str
+
+
+class Config(ConfigModel):
+    level: str = "info"
+    port: int = 80
+    sinks: List[Sink] = []
+
+
+backends = [pytest.param(False, id="polling")]
+if _inotify_available():
+    backends.append(pytest.param(True, id="inotify"))
+
+
+def write(path, **config):
+    # Write then rename, as editors do, keeping the modification time distinct from the previous write
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(config))
+    os.replace(tmp, path)
+
+
+@pytest.fixture(params=backends)
+def watcher(request, tmp_path):
+    path = tmp_path / "config.json"
+    write(path, level="debug", sinks=[{"path": "/a"}])
+    watcher = ConfigWatcher(
+        Conflator("app", Config, cli=False, config_file=path),
+        debounce=0.05,
+        poll_interval=0.02,
+        use_inotify=request.param,
+    )
+    watcher.path = path
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+
+def changes(watcher):
+    received = []
+    event = threading.Event()
+
+    def callback(old, new):
+        received.append((old, new))
+        event.set()
+
+    watcher.subscribe(callback)
+    return received, event
+
+
+def test_reloads_on_change(watcher):
+    received, event = changes(watcher)
+    first = watcher.config
+    assert first.level == "debug"
+
+    write(watcher.path, level="warning", sinks=[{"path": "/a"}])
+    assert event.wait(5)
+    [(old, new)] = received
+    assert old is first
+    assert new is watcher.config
+    assert new.level == "warning"
+    # Unchanged sub-models are reused
+    assert new.sinks[0] is first.sinks[0]
+
+
+def test_debounces_bursts(watcher):
+    received, event = changes(watcher)
+    for port in range(1, 6):
+        write(watcher.path, port=port)
+        time.sleep(0.005)
+    assert event.wait(5)
+    time.sleep(0.2)
+    assert len(received) == 1
+    assert watcher.config.port == 5
+
+
+def test_invalid_config_keeps_previous(watcher):
+    _, event = changes(watcher)
+    errors = []
+    failed = threading.Event()
+    watcher.subscribe(lambda old, new: None, on_error=lambda e: (errors.append(e), failed.set()))
+    first = watcher.config
+
+    write(watcher.path, port="not a port")
+    assert failed.wait(5)
+    assert watcher.config is first
+    assert watcher.last_error is errors[0]
+    assert "port" in str(errors[0])
+
+    # Unparseable files are reported too, and retried with the next change
+    failed.clear()
+    watcher.path.write_text("{")
+    assert failed.wait(5)
+    assert watcher.config is first
+
+    write(watcher.path, port=8080)
+    assert event.wait(5)
+    assert watcher.config.port == 8080
+    assert watcher.last_error is None
+    assert len(errors) == 2
+
+
+def test_only_changed_files_are_parsed(tmp_path):
+    conflator = Conflator("app", Config, cli=False)
+    conflator.config_files = [tmp_path / "a.json", tmp_path / "b.json", tmp_path / "missing" / "c.json"]
+    write(conflator.config_files[0], level="debug")
+    write(conflator.config_files[1], port=1)
+
+    parsed = []
+    read = conflator._read_config_file
+    conflator._read_config_file = lambda path: (parsed.append(path.name), read(path))[1]
+
+    with ConfigWatcher(conflator, debounce=0.05, poll_interval=0.02) as watcher:
+        _, event = changes(watcher)
+        parsed.clear()
+
+        write(conflator.config_files[1], port=2)
+        assert event.wait(5)
+        assert parsed == ["b.json"]
+        assert watcher.config.level == "debug"
+        assert watcher.config.port == 2
+
+        # Files in directories that do not exist yet are picked up once they are created
+        event.clear()
+        parsed.clear()
+        conflator.config_files[2].parent.mkdir()
+        write(conflator.config_files[2], port=3)
+        assert event.wait(5)
+        assert watcher.config.port == 3
+
+
+def test_asyncio_subscriber(watcher):
+    async def main():
+        loop = asyncio.get_running_loop()
+        received = asyncio.Queue()
+
+        async def callback(old, new):
+            await received.put(new)
+
+        watcher.subscribe(callback, loop=loop)
+        watcher.subscribe(lambda old, new: received.put_nowait(old), loop=loop)
+
+        await asyncio.to_thread(write, watcher.path, level="error")
+        first, second = await asyncio.wait_for(asyncio.gather(received.get(), received.get()), 5)
+        assert {first.level, second.level} == {"debug", "error"}
+
+    asyncio.run(main())
+
+
+def test_unsubscribe_and_refresh(watcher):
+    received, _ = changes(watcher)
+    unsubscribe = watcher.subscribe(lambda old, new: pytest.fail("unsubscribed"))
+    unsubscribe()
+
+    # Nothing to do if no file changed
+    assert not watcher.refresh()
+    # A refresh does not wait for the watcher to notice the change
+    watcher.stop()
+    write(watcher.path, level="error")
+    assert watcher.refresh()
+    assert watcher.config.level == "error"
+    assert len(received) == 1
+
+
+def test_restart(watcher):
+    watcher.stop()
+    watcher.start()
+    _, event = changes(watcher)
+    write(watcher.path, level="error", sinks=[{"path": "/a"}])
+    assert event.wait(5)
+    assert watcher.config.level == "error"
+
+
+def test_stop_is_prompt(tmp_path):
+    watcher = Conflator("app", Config, cli=False, config_file=tmp_path / "config.json").watch(poll_interval=60)
+    start = time.monotonic()
+    watcher.stop()
+    assert time.monotonic() - start < 1
+
+
+def test_subscribe_to_paths(watcher):
+    _, event = changes(watcher)
+    sinks = []
+    watcher.subscribe(lambda old, new: sinks.append(new), paths=["sinks"])
+
+    write(watcher.path, level="error", sinks=[{"path": "/a"}])
+    assert event.wait(5)
+    assert sinks == []
+
+    event.clear()
+    write(watcher.path, level="error", sinks=[{"path": "/b"}])
+    assert event.wait(5)
+    assert [s.sinks[0].path for s in sinks] == ["/b"]